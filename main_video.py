@@ -0,0 +1,109 @@
+"""
+[NEW FILE]
+Entry Point สำหรับวิดีโอ: ติดตามเกมจากไฟล์ .mp4 แล้วพิมพ์ PGN ตามรูปแบบ submissions/sample-submission.csv
+
+Pipeline แบบ Streaming (src/pipeline/video_pipeline.py):
+Decode -> S1 (BoardLocator) -> S2 (OccupancyModel) -> S3 (PieceModel) -> PGN
+แต่ละ Stage เป็น Thread ที่เชื่อมกันด้วย Queue จำกัดขนาด และรายงาน Throughput / Queue Depth ของแต่ละ Stage
+[NEW] NUM_CHUNK_WORKERS > 1: แบ่งวิดีโอเป็นช่วงที่ซ้อนกัน ประมวลผลขนานหลาย Process แล้วต่อผล
+(src/pipeline/chunked_video.py)
+
+การใช้งาน:
+    python main_video.py [path/to/video.mp4]
+"""
+import sys
+import os
+
+from src.pipeline.s1_board_locator import BoardLocator
+from src.pipeline.state_recognizer import StateRecognizer
+from src.pipeline.video_pipeline import StreamingVideoPipeline
+from src.pipeline.motion_gate import MotionGate
+from src.pipeline.temporal_smoother import TemporalSmoother
+from src.pipeline.chunked_video import ChunkedVideoRunner
+
+# --- ตั้งค่า ---
+VIDEO_PATH = "data/raw/videos/2_move_student.mp4"
+OCCUPANCY_MODEL_PATH = "models/occupancy/occupancy_model_best.ckpt"
+PIECE_MODEL_PATH = "models/piece/piece_model_best.ckpt"
+
+QUEUE_SIZE = 8      # เฟรมสูงสุดที่ค้างระหว่าง Stage (คุมหน่วยความจำ)
+BATCH_FRAMES = 4    # จำนวนเฟรมสูงสุดต่อ Batch ของ S2/S3
+SAMPLING = "fps"    # [NEW] Policy ของ FrameReader ('stride', 'fps', 'adaptive')
+TARGET_FPS = 5.0    # [NEW] จำนวนเฟรมที่วิเคราะห์ต่อวินาที (เฟรมอื่นถูกข้ามด้วย grab())
+CROP_TO_BOARD = True # [NEW] ตัดเฟรมเหลือ ROI รอบกระดานหลังหากระดานพบ
+CONFIRM_FRAMES = 3  # เฟรมติดกันที่ต้องเห็นตำแหน่งเดียวกันก่อนยอมรับการเดิน
+REPORT_INTERVAL = 200
+USE_MOTION_GATE = True                  # [NEW] ข้ามเฟรมที่มีมือ/การเคลื่อนไหว และตำแหน่งที่ไม่เปลี่ยน
+GATE_LOG_PATH = "motion_gate_log.csv"   # [NEW] Log การตัดสินของ Gate (ใช้ปรับ Threshold)
+USE_TEMPORAL_SMOOTHER = False           # [NEW] โหวตผลรายช่องตามเวลาแทน Gate (ใช้แทนกัน ไม่ใช้พร้อมกัน)
+SMOOTHING_WINDOW = 5                    # [NEW] จำนวนเฟรมใน Window ของ TemporalSmoother
+NUM_CHUNK_WORKERS = 1                   # [NEW] > 1 = ประมวลผลวิดีโอเดียวขนานกันหลาย Process
+CHUNK_OVERLAP_SECONDS = 10.0            # [NEW] ช่วงซ้อนระหว่าง Chunk (ใช้หาจุดต่อ)
+CHECKPOINT_DIR = "checkpoints"          # [NEW] ทำต่อจากจุดเดิมถ้าการรันก่อนหน้าค้างไว้ (None = ปิด) ไฟล์ละวิดีโอ
+CHECKPOINT_INTERVAL_S = 30.0            # [NEW] บันทึก Checkpoint ทุกๆ N วินาที
+
+def build_pipeline() -> StreamingVideoPipeline:
+    """
+    สร้าง Pipeline (ระดับ Module เพื่อให้ Worker Process ของ ChunkedVideoRunner เรียกได้)
+    """
+    # Locator แบบ Tracking สำหรับวิดีโอ
+    locator = BoardLocator(tracking=True, remap_cache=True, lock_orientation=True)
+    recognizer = StateRecognizer(
+        occupancy_model_path=OCCUPANCY_MODEL_PATH,
+        piece_model_path=PIECE_MODEL_PATH,
+        locator=locator
+    )
+    smoother = None
+    if USE_TEMPORAL_SMOOTHER:
+        smoother = TemporalSmoother(recognizer.piece_model.class_names, window=SMOOTHING_WINDOW)
+    return StreamingVideoPipeline(
+        recognizer,
+        queue_size=QUEUE_SIZE,
+        batch_frames=BATCH_FRAMES,
+        sampling=SAMPLING,
+        target_fps=TARGET_FPS,
+        crop_to_board=CROP_TO_BOARD,
+        confirm_frames=CONFIRM_FRAMES,
+        report_interval=REPORT_INTERVAL,
+        gate=MotionGate(stable_frames=3) if USE_MOTION_GATE and smoother is None else None,
+        smoother=smoother,
+        checkpoint_interval_s=CHECKPOINT_INTERVAL_S
+    )
+
+def checkpoint_path_for(video_path: str):
+    """
+    [NEW] ไฟล์ Checkpoint ของวิดีโอนี้ใน CHECKPOINT_DIR (None ถ้าปิด Checkpoint)
+    Pipeline ลบไฟล์นี้เองเมื่อประมวลผลวิดีโอจบ
+    """
+    if CHECKPOINT_DIR is None:
+        return None
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(CHECKPOINT_DIR, f"{name}.ckpt.json")
+
+def main():
+    video_path = sys.argv[1] if len(sys.argv) > 1 else VIDEO_PATH
+    if not os.path.exists(video_path):
+        print(f"!!! Error: Video not found at {video_path}")
+        return
+
+    # --- 1. ประมวลผลวิดีโอ ---
+    print(f"\n--- Processing: {video_path} ---")
+    if NUM_CHUNK_WORKERS > 1:
+        runner = ChunkedVideoRunner(build_pipeline, num_workers=NUM_CHUNK_WORKERS,
+                                    overlap_seconds=CHUNK_OVERLAP_SECONDS)
+        result = runner.run(video_path)
+    else:
+        pipeline = build_pipeline()
+        result = pipeline.run(video_path, checkpoint_path=checkpoint_path_for(video_path))
+        if pipeline.gate is not None:
+            pipeline.gate.save_log(GATE_LOG_PATH)
+            print(f"Motion gate log saved to: {GATE_LOG_PATH}")
+
+    # --- 2. ผลลัพธ์ (row_id,output) ---
+    print(f"\n✅ {result.frames_recognized}/{result.frames_decoded} frames recognized, "
+          f"{len(result.moves)} moves in {result.wall_s:.1f}s")
+    print("row_id,output")
+    print(f"{os.path.basename(video_path)},{result.pgn}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+สคริปต์ "Distill" โมเดล Piece Classification (State 3) เป็น Student ขนาดเล็ก
+
+[NEW]
+- Teacher: PieceLitModel (InceptionV3, 299x299) จาก scripts/train_piece.py
+- Student: PieceStudentLitModel (MobileNetV3-Small) ที่ความละเอียดต่ำกว่า
+  เรียนจาก Soft Labels ของ Teacher + Label จริง บน data/processed/piece
+- รายงาน Accuracy / Agreement / Latency (CPU) เทียบกับ Teacher บน Validation Set
+- PieceModel โหลด Checkpoint ของ Student ได้ทันที (ขนาด Input อ่านจาก Checkpoint)
+"""
+import pytorch_lightning as pl
+from pytorch_lightning.callbacks import ModelCheckpoint, EarlyStopping
+import sys
+import os
+import shutil
+import torch
+
+# เพิ่ม src/ เข้าไปใน path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.piece.piece_lit_model import PieceLitModel
+from src.models.piece.piece_student_lit_model import PieceStudentLitModel
+from src.data.piece_datamodule import PieceDataModule
+from src.inference.engines import TorchEngine
+from src.inference.quantization import evaluate_engine
+
+def compare_with_teacher(teacher: PieceLitModel, student: PieceStudentLitModel, data_dir: str) -> None:
+    """
+    ประเมิน Teacher และ Student บน Validation Set (CPU) แต่ละตัวที่ขนาด Input ของตัวเอง
+    """
+    cpu = torch.device("cpu")
+    results = {}
+    for name, model in (("teacher", teacher), ("student", student)):
+        input_size = getattr(model, "input_size", PieceLitModel.INPUT_SIZE)
+        datamodule = PieceDataModule(data_dir=data_dir, batch_size=32, input_size=input_size)
+        datamodule.setup()
+        loader = datamodule.val_dataloader()
+        if loader is None:
+            print("!!! ข้ามการเปรียบเทียบ: ไม่พบ Validation Set")
+            return
+        results[name] = evaluate_engine(TorchEngine(model, cpu), loader)
+
+    teacher_result, student_result = results["teacher"], results["student"]
+    speedup = teacher_result["latency_ms"] / max(student_result["latency_ms"], 1e-9)
+    print("\n--- Teacher vs Student (Validation Set, CPU) ---")
+    print(f"Teacher: acc={teacher_result['accuracy']:.4f}, latency={teacher_result['latency_ms']:.2f} ms/crop")
+    print(f"Student: acc={student_result['accuracy']:.4f}, latency={student_result['latency_ms']:.2f} ms/crop")
+    print(f"Accuracy drop: {teacher_result['accuracy'] - student_result['accuracy']:+.4f}, speedup: x{speedup:.1f}")
+    if speedup < 5.0:
+        print("⚠️ คำเตือน: Student เร็วกว่า Teacher น้อยกว่า 5 เท่า")
+
+def distill():
+    print("Starting Piece Model Distillation Script...")
+
+    # --- 1. ตั้งค่า ---
+    DATA_DIR = "data/processed/piece"
+    TEACHER_CHECKPOINT = "models/piece/piece_model_best.ckpt"
+    CHECKPOINT_DIR = "models/piece/student_checkpoints/"
+    OUTPUT_CHECKPOINT = "models/piece/piece_student_best.ckpt"
+    STUDENT_ARCH = "mobilenet_v3_small"
+    STUDENT_INPUT_SIZE = 160
+    TEMPERATURE = 4.0
+    ALPHA = 0.7
+
+    if not os.path.exists(os.path.join(DATA_DIR, "train")):
+        print(f"!!! ข้อผิดพลาด: ไม่พบโฟลเดอร์ {DATA_DIR}/train")
+        print("โปรดรัน 'scripts/prepare_piece_data.py' ก่อน")
+        return
+    if not os.path.exists(TEACHER_CHECKPOINT):
+        print(f"!!! ข้อผิดพลาด: ไม่พบ Teacher checkpoint {TEACHER_CHECKPOINT}")
+        print("โปรดรัน 'scripts/train_piece.py' ก่อน")
+        return
+
+    # --- 2. สร้าง DataModule (ขนาดของ Teacher; Student ย่อภาพเองใน training_step) ---
+    datamodule = PieceDataModule(data_dir=DATA_DIR, batch_size=64, input_size=PieceLitModel.INPUT_SIZE)
+
+    # --- 3. สร้าง Teacher / Student ---
+    teacher = PieceLitModel.load_from_checkpoint(TEACHER_CHECKPOINT, map_location="cpu")
+    student = PieceStudentLitModel(
+        learning_rate=1e-3,
+        input_size=STUDENT_INPUT_SIZE,
+        student_arch=STUDENT_ARCH,
+        temperature=TEMPERATURE,
+        alpha=ALPHA
+    )
+    student.set_teacher(teacher)
+
+    # --- 4. สร้าง Callbacks ---
+    checkpoint_callback = ModelCheckpoint(
+        monitor="val_acc",
+        mode="max",
+        filename="piece-student-best-{epoch:02d}-{val_acc:.3f}",
+        save_top_k=1
+    )
+
+    early_stop_callback = EarlyStopping(
+        monitor="val_loss",
+        patience=5,
+        mode="min"
+    )
+
+    # --- 5. สร้าง Trainer ---
+    trainer = pl.Trainer(
+        max_epochs=50,
+        accelerator="auto",
+        default_root_dir=CHECKPOINT_DIR,
+        callbacks=[checkpoint_callback, early_stop_callback],
+        precision="16-mixed"
+    )
+
+    # --- 6. เริ่ม Distill ---
+    print("\n--- Starting Distillation (Piece Student) ---")
+    trainer.fit(student, datamodule=datamodule)
+    print("--- Distillation Complete ---")
+
+    # --- 7. คัดลอกโมเดลที่ดีที่สุด ---
+    print(f"\nDistillation finished. Best model path: {checkpoint_callback.best_model_path}")
+    best_path = checkpoint_callback.best_model_path
+    if not os.path.exists(best_path):
+        print(f"!!! Error: Best model path not found.")
+        return
+    if os.path.abspath(best_path) != os.path.abspath(OUTPUT_CHECKPOINT):
+        shutil.copy(best_path, OUTPUT_CHECKPOINT)
+        print(f"✅ Successfully copied best model to: {OUTPUT_CHECKPOINT}")
+
+    # --- 8. เปรียบเทียบกับ Teacher ---
+    best_student = PieceStudentLitModel.load_from_checkpoint(OUTPUT_CHECKPOINT, map_location="cpu")
+    compare_with_teacher(teacher, best_student, DATA_DIR)
+
+if __name__ == "__main__":
+    distill()
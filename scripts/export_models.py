@@ -0,0 +1,73 @@
+"""
+สคริปต์ Export โมเดล State 2/3 สำหรับ Inference Backend อื่น
+
+[NEW]
+- แปลง Checkpoint (.ckpt) เป็น TorchScript (.ts) และ ONNX (.onnx) ไว้ข้างไฟล์เดิม
+- รัน Parity Check เทียบกับโมเดล Eager บนชุด Crop ตายตัว
+- เลือกใช้ได้ที่ StateRecognizer(occupancy_backend=..., piece_backend=...)
+"""
+import sys
+import os
+import torch
+
+# เพิ่ม src/ เข้าไปใน path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.occupancy.occupancy_lit_model import OccupancyLitModel
+from src.models.piece.piece_lit_model import PieceLitModel
+from src.models.piece.piece_student_lit_model import PieceStudentLitModel
+from src.inference.engines import artifact_path, model_input_size, TorchScriptEngine, OnnxRuntimeEngine
+from src.inference import export
+
+# --- ตั้งค่า ---
+STAGES = {
+    # ชื่อ: (คลาสโมเดล, Checkpoint, โฟลเดอร์ Crop สำหรับ Parity Check)
+    "occupancy": (OccupancyLitModel, "models/occupancy/occupancy_model_best.ckpt", "data/processed/occupancy/val"),
+    "piece": (PieceLitModel, "models/piece/piece_model_best.ckpt", "data/processed/piece/val"),
+    "piece_student": (PieceStudentLitModel, "models/piece/piece_student_best.ckpt", "data/processed/piece/val"),
+}
+PARITY_COUNT = 32     # จำนวน Crop ที่ใช้เทียบ
+PARITY_ATOL = 1e-3    # ค่าต่างสูงสุดของ Logits ที่ยอมรับได้
+
+def export_stage(name: str, lit_model_cls, checkpoint_path: str, crops_dir: str) -> bool:
+    print(f"\n--- Exporting {name} model ---")
+    if not os.path.exists(checkpoint_path):
+        print(f"!!! ข้อผิดพลาด: ไม่พบ Checkpoint {checkpoint_path}")
+        return False
+
+    model = lit_model_cls.load_from_checkpoint(checkpoint_path, map_location="cpu").eval()
+    input_size = model_input_size(model)
+    crops = export.load_parity_crops(crops_dir, count=PARITY_COUNT)
+    reference = export.eager_engine(model)
+    cpu = torch.device("cpu")
+
+    all_passed = True
+
+    ts_path = export.export_torchscript(model, artifact_path(checkpoint_path, "torchscript"), input_size)
+    result = export.check_parity(reference, TorchScriptEngine(ts_path, cpu), crops, input_size, PARITY_ATOL)
+    all_passed &= result["passed"]
+
+    onnx_path = export.export_onnx(model, artifact_path(checkpoint_path, "onnx"), input_size)
+    try:
+        result = export.check_parity(reference, OnnxRuntimeEngine(onnx_path, cpu), crops, input_size, PARITY_ATOL)
+        all_passed &= result["passed"]
+    except ImportError as e:
+        print(f"!!! ข้าม Parity Check ของ ONNX: {e}")
+
+    return all_passed
+
+def main():
+    print("Starting Model Export Script...")
+    results = {
+        name: export_stage(name, cls, ckpt, crops_dir)
+        for name, (cls, ckpt, crops_dir) in STAGES.items()
+    }
+
+    print("\n--- Export Summary ---")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ OK' if passed else '❌ FAILED'}")
+    if not all(results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+สคริปต์สร้างไฟล์ Submission (row_id,output) จากโฟลเดอร์วิดีโอ .mp4
+
+[NEW]
+- กระจายวิดีโอให้ Process Pool (แต่ละ Worker โหลด StateRecognizer ครั้งเดียว แล้วประมวลผลทีละวิดีโอทั้งไฟล์)
+- เขียนแต่ละแถวลง <OUTPUT_CSV>.partial ทันทีที่วิดีโอเสร็จ (ไม่เสียผลถ้า Job ล้มกลางทาง)
+- จบแล้วเรียงแถวตามลำดับวิดีโอ (ชื่อไฟล์) และเขียน OUTPUT_CSV แบบ Atomic
+- รายงานเวลาและ fps ของแต่ละวิดีโอ
+- [NEW] รองรับ Node ที่ถูก Preempt: วิดีโอที่มีแถวใน .partial แล้วจะถูกข้าม
+  และวิดีโอที่ทำค้างไว้จะทำต่อจาก Checkpoint ใน CHECKPOINT_DIR (StreamingVideoPipeline)
+- [UPDATE] วิดีโอที่ล้มเหลวไม่ถูกเขียนลง .partial -> รันใหม่จะลองวิดีโอนั้นอีกครั้ง
+  (ไฟล์จริงยังมีแถวของวิดีโอนั้น โดย output ว่าง และเก็บ .partial ไว้จนกว่าทุกวิดีโอจะสำเร็จ)
+"""
+import csv
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+# เพิ่ม src/ เข้าไปใน path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# --- ตั้งค่า ---
+VIDEO_DIR = "data/raw/videos"
+OUTPUT_CSV = "submissions/submission.csv"
+OCCUPANCY_MODEL_PATH = "models/occupancy/occupancy_model_best.ckpt"
+PIECE_MODEL_PATH = "models/piece/piece_model_best.ckpt"
+NUM_WORKERS = os.cpu_count() or 1
+# จำนวน Thread ของ PyTorch ต่อ Worker (รวมทุก Worker ไม่ควรเกินจำนวน Core -> Scale ได้เกือบเป็นเส้นตรง)
+TORCH_THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // NUM_WORKERS)
+SAMPLING = "fps"
+TARGET_FPS = 5.0
+CHECKPOINT_DIR = "submissions/checkpoints"
+CHECKPOINT_INTERVAL_S = 60.0
+
+# Pipeline ของแต่ละ Worker Process (สร้างใน _init_worker)
+_PIPELINE = None
+
+def _init_worker() -> None:
+    """
+    โหลดโมเดลครั้งเดียวต่อ Worker
+    """
+    global _PIPELINE
+    import cv2
+    import torch
+    from src.pipeline.s1_board_locator import BoardLocator
+    from src.pipeline.state_recognizer import StateRecognizer
+    from src.pipeline.video_pipeline import StreamingVideoPipeline
+    from src.pipeline.motion_gate import MotionGate
+
+    torch.set_num_threads(TORCH_THREADS_PER_WORKER)
+    cv2.setNumThreads(1)
+    recognizer = StateRecognizer(
+        occupancy_model_path=OCCUPANCY_MODEL_PATH,
+        piece_model_path=PIECE_MODEL_PATH,
+        locator=BoardLocator(tracking=True, remap_cache=True, lock_orientation=True)
+    )
+    _PIPELINE = StreamingVideoPipeline(
+        recognizer,
+        sampling=SAMPLING,
+        target_fps=TARGET_FPS,
+        crop_to_board=True,
+        gate=MotionGate(stable_frames=3),
+        checkpoint_interval_s=CHECKPOINT_INTERVAL_S
+    )
+
+def process_video(video_path: str) -> Tuple[str, str, float, int, Optional[str]]:
+    """
+    ประมวลผลวิดีโอ 1 ไฟล์ใน Worker
+    :return: (row_id, pgn, wall_s, frames_read, error)
+    """
+    row_id = os.path.basename(video_path)
+    start = time.perf_counter()
+    try:
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, row_id + ".json")
+        result = _PIPELINE.run(video_path, checkpoint_path=checkpoint_path)
+        return row_id, result.pgn, time.perf_counter() - start, result.frames_decoded, None
+    except Exception as e:
+        return row_id, "", time.perf_counter() - start, 0, str(e)
+
+def list_videos(video_dir: str) -> List[str]:
+    return sorted(
+        os.path.join(video_dir, name) for name in os.listdir(video_dir)
+        if name.lower().endswith(".mp4")
+    )
+
+def read_partial_rows(partial_path: str) -> Dict[str, str]:
+    """
+    [NEW] แถวที่เสร็จแล้วจากการรันก่อนหน้า (ไม่มีไฟล์ = ยังไม่เคยรัน)
+    """
+    if not os.path.exists(partial_path):
+        return {}
+    with open(partial_path, newline="") as f:
+        return {row["row_id"]: row["output"] for row in csv.DictReader(f)}
+
+def write_final_csv(partial_path: str, output_path: str, order: List[str]) -> None:
+    """
+    อ่านแถวจากไฟล์ .partial แล้วเขียนไฟล์จริงตามลำดับวิดีโอ (เขียนไฟล์ชั่วคราวก่อน แล้ว os.replace)
+    """
+    rows = read_partial_rows(partial_path)
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["row_id", "output"])
+        for row_id in order:
+            writer.writerow([row_id, rows.get(row_id, "")])
+    os.replace(tmp_path, output_path)
+
+def main():
+    print("Starting Submission Script...")
+    if not os.path.isdir(VIDEO_DIR):
+        print(f"!!! ข้อผิดพลาด: ไม่พบโฟลเดอร์ {VIDEO_DIR}")
+        return
+    videos = list_videos(VIDEO_DIR)
+    if not videos:
+        print(f"!!! ข้อผิดพลาด: ไม่พบไฟล์ .mp4 ใน {VIDEO_DIR}")
+        return
+    os.makedirs(os.path.dirname(OUTPUT_CSV) or ".", exist_ok=True)
+
+    partial_path = OUTPUT_CSV + ".partial"
+    finished = read_partial_rows(partial_path)
+    pending = [path for path in videos if os.path.basename(path) not in finished]
+    if finished:
+        print(f"Resuming: {len(finished)} videos already done, {len(pending)} left")
+
+    num_workers = max(1, min(NUM_WORKERS, len(pending)))
+    print(f"{len(pending)} videos, {num_workers} workers x {TORCH_THREADS_PER_WORKER} torch threads")
+
+    start = time.perf_counter()
+    total_frames = 0
+    failed = []
+    # 'spawn': Worker ไม่สืบทอด State ของ PyTorch/OpenCV จาก Process หลัก
+    context = multiprocessing.get_context("spawn")
+    with open(partial_path, "a", newline="") as partial_file, \
+            ProcessPoolExecutor(max_workers=num_workers, mp_context=context, initializer=_init_worker) as pool:
+        writer = csv.writer(partial_file)
+        if partial_file.tell() == 0: # ไฟล์ใหม่ (หรือรันก่อนหน้าล้มเหลวทุกวิดีโอ -> มีแค่ Header อยู่แล้ว)
+            writer.writerow(["row_id", "output"])
+            partial_file.flush()
+
+        futures = {pool.submit(process_video, path): path for path in pending}
+        for done, future in enumerate(as_completed(futures), start=len(finished) + 1):
+            row_id, pgn, wall_s, frames, error = future.result()
+            total_frames += frames
+            if error:
+                # ไม่บันทึกแถว -> ไม่ถูกนับว่าเสร็จตอน Resume
+                failed.append(row_id)
+                print(f"!!! [{done}/{len(videos)}] {row_id}: failed after {wall_s:.1f}s ({error})")
+            else:
+                writer.writerow([row_id, pgn])
+                partial_file.flush()
+                fps = frames / wall_s if wall_s > 0 else 0.0
+                print(f"✅ [{done}/{len(videos)}] {row_id}: {wall_s:.1f}s, {frames} frames, {fps:.1f} fps")
+
+    write_final_csv(partial_path, OUTPUT_CSV, [os.path.basename(path) for path in videos])
+    if failed:
+        # เก็บ .partial ไว้: รันใหม่จะทำเฉพาะวิดีโอที่ล้มเหลว
+        print(f"!!! {len(failed)} videos failed (empty output): {', '.join(sorted(failed))} "
+              f"-> run again to retry them")
+    else:
+        os.remove(partial_path)
+    total_s = time.perf_counter() - start
+    print(f"\n--- Done: {len(videos)} videos in {total_s:.1f}s "
+          f"({total_frames / total_s if total_s > 0 else 0.0:.1f} frames/s overall) ---")
+    print(f"✅ Submission saved to: {OUTPUT_CSV}")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@
 - วน Loop อ่านภาพจาก data/raw/images/[train/val/test]/
 - บันทึก Crop ลงใน data/processed/occupancy/[train/val/test]/
 - "Auto-label" ภาพทั้งหมดโดยใช้กฎ 'starting position'
+- [UPDATE] ตัดช่องด้วย crop_square_batch (เหมือน StateRecognizer) กัน Train/Serve Skew
 """
 import cv2
 import sys
@@ -18,6 +19,7 @@ import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.pipeline.s1_board_locator import BoardLocator
+from src.pipeline.state_recognizer import StateRecognizer
 from src.utils import image_utils
 from src.core.exceptions import BoardNotFoundException
 
@@ -57,6 +59,9 @@ def main():
         print(f"\n--- กำลังประมวลผล Split '{split}' ({len(image_names)} ภาพ) ---")
         split_img_counter = 0
 
+        # 2. อ่านภาพทั้งหมดของ Split นี้
+        images = []
+        valid_names = []
         for img_name in image_names:
             img_path = os.path.join(current_raw_dir, img_name)
             image = cv2.imread(img_path)
@@ -64,15 +69,25 @@ def main():
             if image is None:
                 print(f"❌ ไม่สามารถอ่าน: {img_name}")
                 continue
+            images.append(image)
+            valid_names.append(img_name)
 
+        # 3. [NEW] รัน State 1 (Warp & Rotate) ทุกภาพพร้อมกันด้วย Thread Pool
+        results = locator.find_and_warp_many(images)
+
+        for img_name, result in zip(valid_names, results):
             print(f"   Processing: {img_name}...")
 
             try:
-                # 3. รัน State 1 (Warp & Rotate)
-                warped_board, _ = locator.find_and_warp(image)
+                if not result.ok:
+                    raise result.error
+                warped_board = result.warped_image
 
                 # 4. ตัด 64 ช่อง
-                squares = image_utils.crop_squares_from_warped(warped_board, context_ratio=0.5)
+                # [UPDATE] ใช้ crop_square_batch เดียวกับตอน Inference (ช่องขอบ Pad แบบ Replicate ขนาดเท่าช่องใน)
+                squares = image_utils.crop_square_batch(
+                    warped_board, padding_ratio=StateRecognizer.OCCUPANCY_CONTEXT_RATIO
+                )
 
                 # 5. "ติดป้าย" (Label) อัตโนมัติ และบันทึก
                 for i, sq_img in enumerate(squares):
@@ -99,6 +114,7 @@ def main():
 
         total_processed_images += split_img_counter
 
+    locator.close()
     print("-" * 30)
     print(f"บันทึกภาพ Occupancy ทั้งหมด {total_processed_images} ภาพ เรียบร้อย")
     print("ตอนนี้คุณพร้อมที่จะรัน 'scripts/train_occupancy.py' แล้ว!")
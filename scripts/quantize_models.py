@@ -0,0 +1,108 @@
+"""
+สคริปต์ Quantize โมเดล State 2/3 เป็น INT8 (Post-Training Quantization)
+
+[NEW]
+- Calibrate ด้วย Crop จาก data/processed/{occupancy,piece}/train (Eval Transform)
+- วัด Accuracy และ Latency เทียบกับ fp32 บน Val Split
+- บันทึก <checkpoint>.int8.ts เฉพาะเมื่อ Accuracy ลดลงไม่เกิน MAX_ACCURACY_DROP
+  (โหลดใช้ด้วย OccupancyModel/PieceModel(backend="int8"))
+"""
+import sys
+import os
+import torch
+from torch.utils.data import DataLoader
+from torchvision.datasets import ImageFolder
+
+# เพิ่ม src/ เข้าไปใน path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.occupancy.occupancy_lit_model import OccupancyLitModel
+from src.models.piece.piece_lit_model import PieceLitModel
+from src.models.piece.piece_student_lit_model import PieceStudentLitModel
+from src.data.occupancy_datamodule import OccupancyDataModule
+from src.data.piece_datamodule import PieceDataModule
+from src.inference.engines import artifact_path, model_input_size, TorchEngine, TorchScriptEngine
+from src.inference.export import save_torchscript
+from src.inference.quantization import quantize_model, evaluate_engine
+
+# --- ตั้งค่า ---
+STAGES = {
+    # ชื่อ: (คลาสโมเดล, คลาส DataModule, Checkpoint, โฟลเดอร์ข้อมูล)
+    "occupancy": (OccupancyLitModel, OccupancyDataModule,
+                  "models/occupancy/occupancy_model_best.ckpt", "data/processed/occupancy"),
+    "piece": (PieceLitModel, PieceDataModule,
+              "models/piece/piece_model_best.ckpt", "data/processed/piece"),
+    "piece_student": (PieceStudentLitModel, PieceDataModule,
+                      "models/piece/piece_student_best.ckpt", "data/processed/piece"),
+}
+BATCH_SIZE = 32
+CALIBRATION_BATCHES = 32     # จำนวน Batch ที่ใช้ Calibrate
+MAX_ACCURACY_DROP = 0.01     # Accuracy ลดได้ไม่เกิน 1 จุด (absolute)
+QUANTIZED_ENGINE = "x86"     # "qnnpack" สำหรับเครื่อง ARM
+
+def quantize_stage(name: str, lit_model_cls, datamodule_cls, checkpoint_path: str, data_dir: str) -> bool:
+    print(f"\n--- Quantizing {name} model ---")
+    train_root = os.path.join(data_dir, "train")
+    if not os.path.exists(checkpoint_path):
+        print(f"!!! ข้อผิดพลาด: ไม่พบ Checkpoint {checkpoint_path}")
+        return False
+    if not os.path.exists(train_root):
+        print(f"!!! ข้อผิดพลาด: ไม่พบโฟลเดอร์ {train_root}")
+        return False
+
+    model = lit_model_cls.load_from_checkpoint(checkpoint_path, map_location="cpu").eval()
+    input_size = model_input_size(model)
+
+    # 1. ข้อมูล: Calibrate ด้วย Train (ไม่มี Augmentation), วัดผลด้วย Val
+    datamodule = datamodule_cls(data_dir=data_dir, batch_size=BATCH_SIZE, input_size=input_size)
+    datamodule.setup()
+    calibration_set = ImageFolder(root=train_root, transform=datamodule.eval_transform)
+    calibration_loader = DataLoader(calibration_set, batch_size=BATCH_SIZE, shuffle=True,
+                                    generator=torch.Generator().manual_seed(0))
+    val_loader = datamodule.val_dataloader()
+    if val_loader is None:
+        print("!!! ข้อผิดพลาด: ไม่พบ Val Split สำหรับ Accuracy Gate")
+        return False
+
+    # 2. fp32 Baseline (CPU เพื่อเทียบ Latency กันตรงๆ)
+    fp32 = evaluate_engine(TorchEngine(model, torch.device("cpu")), val_loader)
+
+    # 3. Quantize + วัดผล
+    quantized = quantize_model(model, calibration_loader, input_size,
+                               max_batches=CALIBRATION_BATCHES, backend=QUANTIZED_ENGINE)
+    output_path = artifact_path(checkpoint_path, "int8")
+    tmp_path = output_path + ".tmp"
+    save_torchscript(quantized, tmp_path, input_size)
+    int8 = evaluate_engine(TorchScriptEngine(tmp_path, torch.device("cpu")), val_loader)
+
+    # 4. Report
+    drop = fp32["accuracy"] - int8["accuracy"]
+    print(f"fp32: acc={fp32['accuracy']:.4f}, latency={fp32['latency_ms']:.2f} ms/crop")
+    print(f"int8: acc={int8['accuracy']:.4f}, latency={int8['latency_ms']:.2f} ms/crop "
+          f"(x{fp32['latency_ms'] / max(int8['latency_ms'], 1e-9):.2f})")
+    print(f"Accuracy drop: {drop:+.4f} (limit {MAX_ACCURACY_DROP})")
+
+    # 5. Accuracy Gate
+    if drop > MAX_ACCURACY_DROP:
+        os.remove(tmp_path)
+        print(f"❌ Rejected: INT8 {name} model ไม่ผ่าน Accuracy Gate (ไม่บันทึก)")
+        return False
+    os.replace(tmp_path, output_path)
+    print(f"✅ Saved INT8 model to: {output_path}")
+    return True
+
+def main():
+    print("Starting Model Quantization Script...")
+    results = {
+        name: quantize_stage(name, *config)
+        for name, config in STAGES.items()
+    }
+
+    print("\n--- Quantization Summary ---")
+    for name, accepted in results.items():
+        print(f"{name}: {'✅ ACCEPTED' if accepted else '❌ REJECTED / SKIPPED'}")
+    if not all(results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
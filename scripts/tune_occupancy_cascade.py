@@ -0,0 +1,99 @@
+"""
+สคริปต์ปรับ Threshold ของโหมด Cascade (OccupancyModel(cascade=True))
+
+[NEW]
+- คำนวณ Edge Density ของทุกภาพใน Val Split (data/processed/occupancy/val)
+- รัน CNN ทุกภาพครั้งเดียว แล้วจำลอง Cascade ที่ Threshold ต่างๆ
+- รายงานจำนวนช่องที่แต่ละ Tier ตัดสิน และ Accuracy เทียบกับ CNN อย่างเดียว (val_acc)
+"""
+import sys
+import os
+import cv2
+import numpy as np
+
+# เพิ่ม src/ เข้าไปใน path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline.s2_occupancy_model import OccupancyModel
+from src.utils import image_utils
+
+# --- ตั้งค่า ---
+VAL_DIR = "data/processed/occupancy/val"
+MODEL_CHECKPOINT_PATH = "models/occupancy/occupancy_model_best.ckpt"
+EMPTY_THRESHOLDS = [0.0, 0.002, 0.005, 0.01, 0.02, 0.03]
+OCCUPIED_THRESHOLDS = [0.10, 0.15, 0.20, 0.25, 0.30, 1.01] # 1.01 = ไม่ตัดสิน "มีหมาก" แบบ Classical
+MAX_ACCURACY_DROP = 0.002 # Accuracy ที่ยอมให้ลดลงจาก CNN อย่างเดียว
+BATCH_SIZE = 64
+
+def load_val_crops(val_dir: str, size: int, center_fraction: float, edge_threshold: float):
+    """
+    โหลดภาพ Val แบบ ImageFolder (โฟลเดอร์เรียงตามชื่อ -> label 0, 1)
+    [UPDATE] Edge Density คำนวณจากภาพขนาดเดิม (ขนาด Crop ตอน Runtime) ก่อน Resize เป็น size สำหรับ CNN
+    """
+    classes = sorted(d for d in os.listdir(val_dir) if os.path.isdir(os.path.join(val_dir, d)))
+    images, labels, density = [], [], []
+    for label, name in enumerate(classes):
+        class_dir = os.path.join(val_dir, name)
+        for filename in sorted(os.listdir(class_dir)):
+            image = cv2.imread(os.path.join(class_dir, filename))
+            if image is None:
+                continue
+            density.append(image_utils.square_edge_density(
+                image[None], center_fraction=center_fraction, edge_threshold=edge_threshold
+            )[0])
+            images.append(cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA))
+            labels.append(label)
+    print(f"Loaded {len(images)} val crops, classes: {classes}")
+    return np.stack(images), np.array(labels), np.array(density, dtype=np.float32)
+
+def main():
+    print("Starting Occupancy Cascade Tuning Script...")
+    if not os.path.exists(VAL_DIR):
+        print(f"!!! ข้อผิดพลาด: ไม่พบโฟลเดอร์ {VAL_DIR}")
+        return
+
+    model = OccupancyModel(MODEL_CHECKPOINT_PATH)
+    if model.use_dummy:
+        print("!!! ข้อผิดพลาด: โหลดโมเดลไม่สำเร็จ")
+        return
+
+    crops, labels, density = load_val_crops(
+        VAL_DIR, model.input_size,
+        center_fraction=model.cascade_center_fraction,
+        edge_threshold=model.cascade_edge_threshold
+    )
+    cnn_preds = np.concatenate([
+        model.predict_indices(crops[i:i + BATCH_SIZE])
+        for i in range(0, len(crops), BATCH_SIZE)
+    ])
+    cnn_acc = float((cnn_preds == labels).mean())
+    print(f"\nCNN only: val_acc={cnn_acc:.4f}")
+
+    print(f"\n{'empty_th':>9} {'occ_th':>7} | {'empty':>6} {'occ':>6} {'cnn':>6} | {'tier1_acc':>9} {'acc':>7}")
+    best = None
+    for empty_th in EMPTY_THRESHOLDS:
+        for occ_th in OCCUPIED_THRESHOLDS:
+            if empty_th >= occ_th:
+                continue
+            is_empty = density <= empty_th
+            is_occupied = density >= occ_th
+            classical = is_empty | is_occupied
+
+            preds = np.where(is_occupied, 1, np.where(is_empty, 0, cnn_preds))
+            acc = float((preds == labels).mean())
+            tier1_acc = float((preds[classical] == labels[classical]).mean()) if classical.any() else float("nan")
+            print(f"{empty_th:>9.3f} {occ_th:>7.2f} | {int(is_empty.sum()):>6} {int(is_occupied.sum()):>6} "
+                  f"{int((~classical).sum()):>6} | {tier1_acc:>9.4f} {acc:>7.4f}")
+
+            if acc >= cnn_acc - MAX_ACCURACY_DROP and (best is None or classical.sum() > best[2]):
+                best = (empty_th, occ_th, int(classical.sum()), acc)
+
+    if best is None:
+        print("\nไม่มี Threshold ที่รักษา Accuracy ได้ -> ไม่แนะนำให้ใช้ Cascade")
+    else:
+        empty_th, occ_th, covered, acc = best
+        print(f"\n✅ แนะนำ: empty_threshold={empty_th}, occupied_threshold={occ_th} "
+              f"(Classical ตัดสิน {covered}/{len(labels)} ภาพ, acc={acc:.4f})")
+
+if __name__ == "__main__":
+    main()
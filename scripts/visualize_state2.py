@@ -95,9 +95,9 @@ def main():
             ax_warped.axis("off")
 
             # --- รัน State 2 ---
-            squares = image_utils.crop_squares_from_warped(
-                warped_board, 
-                context_ratio=0.5 
+            squares = image_utils.crop_square_batch(
+                warped_board,
+                padding_ratio=0.5 # เหมือน StateRecognizer.OCCUPANCY_CONTEXT_RATIO
             )
             occupancy_grid = occupancy_model.predict(squares)
             print(f"State 2: ทำนาย Occupancy สำเร็จ (ใช้ Dummy: {USE_DUMMY_MODEL})")
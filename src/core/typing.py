@@ -11,6 +11,7 @@ ImageRGB = np.ndarray         # ภาพสำหรับ PyTorch (channels RG
 WarpedImage = np.ndarray      # ภาพกระดานที่ถูก warp แล้ว
 HomographyMatrix = np.ndarray # 3x3 matrix
 SquareImage = np.ndarray      # ภาพ 1 ช่องที่ถูกตัดออกมา
+SquareBatch = np.ndarray      # [NEW] ภาพทุกช่องใน Array เดียว (N, H, W, 3) uint8 BGR
 
 # ประเภทของข้อมูลประมวลผล
 LineSegment = Tuple[int, int, int, int] 
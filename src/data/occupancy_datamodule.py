@@ -16,14 +16,17 @@ from typing import Optional
 import os
 
 class OccupancyDataModule(pl.LightningDataModule):
-    def __init__(self, data_dir: str, batch_size: int = 32):
+    def __init__(self, data_dir: str, batch_size: int = 32, input_size: int = 100):
+        """
+        :param input_size: [NEW] ขนาดภาพ (Paper ใช้ 100x100)
+        """
         super().__init__()
         self.data_dir = data_dir
         self.batch_size = batch_size
 
         # 1. [Heavy Augmentation] สำหรับ Training
         self.train_transform = T.Compose([
-            T.Resize((100, 100)),
+            T.Resize((input_size, input_size)),
             # --- Augmentations ---
             T.RandomHorizontalFlip(p=0.5),
             T.RandomRotation(degrees=15),
@@ -36,7 +39,7 @@ class OccupancyDataModule(pl.LightningDataModule):
 
         # 2. Transform ธรรมดาสำหรับ Validation/Test
         self.eval_transform = T.Compose([
-            T.Resize((100, 100)),
+            T.Resize((input_size, input_size)),
             T.ToTensor(),
             T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
         ])
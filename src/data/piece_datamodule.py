@@ -16,13 +16,16 @@ from typing import Optional
 import os
 
 class PieceDataModule(pl.LightningDataModule):
-    def __init__(self, data_dir: str, batch_size: int = 32):
+    def __init__(self, data_dir: str, batch_size: int = 32, input_size: int = 299):
+        """
+        :param input_size: [NEW] ขนาดภาพ (InceptionV3 = 299, Student ใช้ค่าที่เล็กกว่าได้)
+        """
         super().__init__()
         self.data_dir = data_dir
         self.batch_size = batch_size
 
         # InceptionV3 ต้องการ Input 299x299
-        INPUT_SIZE = (299, 299)
+        INPUT_SIZE = (input_size, input_size)
 
         # 1. [Heavy Augmentation] สำหรับ Training
         self.train_transform = T.Compose([
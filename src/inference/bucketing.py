@@ -0,0 +1,113 @@
+"""
+[NEW FILE]
+Shape-bucketed Batching
+
+จำนวนช่องที่มีหมากต่อเฟรมเปลี่ยนได้ตั้งแต่ 2-32 -> Batch size ใหม่ทุกครั้ง = Allocation ใหม่
+และ Kernel/Graph ใหม่ (Backend แบบ Export ต้องการ Shape คงที่)
+BucketedBatcher ปัด Batch ขึ้นเป็นขนาดคงที่ไม่กี่ขนาด ใช้ Input Buffer ที่จองไว้ซ้ำ
+และเก็บสถิติ Latency แยกตาม Bucket
+"""
+import time
+import torch
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from src.inference.engines import InferenceEngine
+
+@dataclass
+class BucketStats:
+    """สถิติสะสมของ Bucket หนึ่งขนาด"""
+    size: int
+    calls: int = 0
+    items: int = 0       # จำนวนภาพจริง (ไม่นับ Padding)
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    @property
+    def fill_ratio(self) -> float:
+        """สัดส่วนของ Slot ที่เป็นภาพจริง (1.0 = ไม่มี Padding)"""
+        return self.items / (self.calls * self.size) if self.calls else 0.0
+
+class BucketedBatcher:
+    """
+    รัน Engine ด้วย Batch ที่ปัดขึ้นเป็นขนาดใน bucket_sizes เสมอ
+    """
+    def __init__(self, engine: InferenceEngine, input_size: int, device: torch.device, num_classes: int,
+                 bucket_sizes: Sequence[int] = (4, 8, 16, 32)):
+        """
+        :param input_size: ขนาดภาพ Input (S x S)
+        :param device: device ของ Input Buffer (device เดียวกับ Preprocessor)
+        :param num_classes: จำนวนคลาสของ Logits (ใช้สร้าง Output ว่างเมื่อ Batch ไม่มีภาพ)
+        :param bucket_sizes: ขนาด Batch ที่อนุญาต (Batch ที่ใหญ่กว่าขนาดสูงสุดจะถูกแบ่งเป็นหลายรอบ)
+        """
+        if not bucket_sizes or min(bucket_sizes) < 1:
+            raise ValueError("bucket_sizes must contain positive sizes")
+        self.engine = engine
+        self.input_size = input_size
+        self.device = device
+        self.num_classes = num_classes
+        self.bucket_sizes = sorted(set(int(b) for b in bucket_sizes))
+        self._buffers: Dict[int, torch.Tensor] = {} # จองเมื่อใช้ Bucket นั้นครั้งแรก
+        self.stats: Dict[int, BucketStats] = {b: BucketStats(size=b) for b in self.bucket_sizes}
+
+    def bucket_for(self, count: int) -> int:
+        """Bucket ที่เล็กที่สุดที่รับ count ภาพได้ (หรือขนาดสูงสุด)"""
+        for size in self.bucket_sizes:
+            if size >= count:
+                return size
+        return self.bucket_sizes[-1]
+
+    def _buffer(self, size: int) -> torch.Tensor:
+        buffer = self._buffers.get(size)
+        if buffer is None:
+            buffer = torch.zeros(size, 3, self.input_size, self.input_size, device=self.device)
+            self._buffers[size] = buffer
+        return buffer
+
+    def _run_bucket(self, batch: torch.Tensor) -> torch.Tensor:
+        count = batch.shape[0]
+        size = self.bucket_for(count)
+        buffer = self._buffer(size)
+        buffer[:count].copy_(batch)
+        # Slot ที่เหลือคงค่าเดิมไว้ (โมเดลอยู่ใน eval mode -> แต่ละภาพไม่กระทบกัน) แล้วตัดทิ้งหลังรัน
+
+        start = time.perf_counter()
+        logits = self.engine(buffer)[:count]
+        if logits.is_cuda:
+            torch.cuda.synchronize(logits.device)
+        elapsed_ms = 1000.0 * (time.perf_counter() - start)
+
+        stats = self.stats[size]
+        stats.calls += 1
+        stats.items += count
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        return logits
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Input: (N, 3, S, S) ที่ Preprocess แล้ว -> Output: Logits (N, C)
+        Batch ว่าง (N = 0) -> (0, C) โดยไม่เรียก Engine
+        """
+        if len(batch) == 0:
+            return torch.empty(0, self.num_classes, device=self.device)
+        max_size = self.bucket_sizes[-1]
+        chunks: List[torch.Tensor] = [
+            self._run_bucket(batch[i:i + max_size])
+            for i in range(0, batch.shape[0], max_size)
+        ]
+        return chunks[0] if len(chunks) == 1 else torch.cat(chunks)
+
+    def reset_stats(self) -> None:
+        self.stats = {b: BucketStats(size=b) for b in self.bucket_sizes}
+
+    def summary(self) -> str:
+        """สรุปสถิติของแต่ละ Bucket (สำหรับ print)"""
+        lines = [f"{'bucket':>6} {'calls':>6} {'fill':>6} {'mean_ms':>8} {'max_ms':>8}"]
+        for size, s in self.stats.items():
+            lines.append(f"{size:>6} {s.calls:>6} {s.fill_ratio:>6.0%} {s.mean_ms:>8.2f} {s.max_ms:>8.2f}")
+        return "\n".join(lines)
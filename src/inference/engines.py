@@ -0,0 +1,168 @@
+"""
+[NEW FILE]
+Inference Engine: ตัวรันโมเดล S2/S3 ที่สลับ Backend ได้
+
+- "torch"         : LightningModule แบบ Eager (เหมือนเดิม)
+- "torch_compile" : LightningModule + torch.compile
+- "torchscript"   : ไฟล์ .ts ที่ Export ไว้ (torch.jit)
+- "onnx"          : ไฟล์ .onnx ที่ Export ไว้ รันด้วย ONNX Runtime
+- "int8"          : TorchScript ที่ Quantize เป็น INT8 แล้ว (.int8.ts, รันบน CPU เท่านั้น)
+
+ทุก Engine รับ Tensor (N, 3, S, S) ที่ Preprocess แล้ว และคืน Logits (N, C) เป็น Tensor
+"""
+import abc
+import os
+import torch
+import numpy as np
+from typing import Optional, Type
+
+import pytorch_lightning as pl
+
+BACKENDS = ("torch", "torch_compile", "torchscript", "onnx", "int8")
+
+# นามสกุลไฟล์ Artifact ของแต่ละ Backend (Backend ที่ไม่อยู่ในนี้ใช้ .ckpt)
+ARTIFACT_SUFFIXES = {
+    "torchscript": ".ts",
+    "onnx": ".onnx",
+    "int8": ".int8.ts",
+}
+
+def artifact_path(checkpoint_path: str, backend: str) -> str:
+    """
+    Path ของ Artifact ที่ Export จาก Checkpoint (อยู่ข้างกัน เปลี่ยนแค่นามสกุล)
+    เช่น models/occupancy/best.ckpt -> models/occupancy/best.onnx
+    """
+    suffix = ARTIFACT_SUFFIXES.get(backend)
+    if suffix is None:
+        return checkpoint_path
+    if checkpoint_path.endswith(suffix):
+        return checkpoint_path
+    root, _ = os.path.splitext(checkpoint_path)
+    return root + suffix
+
+
+def model_input_size(model: torch.nn.Module) -> Optional[int]:
+    """
+    ขนาด Input ของ LightningModule: hparams/attribute input_size (เช่น Student) หรือ INPUT_SIZE ของคลาส
+    """
+    size = getattr(model, "input_size", None) or getattr(model, "INPUT_SIZE", None)
+    return int(size) if size is not None else None
+
+
+class InferenceEngine(abc.ABC):
+    """
+    Base class: เรียกใช้เหมือนโมเดล -> engine(batch) คืน Logits
+    (Abstract: Subclass ต้อง Implement __call__)
+    """
+    backend = "base"
+
+    def __init__(self, device: torch.device):
+        self.device = device
+        # ขนาด Input ที่อ่านได้จาก Checkpoint/Artifact (None = ไม่ทราบ)
+        self.input_size: Optional[int] = None
+
+    @abc.abstractmethod
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        """Batch (N, 3, S, S) ที่ Preprocess แล้ว -> Logits (N, C)"""
+
+
+class TorchEngine(InferenceEngine):
+    """
+    รัน nn.Module ด้วย PyTorch (Eager หรือ torch.compile)
+    """
+    def __init__(self, module: torch.nn.Module, device: torch.device, compile: bool = False):
+        super().__init__(device)
+        self.module = module.to(device).eval()
+        self.backend = "torch_compile" if compile else "torch"
+        self._forward = torch.compile(self.module) if compile else self.module
+        self.input_size = model_input_size(module)
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            return self._forward(batch)
+
+
+class TorchScriptEngine(InferenceEngine):
+    """
+    รันไฟล์ TorchScript (.ts) ที่ Freeze แล้ว
+    """
+    backend = "torchscript"
+
+    def __init__(self, path: str, device: torch.device):
+        super().__init__(device)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"TorchScript artifact not found at {path}")
+        extra_files = {"input_size": ""} # บันทึกไว้ตอน Export (export.save_torchscript)
+        module = torch.jit.load(path, map_location=device, _extra_files=extra_files).eval()
+        self.module = torch.jit.optimize_for_inference(module)
+        if extra_files["input_size"]:
+            self.input_size = int(extra_files["input_size"])
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.module(batch.to(self.device))
+
+
+class OnnxRuntimeEngine(InferenceEngine):
+    """
+    รันไฟล์ ONNX (.onnx) ด้วย ONNX Runtime (import เมื่อใช้งานจริงเท่านั้น)
+    """
+    backend = "onnx"
+
+    def __init__(self, path: str, device: torch.device, num_threads: Optional[int] = None):
+        """
+        :param num_threads: จำนวน Thread ภายใน Operator (None = ค่า Default ของ ONNX Runtime)
+        """
+        super().__init__(device)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("backend='onnx' ต้องติดตั้ง onnxruntime (pip install onnxruntime)") from e
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"ONNX artifact not found at {path}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+
+        providers = ["CPUExecutionProvider"]
+        if device.type == "cuda" and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+
+        self.session = ort.InferenceSession(path, sess_options=options, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Shape (batch, 3, H, W): มีแค่มิติ batch ที่เป็น Dynamic
+        if isinstance(model_input.shape[-1], int):
+            self.input_size = model_input.shape[-1]
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        inputs = np.ascontiguousarray(batch.detach().cpu().numpy(), dtype=np.float32)
+        logits = self.session.run(None, {self.input_name: inputs})[0]
+        return torch.from_numpy(logits)
+
+
+def load_engine(backend: str, lit_model_cls: Type[pl.LightningModule], model_path: str,
+                device: torch.device) -> InferenceEngine:
+    """
+    สร้าง Engine ตาม Backend ที่เลือก
+
+    :param lit_model_cls: คลาส LightningModule (ใช้กับ Backend "torch" / "torch_compile")
+    :param model_path: Checkpoint (.ckpt) หรือ Artifact ที่ Export แล้ว
+                       (ถ้าเป็น .ckpt จะหา Artifact ข้างกันตามนามสกุลของ Backend)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+
+    if backend in ("torch", "torch_compile"):
+        model = lit_model_cls.load_from_checkpoint(checkpoint_path=model_path, map_location=device)
+        return TorchEngine(model, device, compile=(backend == "torch_compile"))
+
+    path = artifact_path(model_path, backend)
+    if backend == "torchscript":
+        return TorchScriptEngine(path, device)
+    if backend == "int8":
+        # Quantized kernels (fbgemm/qnnpack) มีเฉพาะบน CPU
+        return TorchScriptEngine(path, torch.device("cpu"))
+    return OnnxRuntimeEngine(path, device)
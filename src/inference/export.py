@@ -0,0 +1,102 @@
+"""
+[NEW FILE]
+Export Checkpoint (.ckpt) -> TorchScript (.ts) / ONNX (.onnx)
+พร้อม Parity Check เทียบกับโมเดล Eager บนชุด Crop ตายตัว
+"""
+import os
+import cv2
+import numpy as np
+import torch
+import pytorch_lightning as pl
+from typing import Any, Dict, List, Optional
+
+from src.core.typing import SquareBatch
+from src.inference.engines import InferenceEngine, TorchEngine
+from src.utils.tensor_utils import BatchPreprocessor
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+def save_torchscript(module: torch.jit.ScriptModule, path: str, input_size: int) -> str:
+    """
+    บันทึก TorchScript พร้อมขนาด Input (TorchScriptEngine อ่านกลับเป็น engine.input_size)
+    """
+    torch.jit.save(module, path, _extra_files={"input_size": str(input_size)})
+    return path
+
+def export_torchscript(model: pl.LightningModule, path: str, input_size: int) -> str:
+    """
+    Trace + Freeze โมเดล แล้วบันทึกเป็น TorchScript
+    """
+    model = model.cpu().eval()
+    example = torch.zeros(1, 3, input_size, input_size)
+    with torch.no_grad():
+        traced = model.to_torchscript(method="trace", example_inputs=example)
+        frozen = torch.jit.freeze(traced)
+    save_torchscript(frozen, path, input_size)
+    print(f"[Export] TorchScript -> {path}")
+    return path
+
+def export_onnx(model: pl.LightningModule, path: str, input_size: int, opset: int = 17) -> str:
+    """
+    Export โมเดลเป็น ONNX (มิติ Batch เป็น Dynamic)
+    """
+    model = model.cpu().eval()
+    example = torch.zeros(1, 3, input_size, input_size)
+    with torch.no_grad():
+        model.to_onnx(
+            path, example,
+            input_names=["input"], output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=opset,
+            dynamo=False,
+        )
+    print(f"[Export] ONNX -> {path}")
+    return path
+
+def load_parity_crops(crops_dir: Optional[str] = None, count: int = 32,
+                      crop_size: int = 150, seed: int = 0) -> SquareBatch:
+    """
+    ชุด Crop ตายตัวสำหรับ Parity Check -> (N, crop_size, crop_size, 3) BGR uint8
+
+    :param crops_dir: โฟลเดอร์ภาพ Crop จริง (ค้นหาแบบ recursive เรียงตามชื่อไฟล์)
+                      ถ้าไม่ระบุ/ไม่พบภาพ จะใช้ภาพสุ่มจาก seed ตายตัวแทน
+    """
+    paths: List[str] = []
+    if crops_dir and os.path.isdir(crops_dir):
+        for root, _, files in os.walk(crops_dir):
+            paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTENSIONS))
+        paths = sorted(paths)[:count]
+
+    crops = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is not None:
+            crops.append(cv2.resize(image, (crop_size, crop_size), interpolation=cv2.INTER_AREA))
+    if crops:
+        return np.stack(crops)
+
+    print("[Export] Warning: ไม่พบภาพ Crop จริง ใช้ภาพสุ่ม (seed ตายตัว) สำหรับ Parity Check")
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (count, crop_size, crop_size, 3), dtype=np.uint8)
+
+def check_parity(reference: InferenceEngine, candidate: InferenceEngine, crops: SquareBatch,
+                 input_size: int, atol: float = 1e-3) -> Dict[str, Any]:
+    """
+    เทียบ Logits ของ Engine ใหม่กับโมเดล Eager บน Crop ชุดเดียวกัน
+
+    :return: dict {max_abs_diff, argmax_agreement, passed}
+    """
+    batch = BatchPreprocessor(input_size, torch.device("cpu"))(crops)
+    expected = reference(batch.to(reference.device)).float().cpu()
+    actual = candidate(batch.to(candidate.device)).float().cpu()
+
+    max_abs_diff = float((expected - actual).abs().max())
+    agreement = float((expected.argmax(dim=1) == actual.argmax(dim=1)).float().mean())
+    passed = max_abs_diff <= atol and agreement == 1.0
+    print(f"[Parity] {candidate.backend}: max|diff|={max_abs_diff:.2e}, "
+          f"argmax agreement={agreement:.2%} -> {'PASS' if passed else 'FAIL'}")
+    return {"max_abs_diff": max_abs_diff, "argmax_agreement": agreement, "passed": passed}
+
+def eager_engine(model: torch.nn.Module) -> TorchEngine:
+    """Engine อ้างอิง (Eager บน CPU) สำหรับ Parity Check"""
+    return TorchEngine(model, torch.device("cpu"))
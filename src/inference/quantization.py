@@ -0,0 +1,69 @@
+"""
+[NEW FILE]
+Post-Training Quantization (INT8) ของโมเดล S2/S3
+
+1. FX Graph Mode: prepare_fx -> Calibrate ด้วย Crop จริง -> convert_fx
+2. Trace + Freeze เป็น TorchScript (.int8.ts) -> โหลดด้วย backend="int8"
+3. วัด Accuracy/Latency เทียบกับ fp32 บน Val Split (ใช้เป็น Accuracy Gate)
+"""
+import copy
+import time
+import torch
+import pytorch_lightning as pl
+from typing import Any, Dict, Optional
+from torch.utils.data import DataLoader
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+from src.inference.engines import InferenceEngine
+
+def quantize_model(model: pl.LightningModule, calibration_loader: DataLoader, input_size: int,
+                   max_batches: Optional[int] = 32, backend: str = "x86") -> torch.jit.ScriptModule:
+    """
+    Quantize backbone ของ LightningModule เป็น INT8 (Static, per-channel weights)
+
+    :param calibration_loader: DataLoader ของ Crop (Eval Transform) สำหรับเก็บช่วงค่า Activation
+    :param max_batches: จำนวน Batch สูงสุดที่ใช้ Calibrate (None = ทั้งหมด)
+    :param backend: Quantized engine ("x86" / "fbgemm" สำหรับ CPU x86, "qnnpack" สำหรับ ARM)
+    :return: TorchScript ที่ Freeze แล้ว (ทำงานบน CPU)
+    """
+    torch.backends.quantized.engine = backend
+    # forward() ของทั้ง 2 โมเดลคือ self.backbone(x)
+    backbone = copy.deepcopy(model.backbone).cpu().eval()
+    example = torch.zeros(1, 3, input_size, input_size)
+
+    prepared = prepare_fx(backbone, get_default_qconfig_mapping(backend), (example,))
+    with torch.no_grad():
+        for i, (images, _) in enumerate(calibration_loader):
+            if max_batches is not None and i >= max_batches:
+                break
+            prepared(images)
+
+    quantized = convert_fx(prepared)
+    with torch.no_grad():
+        traced = torch.jit.trace(quantized, example)
+        return torch.jit.freeze(traced)
+
+def evaluate_engine(engine: InferenceEngine, loader: DataLoader,
+                    max_batches: Optional[int] = None) -> Dict[str, Any]:
+    """
+    วัด Accuracy และ Latency (ms ต่อภาพ, เฉพาะ Forward) ของ Engine บน DataLoader
+    """
+    correct, total, elapsed = 0, 0, 0.0
+    for i, (images, labels) in enumerate(loader):
+        if max_batches is not None and i >= max_batches:
+            break
+        start = time.perf_counter()
+        logits = engine(images.to(engine.device))
+        preds = logits.argmax(dim=1).cpu()
+        elapsed += time.perf_counter() - start
+        correct += int((preds == labels).sum())
+        total += len(labels)
+
+    if total == 0:
+        raise ValueError("DataLoader ว่างเปล่า ไม่สามารถประเมินผลได้")
+    return {
+        "accuracy": correct / total,
+        "latency_ms": 1000.0 * elapsed / total,
+        "num_images": total,
+    }
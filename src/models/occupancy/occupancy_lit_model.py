@@ -15,6 +15,7 @@ class OccupancyLitModel(pl.LightningModule):
     """
     LightningModule สำหรับ Occupancy Classification (2 Classes: Empty, Occupied)
     """
+    INPUT_SIZE = 100 # ขนาด Input (ตรงกับ OccupancyDataModule)
     def __init__(self, learning_rate=1e-4):
         super().__init__()
         self.save_hyperparameters()
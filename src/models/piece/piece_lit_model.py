@@ -24,6 +24,7 @@ class PieceLitModel(pl.LightningModule):
     ]
     
     NUM_CLASSES = len(CLASSES) # 13
+    INPUT_SIZE = 299 # ขนาด Input ของ InceptionV3
 
     def __init__(self, learning_rate=1e-4):
         super().__init__()
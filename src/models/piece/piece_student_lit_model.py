@@ -0,0 +1,158 @@
+"""
+[NEW FILE]
+โมเดล Piece Classification ขนาดเล็ก (Student) สำหรับ Knowledge Distillation
+
+- เรียนจาก Soft Labels ของ PieceLitModel (InceptionV3, Teacher) ผสมกับ Label จริง
+- ใช้ Input ความละเอียดต่ำกว่า (input_size เก็บไว้ใน hparams ของ Checkpoint)
+- PieceModel โหลด Checkpoint นี้ได้โดยตรง (คลาสและ Output เหมือน PieceLitModel)
+"""
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torchvision.models as models
+import pytorch_lightning as pl
+import torchmetrics
+from typing import Callable, Dict, List, Optional
+
+from src.models.piece.piece_lit_model import PieceLitModel
+
+def _mobilenet_v3_small(num_classes: int) -> nn.Module:
+    backbone = models.mobilenet_v3_small(weights=models.MobileNet_V3_Small_Weights.IMAGENET1K_V1)
+    backbone.classifier[-1] = nn.Linear(backbone.classifier[-1].in_features, num_classes)
+    return backbone
+
+def _mobilenet_v3_large(num_classes: int) -> nn.Module:
+    backbone = models.mobilenet_v3_large(weights=models.MobileNet_V3_Large_Weights.IMAGENET1K_V1)
+    backbone.classifier[-1] = nn.Linear(backbone.classifier[-1].in_features, num_classes)
+    return backbone
+
+def _resnet18(num_classes: int) -> nn.Module:
+    backbone = models.resnet18(weights=models.ResNet18_Weights.IMAGENET1K_V1)
+    backbone.fc = nn.Linear(backbone.fc.in_features, num_classes)
+    return backbone
+
+class PieceStudentLitModel(pl.LightningModule):
+    """
+    LightningModule ของ Student (13 Classes เหมือน PieceLitModel)
+    """
+    CLASSES: List[str] = PieceLitModel.CLASSES
+    NUM_CLASSES = PieceLitModel.NUM_CLASSES
+    INPUT_SIZE = 160 # ค่าเริ่มต้น (ค่าจริงอยู่ใน hparams.input_size)
+
+    ARCHITECTURES: Dict[str, Callable[[int], nn.Module]] = {
+        "mobilenet_v3_small": _mobilenet_v3_small,
+        "mobilenet_v3_large": _mobilenet_v3_large,
+        "resnet18": _resnet18,
+    }
+
+    def __init__(self, learning_rate=1e-3, input_size: int = INPUT_SIZE,
+                 student_arch: str = "mobilenet_v3_small",
+                 temperature: float = 4.0, alpha: float = 0.7):
+        """
+        :param input_size: ขนาด Input ของ Student (PieceModel อ่านค่านี้จาก Checkpoint)
+        :param student_arch: สถาปัตยกรรมของ Student (ดู ARCHITECTURES)
+        :param temperature: Temperature ของ Soft Labels
+        :param alpha: น้ำหนักของ Distillation Loss (1 - alpha สำหรับ Cross-Entropy กับ Label จริง)
+        """
+        super().__init__()
+        if student_arch not in self.ARCHITECTURES:
+            raise ValueError(f"student_arch must be one of {list(self.ARCHITECTURES)}, got {student_arch!r}")
+        self.save_hyperparameters()
+        self.learning_rate = learning_rate
+        self.input_size = input_size
+        self.temperature = temperature
+        self.alpha = alpha
+
+        self.backbone = self.ARCHITECTURES[student_arch](self.NUM_CLASSES)
+        # Teacher ไม่ถูก Register เป็น Submodule -> ไม่ถูกบันทึกลง Checkpoint ของ Student
+        self._teacher: Optional[PieceLitModel] = None
+
+        self.criterion = nn.CrossEntropyLoss()
+        self.train_accuracy = torchmetrics.Accuracy(task="multiclass", num_classes=self.NUM_CLASSES)
+        self.val_accuracy = torchmetrics.Accuracy(task="multiclass", num_classes=self.NUM_CLASSES)
+        self.test_accuracy = torchmetrics.Accuracy(task="multiclass", num_classes=self.NUM_CLASSES)
+        # Agreement กับ Teacher (argmax ตรงกัน) ระหว่าง Validation
+        self.val_agreement = torchmetrics.Accuracy(task="multiclass", num_classes=self.NUM_CLASSES)
+
+    def set_teacher(self, teacher: PieceLitModel) -> None:
+        """
+        กำหนด Teacher (Frozen, eval mode) สำหรับการ Distill
+        """
+        teacher.eval()
+        teacher.requires_grad_(False)
+        object.__setattr__(self, "_teacher", teacher)
+
+    def on_fit_start(self) -> None:
+        if self._teacher is not None:
+            self._teacher.to(self.device)
+
+    def on_validation_start(self) -> None:
+        if self._teacher is not None:
+            self._teacher.to(self.device)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.backbone(x)
+
+    def _student_input(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        DataModule ส่งภาพขนาดของ Teacher (299) -> ย่อเป็น input_size ของ Student
+        (Antialias เหมือน BatchPreprocessor ตอน Inference)
+        """
+        if x.shape[-1] == self.input_size and x.shape[-2] == self.input_size:
+            return x
+        return F.interpolate(x, size=(self.input_size, self.input_size),
+                             mode="bilinear", align_corners=False, antialias=True)
+
+    def _teacher_logits(self, x: torch.Tensor) -> Optional[torch.Tensor]:
+        if self._teacher is None:
+            return None
+        with torch.no_grad():
+            return self._teacher(x)
+
+    def _distillation_loss(self, logits: torch.Tensor, teacher_logits: Optional[torch.Tensor],
+                           y: torch.Tensor) -> torch.Tensor:
+        hard_loss = self.criterion(logits, y)
+        if teacher_logits is None:
+            return hard_loss
+
+        t = self.temperature
+        soft_loss = F.kl_div(
+            F.log_softmax(logits / t, dim=1),
+            F.softmax(teacher_logits / t, dim=1),
+            reduction="batchmean"
+        ) * (t * t)
+        return self.alpha * soft_loss + (1 - self.alpha) * hard_loss
+
+    def _shared_step(self, batch, batch_idx):
+        x, y = batch
+        teacher_logits = self._teacher_logits(x)
+        logits = self.forward(self._student_input(x))
+        loss = self._distillation_loss(logits, teacher_logits, y)
+        preds = torch.argmax(logits, dim=1)
+        return loss, preds, y, teacher_logits
+
+    def training_step(self, batch, batch_idx):
+        loss, preds, y, _ = self._shared_step(batch, batch_idx)
+        acc = self.train_accuracy(preds, y)
+        self.log("train_loss", loss, on_step=True, on_epoch=True, prog_bar=True, logger=True)
+        self.log("train_acc", acc, on_step=False, on_epoch=True, prog_bar=True, logger=True)
+        return loss
+
+    def validation_step(self, batch, batch_idx):
+        loss, preds, y, teacher_logits = self._shared_step(batch, batch_idx)
+        acc = self.val_accuracy(preds, y)
+        self.log("val_loss", loss, on_step=False, on_epoch=True, prog_bar=True, logger=True)
+        self.log("val_acc", acc, on_step=False, on_epoch=True, prog_bar=True, logger=True)
+        if teacher_logits is not None:
+            agreement = self.val_agreement(preds, torch.argmax(teacher_logits, dim=1))
+            self.log("val_teacher_agreement", agreement, on_step=False, on_epoch=True, logger=True)
+
+    def test_step(self, batch, batch_idx):
+        loss, preds, y, _ = self._shared_step(batch, batch_idx)
+        acc = self.test_accuracy(preds, y)
+        self.log("test_loss", loss, on_step=False, on_epoch=True, prog_bar=True, logger=True)
+        self.log("test_acc", acc, on_step=False, on_epoch=True, prog_bar=True, logger=True)
+
+    def configure_optimizers(self):
+        optimizer = torch.optim.AdamW(self.backbone.parameters(), lr=self.learning_rate)
+        return optimizer
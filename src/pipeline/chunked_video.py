@@ -0,0 +1,167 @@
+"""
+[NEW FILE]
+ประมวลผลวิดีโอเดียวแบบขนาน: แบ่งเป็นช่วงเวลา (Chunk) ที่ซ้อนทับกัน แล้วต่อผลกลับ
+
+1. plan_chunks: แบ่งเฟรมของวิดีโอเป็น Chunk ที่ซ้อนกัน overlap เฟรม
+2. แต่ละ Worker Process รัน StreamingVideoPipeline กับ Chunk ของตัวเอง
+   -> ได้ลำดับตำแหน่งที่ยืนยันแล้ว (frame_index, placement จาก fen_utils.convert_grid_to_fen)
+3. stitch_positions: ในช่วงที่ซ้อนกัน หาตำแหน่งที่ทั้งสอง Chunk เห็นตรงกันเป็นจุดต่อ
+   (ไม่มีตำแหน่งตรงกัน -> ต่อที่กึ่งกลางช่วงซ้อน)
+4. positions_to_moves: Replay ลำดับตำแหน่งด้วย python-chess
+   ตำแหน่งที่ไม่มี Legal Move (สูงสุด 2 ตา) อธิบายได้จะถูกทิ้งเป็น Noise
+
+[UPDATE 1]:
+- จำนวนเฟรม (CAP_PROP_FRAME_COUNT) เป็นแค่ Metadata อาจไม่ตรงกับวิดีโอจริง:
+  Chunk สุดท้ายอ่านจนจบวิดีโอจริง และหลังรันตัดแต่ละ Chunk ให้จบที่เฟรมที่อ่านได้จริง
+  (Chunk ที่อ่านไม่ได้เลยจะถูกข้ามพร้อมคำเตือน)
+"""
+import multiprocessing
+import time
+import chess
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from src.pipeline.video_pipeline import StreamingVideoPipeline, VideoResult
+from src.utils.pgn_utils import find_move_sequence, moves_to_pgn
+from src.utils.video_utils import FrameReader
+
+Positions = List[Tuple[int, str]] # (frame_index, placement)
+
+@dataclass
+class VideoChunk:
+    """
+    ช่วงเฟรม [start_frame, end_frame) ของวิดีโอ (end_frame = None -> จนจบวิดีโอจริง)
+    """
+    index: int
+    start_frame: int
+    end_frame: Optional[int]
+
+def plan_chunks(frame_count: int, num_chunks: int, overlap_frames: int) -> List[VideoChunk]:
+    """
+    แบ่ง frame_count เฟรมเป็น num_chunks ช่วงยาวเท่าๆ กัน แต่ละช่วง (ยกเว้นช่วงแรก)
+    เริ่มก่อนจุดแบ่ง overlap_frames เฟรม (ซ้อนกับช่วงก่อนหน้า)
+    [UPDATE 1] ช่วงสุดท้ายไม่มี end_frame (frame_count จาก Metadata อาจน้อยกว่าจริง)
+    """
+    num_chunks = max(1, min(num_chunks, frame_count // max(overlap_frames, 1) or 1))
+    bounds = [round(i * frame_count / num_chunks) for i in range(num_chunks + 1)]
+    return [
+        VideoChunk(index=i, start_frame=max(bounds[i] - (overlap_frames if i else 0), 0),
+                   end_frame=bounds[i + 1] if i < num_chunks - 1 else None)
+        for i in range(num_chunks)
+    ]
+
+def stitch_positions(previous: Positions, current: Positions, overlap_start: int, overlap_end: int) -> Positions:
+    """
+    ต่อลำดับตำแหน่งของ Chunk ที่ติดกัน (previous จบที่ overlap_end, current เริ่มที่ overlap_start)
+    """
+    previous_overlap = {}
+    for frame, placement in previous:
+        if frame >= overlap_start:
+            previous_overlap.setdefault(placement, frame)
+    for i, (frame, placement) in enumerate(current):
+        if frame >= overlap_end:
+            break
+        if placement in previous_overlap:
+            # จุดต่อ: ตำแหน่งแรกใน current ที่ previous ก็เห็นในช่วงซ้อน
+            cut_frame = previous_overlap[placement]
+            return [p for p in previous if p[0] < cut_frame] + current[i:]
+
+    middle = (overlap_start + overlap_end) // 2
+    return [p for p in previous if p[0] < middle] + [p for p in current if p[0] >= middle]
+
+def positions_to_moves(positions: Positions, start_board: Optional[chess.Board] = None,
+                       max_plies: int = 2) -> List[chess.Move]:
+    """
+    Replay ลำดับตำแหน่งจาก start_board -> List ของ Legal Move
+    """
+    board = start_board.copy() if start_board is not None else chess.Board()
+    moves: List[chess.Move] = []
+    for frame, placement in positions:
+        if placement == board.board_fen():
+            continue
+        sequence = find_move_sequence(board, placement, max_plies)
+        if sequence is None:
+            print(f"Stitch: frame {frame} has no legal explanation -> skipped ({placement})")
+            continue
+        for move in sequence:
+            board.push(move)
+        moves.extend(sequence)
+    return moves
+
+# --- Worker Process ---
+_PIPELINE: Optional[StreamingVideoPipeline] = None
+
+def _init_worker(pipeline_factory: Callable[[], StreamingVideoPipeline]) -> None:
+    global _PIPELINE
+    _PIPELINE = pipeline_factory()
+
+def _run_chunk(video_path: str, chunk: VideoChunk) -> Tuple[int, Positions, int, int, int]:
+    result = _PIPELINE.run(video_path, start_frame=chunk.start_frame, end_frame=chunk.end_frame)
+    return chunk.index, result.positions, result.frames_decoded, result.frames_recognized, result.last_frame
+
+class ChunkedVideoRunner:
+    """
+    รันวิดีโอเดียวด้วยหลาย Process (Chunk ละ 1 งาน) แล้วต่อเป็น PGN เดียว
+    """
+    def __init__(self, pipeline_factory: Callable[[], StreamingVideoPipeline], num_workers: int = 4,
+                 overlap_seconds: float = 10.0, chunks_per_worker: int = 1):
+        """
+        :param pipeline_factory: ฟังก์ชันระดับ Module (Pickle ได้) ที่สร้าง StreamingVideoPipeline ใน Worker
+        :param num_workers: จำนวน Worker Process
+        :param overlap_seconds: ความยาวช่วงซ้อนระหว่าง Chunk (ควรยาวกว่าเวลาที่กระดานนิ่งระหว่างตาเดิน)
+        :param chunks_per_worker: แบ่ง Chunk มากกว่าจำนวน Worker เพื่อเกลี่ยงาน (Chunk ยากง่ายไม่เท่ากัน)
+        """
+        self.pipeline_factory = pipeline_factory
+        self.num_workers = num_workers
+        self.overlap_seconds = overlap_seconds
+        self.chunks_per_worker = chunks_per_worker
+
+    def run(self, video_path: str, start_board: Optional[chess.Board] = None) -> VideoResult:
+        reader = FrameReader(video_path)
+        fps, frame_count = reader.fps, reader.frame_count
+        reader.release()
+
+        overlap_frames = int(round(self.overlap_seconds * fps))
+        chunks = plan_chunks(frame_count, self.num_workers * self.chunks_per_worker, overlap_frames)
+        print(f"ChunkedVideoRunner: {frame_count} frames -> {len(chunks)} chunks "
+              f"({overlap_frames} frames overlap), {self.num_workers} workers")
+
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(self.num_workers, len(chunks)), mp_context=context,
+                                 initializer=_init_worker, initargs=(self.pipeline_factory,)) as pool:
+            results = list(pool.map(_run_chunk, [video_path] * len(chunks), chunks))
+
+        results.sort(key=lambda r: r[0])
+        # [UPDATE 1] ตัด Chunk ให้จบที่เฟรมที่อ่านได้จริง (Metadata อาจเกินความยาวจริง)
+        decoded = []
+        for chunk, (_, chunk_positions, chunk_frames, _, last_frame) in zip(chunks, results):
+            if chunk_frames == 0:
+                kind = "last chunk" if chunk is chunks[-1] else f"chunk {chunk.index}"
+                end = chunk.end_frame if chunk.end_frame is not None else "end"
+                print(f"!!! ChunkedVideoRunner: {kind} [{chunk.start_frame}, {end}) decoded no frames "
+                      f"(frame count metadata {frame_count} may be wrong) -> skipped")
+                continue
+            chunk.end_frame = last_frame + 1 if chunk.end_frame is None else min(chunk.end_frame, last_frame + 1)
+            decoded.append((chunk, chunk_positions))
+
+        positions: Positions = decoded[0][1] if decoded else []
+        for (previous, _), (chunk, chunk_positions) in zip(decoded, decoded[1:]):
+            overlap_end = min(chunk.start_frame + overlap_frames, previous.end_frame)
+            positions = stitch_positions(positions, chunk_positions, chunk.start_frame, max(overlap_end, chunk.start_frame))
+
+        moves = positions_to_moves(positions, start_board)
+        board = start_board.copy() if start_board is not None else chess.Board()
+        sans = []
+        for move in moves:
+            sans.append(board.san(move))
+            board.push(move)
+        wall_s = time.perf_counter() - start
+        frames = sum(r[2] for r in results)
+        last_frame = max((r[4] for r in results), default=-1)
+        print(f"ChunkedVideoRunner: {frames} frames (video ends at frame {last_frame}), "
+              f"{len(moves)} moves in {wall_s:.1f}s")
+        return VideoResult(pgn=moves_to_pgn(moves, start_board), moves=sans, positions=positions,
+                           frames_decoded=frames, frames_recognized=sum(r[3] for r in results), last_frame=last_frame,
+                           wall_s=wall_s)
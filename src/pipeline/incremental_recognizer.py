@@ -0,0 +1,148 @@
+"""
+[NEW FILE]
+Incremental Recognizer สำหรับวิดีโอ
+
+ระหว่างเกม มีเพียง 2-4 ช่องที่เปลี่ยนระหว่างตำแหน่งที่นิ่ง
+คลาสนี้เก็บผลของแต่ละช่อง (ในพิกัดกระดานที่ Warp แล้ว) จากเฟรมก่อนหน้า
+แล้วตรวจช่องที่เปลี่ยนด้วย Signature ขนาดเล็ก (image_utils.square_signatures)
+ส่งเฉพาะช่องเหล่านั้นเข้า S2/S3 และรัน Pipeline เต็มเป็นระยะเพื่อกัน Drift
+"""
+import numpy as np
+from typing import Dict, List, Optional
+
+from src.core.typing import ImageBGR, WarpedImage, PieceGrid
+from src.core.exceptions import BoardNotFoundException
+from src.pipeline.state_recognizer import StateRecognizer, BoardState
+from src.utils import image_utils, fen_utils
+
+class IncrementalRecognizer:
+    """
+    ห่อ StateRecognizer: รัน S1 ทุกเฟรม แต่รัน S2/S3 เฉพาะช่องที่เปลี่ยน
+    """
+    def __init__(self, recognizer: StateRecognizer, change_threshold: float = 12.0,
+                 signature_cells: int = 4, refresh_interval: int = 30, max_changed: int = 16):
+        """
+        :param recognizer: StateRecognizer ที่โหลดโมเดลแล้ว (ต้องไม่ใช้ direct_sampling)
+        :param change_threshold: ค่าต่างสูงสุด (ระดับเทา) ระหว่าง Cell ของ Signature ที่ถือว่าช่องเปลี่ยน
+                                 (ใช้ค่าสูงสุดแทนค่าเฉลี่ย เพราะหมากกินพื้นที่แค่บางส่วนของช่อง)
+        :param signature_cells: ความละเอียดของ Signature ต่อช่อง (cells x cells)
+        :param refresh_interval: รัน Pipeline เต็ม (64 ช่อง) ทุกๆ N เฟรม (0 = ไม่ Refresh อัตโนมัติ)
+        :param max_changed: ถ้าช่องเปลี่ยนมากกว่านี้ (เช่น กล้องขยับ/หมุนกระดาน) ให้รัน Pipeline เต็ม
+        """
+        if recognizer.direct_sampling:
+            raise ValueError("IncrementalRecognizer requires a StateRecognizer without direct_sampling")
+        self.recognizer = recognizer
+        self.change_threshold = change_threshold
+        self.signature_cells = signature_cells
+        self.refresh_interval = refresh_interval
+        self.max_changed = max_changed
+
+        self.last_stats: Dict[str, object] = {}
+        self.total_stats = {"frames": 0, "full": 0, "s2_crops": 0, "s3_crops": 0}
+        self.reset()
+
+    def reset(self) -> None:
+        """ล้างผลที่เก็บไว้ (เฟรมถัดไปจะรัน Pipeline เต็ม)"""
+        self._piece_grid: Optional[PieceGrid] = None
+        # Signature ของแต่ละช่อง ณ เวลาที่ทำนายช่องนั้นล่าสุด (ไม่ใช่เฟรมก่อนหน้า -> กัน Drift สะสม)
+        self._reference: Optional[np.ndarray] = None
+        self._frames_since_refresh = 0
+
+    def recognize(self, image: ImageBGR) -> Optional[BoardState]:
+        """
+        Main method (เหมือน StateRecognizer.recognize)
+        """
+        try:
+            # === STATE 1: BOARD LOCALISATION ===
+            warped_board, _ = self.recognizer.locator.find_and_warp(image)
+            return self.recognize_warped(warped_board)
+        except BoardNotFoundException as e:
+            print(f"!!! Pipeline Error (S1): {e}")
+            return None
+        except Exception as e:
+            print(f"!!! Pipeline Error (S2/S3/FEN): {e}")
+            return None
+
+    def _changed_squares(self, signatures: np.ndarray) -> np.ndarray:
+        diff = np.abs(signatures - self._reference).max(axis=1)
+        return np.flatnonzero(diff > self.change_threshold)
+
+    def _needs_full_refresh(self, changed: np.ndarray) -> bool:
+        if self._piece_grid is None:
+            return True
+        if self.refresh_interval and self._frames_since_refresh >= self.refresh_interval:
+            return True
+        if self.recognizer.locator.orientation_needs_check:
+            return True
+        return len(changed) > self.max_changed
+
+    def recognize_warped(self, warped_board: WarpedImage) -> BoardState:
+        """
+        รัน S2/S3 เฉพาะช่องที่เปลี่ยนจากผลที่เก็บไว้ (หรือ Pipeline เต็มเมื่อจำเป็น)
+        """
+        signatures = image_utils.square_signatures(warped_board, self.signature_cells)
+        changed = self._changed_squares(signatures) if self._reference is not None else np.arange(64)
+        self.total_stats["frames"] += 1
+
+        if self._needs_full_refresh(changed):
+            state = self.recognizer.recognize_warped(warped_board)
+            if state.warped_image is not warped_board:
+                # กระดานถูกหมุนตามทิศทางที่อนุมานจาก Occupancy
+                signatures = image_utils.square_signatures(state.warped_image, self.signature_cells)
+            self._piece_grid = list(state.piece_grid)
+            self._reference = signatures
+            self._frames_since_refresh = 0
+
+            num_occupied = sum(1 for p in state.piece_grid if p != 'empty')
+            self._record_stats("full", len(changed), 64, num_occupied)
+            return state
+
+        self._frames_since_refresh += 1
+        if len(changed) == 0:
+            self._record_stats("cached", 0, 0, 0)
+            fen = fen_utils.convert_grid_to_fen(self._piece_grid)
+            return BoardState(fen=fen, piece_grid=list(self._piece_grid), warped_image=warped_board)
+
+        piece_grid = self._update_squares(warped_board, changed.tolist())
+        self._reference[changed] = signatures[changed]
+
+        fen = fen_utils.convert_grid_to_fen(piece_grid)
+        print(f"Incremental: {len(changed)} squares changed -> FEN: {fen}")
+        return BoardState(fen=fen, piece_grid=list(piece_grid), warped_image=warped_board)
+
+    def _update_squares(self, warped_board: WarpedImage, changed: List[int]) -> PieceGrid:
+        """
+        รัน S2 กับช่องที่เปลี่ยน แล้วรัน S3 เฉพาะช่องที่เปลี่ยนและมีหมาก
+        """
+        rows, cols = np.divmod(np.asarray(changed), 8)
+
+        # === STATE 2 (เฉพาะช่องที่เปลี่ยน) ===
+        occupancy_view = image_utils.crop_square_batch(
+            warped_board, padding_ratio=StateRecognizer.OCCUPANCY_CONTEXT_RATIO, as_view=True
+        )
+        occupied = self.recognizer.occupancy_model.predict_subset(occupancy_view[rows, cols], changed)
+        occupied_indices = [i for i, is_occupied in zip(changed, occupied) if is_occupied]
+
+        piece_grid = self._piece_grid
+        for i in changed:
+            piece_grid[i] = 'empty'
+
+        # === STATE 3 (เฉพาะช่องที่เปลี่ยนและมีหมาก) ===
+        if occupied_indices:
+            piece_view = image_utils.crop_square_batch(
+                warped_board, padding_ratio=StateRecognizer.PIECE_PADDING_RATIO, as_view=True
+            )
+            occ_rows, occ_cols = np.divmod(np.asarray(occupied_indices), 8)
+            predicted = self.recognizer.piece_model.predict_crops(piece_view[occ_rows, occ_cols], occupied_indices)
+            for i in occupied_indices:
+                piece_grid[i] = predicted[i]
+
+        self._record_stats("incremental", len(changed), len(changed), len(occupied_indices))
+        return piece_grid
+
+    def _record_stats(self, mode: str, changed: int, s2_crops: int, s3_crops: int) -> None:
+        self.last_stats = {"mode": mode, "changed": changed, "s2_crops": s2_crops, "s3_crops": s3_crops}
+        if mode == "full":
+            self.total_stats["full"] += 1
+        self.total_stats["s2_crops"] += s2_crops
+        self.total_stats["s3_crops"] += s3_crops
@@ -0,0 +1,208 @@
+"""
+[NEW FILE]
+Motion / Occlusion Gate สำหรับวิดีโอ (รันก่อน StateRecognizer)
+
+เฟรมส่วนใหญ่ในวิดีโอเกมหมากรุกคือ "ตำแหน่งนิ่ง" หรือ "มือกำลังเดินหมาก"
+ทั้งสองแบบไม่ต้องรัน S1 -> S2 -> S3 เต็ม Gate นี้ใช้:
+1. Frame Differencing บนภาพย่อ (Greyscale) ของบริเวณกระดาน
+2. สัดส่วนพิกเซลสีผิว (YCrCb) เทียบกับค่าอ้างอิงของกระดานที่นิ่ง (มือบังกระดาน)
+แล้วปล่อยเฉพาะเฟรมที่กระดานนิ่งครบ N เฟรมหลังมีการเปลี่ยนแปลง
+ทุกการตัดสินถูกเก็บไว้ (decisions / save_log) เพื่อใช้ปรับ Threshold
+[UPDATE] ROI เก็บในพิกัดภาพเต็ม: เฟรมที่ถูกตัดเป็น ROI ของ FrameReader ต้องส่ง offset มาด้วย
+แล้ว Gate จะแปลง/ตัด ROI ให้อยู่ในภาพนั้นก่อนอ่าน (ไม่อ่าน ROI ข้ามระบบพิกัด)
+[NEW] get_state() / set_state(): State ของการตัดสิน (ภาพอ้างอิง, Stable Count) สำหรับ Checkpoint
+"""
+import csv
+import cv2
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Tuple
+
+from src.core.typing import ImageBGR, HomographyMatrix
+from src.utils import image_utils
+
+@dataclass
+class GateDecision:
+    """
+    ผลการตัดสินของ Gate สำหรับ 1 เฟรม
+    """
+    frame_index: int
+    motion: float       # สัดส่วนพิกเซลที่เปลี่ยนจากเฟรมก่อนหน้า
+    change: float       # สัดส่วนพิกเซลที่ต่างจากเฟรมที่ปล่อยล่าสุด
+    skin: float         # สัดส่วนพิกเซลสีผิวที่เพิ่มขึ้นจากค่าอ้างอิง
+    stable_count: int
+    emitted: bool
+    reason: str         # 'no_roi', 'first', 'motion', 'occluded', 'settling', 'settled', 'static'
+
+class MotionGate:
+    """
+    ตัดสินว่าเฟรมไหนควรส่งเข้า StateRecognizer
+    """
+    # ช่วงสีผิวใน YCrCb (Cr, Cb) ที่ใช้กันทั่วไป
+    SKIN_LOWER = np.array([0, 133, 77], dtype=np.uint8)
+    SKIN_UPPER = np.array([255, 173, 127], dtype=np.uint8)
+    MIN_ROI_SIZE = 8 # ROI ที่เหลือในภาพเล็กกว่านี้ (pixels) -> ถือว่าไม่มี ROI
+
+    def __init__(self, downscale_size: int = 64, pixel_threshold: int = 25,
+                 motion_threshold: float = 0.01, change_threshold: float = 0.005,
+                 skin_threshold: float = 0.02, stable_frames: int = 5, roi_margin: float = 0.05):
+        """
+        :param downscale_size: ขนาดภาพย่อของบริเวณกระดาน (pixels ต่อด้าน)
+        :param pixel_threshold: ค่าต่างระดับเทาขั้นต่ำที่ถือว่าพิกเซลเปลี่ยน
+        :param motion_threshold: สัดส่วนพิกเซลที่เปลี่ยนจากเฟรมก่อน ที่ถือว่า "มีการเคลื่อนไหว"
+        :param change_threshold: สัดส่วนพิกเซลที่ต่างจากเฟรมที่ปล่อยล่าสุด ที่ถือว่าตำแหน่งอาจเปลี่ยน
+                                 (จับการเดินที่ไม่เห็นการเคลื่อนไหว เช่น ตอนใช้ frame_stride สูง)
+        :param skin_threshold: สัดส่วนพิกเซลสีผิวที่เพิ่มขึ้นจากค่าอ้างอิง ที่ถือว่ามีมือบังกระดาน
+        :param stable_frames: จำนวนเฟรมนิ่งติดกันก่อนปล่อยเฟรม
+        :param roi_margin: ขยาย ROI รอบกระดาน (สัดส่วนของขนาดกระดาน) ให้เห็นมือก่อนเข้ากระดาน
+        """
+        self.downscale_size = downscale_size
+        self.pixel_threshold = pixel_threshold
+        self.motion_threshold = motion_threshold
+        self.change_threshold = change_threshold
+        self.skin_threshold = skin_threshold
+        self.stable_frames = stable_frames
+        self.roi_margin = roi_margin
+
+        self.decisions: List[GateDecision] = []
+        self.roi: Optional[Tuple[int, int, int, int]] = None # (x, y, w, h) ในพิกัดภาพเต็ม
+        self.reset()
+
+    def reset(self) -> None:
+        """ล้าง State (เช่น เมื่อเริ่มวิดีโอใหม่) แต่คง ROI ไว้"""
+        self._previous: Optional[np.ndarray] = None
+        self._reference: Optional[np.ndarray] = None # ภาพย่อของเฟรมที่ปล่อยล่าสุด
+        self._reference_skin = 0.0
+        self._stable_count = 0
+        self._dirty = True # มีการเปลี่ยนแปลงตั้งแต่ปล่อยเฟรมล่าสุด
+        self.decisions = []
+
+    def get_state(self) -> dict:
+        """
+        [NEW] State ของการตัดสินหลังเฟรมล่าสุด (แปลงเป็น JSON ได้) ไม่รวม roi และ decisions
+        """
+        def to_list(array: Optional[np.ndarray]) -> Optional[list]:
+            return array.tolist() if array is not None else None
+
+        return {
+            "previous": to_list(self._previous),
+            "reference": to_list(self._reference),
+            "reference_skin": self._reference_skin,
+            "stable_count": self._stable_count,
+            "dirty": self._dirty,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        [NEW] คืน State จาก get_state() (decisions เริ่มใหม่: Log หลัง Resume มีเฉพาะเฟรมที่อ่านต่อ)
+        """
+        def to_array(values: Optional[list]) -> Optional[np.ndarray]:
+            return np.array(values, dtype=np.uint8) if values is not None else None
+
+        self._previous = to_array(state["previous"])
+        self._reference = to_array(state["reference"])
+        self._reference_skin = float(state["reference_skin"])
+        self._stable_count = int(state["stable_count"])
+        self._dirty = bool(state["dirty"])
+
+    def set_board_matrix(self, matrix: HomographyMatrix, warped_size: int,
+                         image_shape: Tuple[int, ...], offset: Tuple[int, int] = (0, 0)) -> None:
+        """
+        กำหนด ROI จาก Homography ของ BoardLocator (ภาพต้นฉบับ -> ภาพกระดาน warped_size)
+        :param image_shape: Shape ของภาพที่ใช้หา matrix
+        :param offset: [NEW] มุมซ้ายบนของภาพนั้นในภาพเต็ม (ภาพถูกตัดโดย FrameReader)
+        """
+        roi = image_utils.board_bounding_rect(matrix, warped_size, image_shape, margin=self.roi_margin)
+        if roi is not None:
+            x, y, w, h = roi
+            self.roi = (x + offset[0], y + offset[1], w, h)
+
+    def _image_roi(self, image_shape: Tuple[int, ...],
+                   offset: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        [NEW] แปลง ROI (ภาพเต็ม) เป็นพิกัดของภาพที่มุมซ้ายบนอยู่ที่ offset แล้วตัดให้อยู่ในภาพ
+        -> None ถ้าเหลือเล็กกว่า MIN_ROI_SIZE
+        """
+        x, y, w, h = self.roi
+        x1, y1 = max(0, x - offset[0]), max(0, y - offset[1])
+        x2, y2 = min(image_shape[1], x + w - offset[0]), min(image_shape[0], y + h - offset[1])
+        if x2 - x1 < self.MIN_ROI_SIZE or y2 - y1 < self.MIN_ROI_SIZE:
+            return None
+        return x1, y1, x2 - x1, y2 - y1
+
+    def _downscale(self, image: ImageBGR, roi: Tuple[int, int, int, int]) -> np.ndarray:
+        x, y, w, h = roi
+        size = (self.downscale_size, self.downscale_size)
+        return cv2.resize(image[y:y + h, x:x + w], size, interpolation=cv2.INTER_AREA)
+
+    def _skin_ratio(self, small: np.ndarray) -> float:
+        mask = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb), self.SKIN_LOWER, self.SKIN_UPPER)
+        return float(np.count_nonzero(mask)) / mask.size
+
+    def _changed_fraction(self, a: np.ndarray, b: Optional[np.ndarray]) -> float:
+        if b is None:
+            return 1.0
+        return float(np.count_nonzero(cv2.absdiff(a, b) > self.pixel_threshold)) / a.size
+
+    def update(self, image: ImageBGR, frame_index: int, offset: Tuple[int, int] = (0, 0)) -> bool:
+        """
+        ส่งเฟรมถัดไปเข้า Gate -> True ถ้าควรส่งเฟรมนี้เข้า StateRecognizer
+        (ถ้ายังไม่มี ROI จะปล่อยทุกเฟรม จนกว่าจะเรียก set_board_matrix)
+        :param offset: [NEW] มุมซ้ายบนของ image ในภาพเต็ม (ภาพถูกตัดโดย FrameReader)
+        """
+        roi = self._image_roi(image.shape, offset) if self.roi is not None else None
+        if roi is None:
+            return self._record(frame_index, 1.0, 1.0, 0.0, True, "no_roi")
+
+        small = self._downscale(image, roi)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        motion = self._changed_fraction(gray, self._previous)
+        self._previous = gray
+        skin_ratio = self._skin_ratio(small)
+        # ยังไม่มีค่าอ้างอิง (ยังไม่เคยปล่อยเฟรม) -> ใช้เฉพาะ Motion (สีกระดานไม้อาจอยู่ในช่วงสีผิว)
+        skin = skin_ratio - self._reference_skin if self._reference is not None else 0.0
+
+        if motion > self.motion_threshold or skin > self.skin_threshold:
+            self._stable_count = 0
+            self._dirty = True
+            return self._record(frame_index, motion, -1.0, skin, False,
+                                "occluded" if skin > self.skin_threshold else "motion")
+
+        self._stable_count += 1
+        if self._stable_count < self.stable_frames:
+            return self._record(frame_index, motion, -1.0, skin, False, "settling")
+
+        change = self._changed_fraction(gray, self._reference)
+        if self._reference is None or self._dirty or change > self.change_threshold:
+            reason = "first" if self._reference is None else "settled"
+            self._reference = gray
+            self._reference_skin = skin_ratio
+            self._dirty = False
+            return self._record(frame_index, motion, change, skin, True, reason)
+        return self._record(frame_index, motion, change, skin, False, "static")
+
+    def _record(self, frame_index: int, motion: float, change: float, skin: float,
+                emitted: bool, reason: str) -> bool:
+        self.decisions.append(GateDecision(
+            frame_index=frame_index, motion=motion, change=change, skin=skin,
+            stable_count=self._stable_count, emitted=emitted, reason=reason
+        ))
+        return emitted
+
+    def summary(self) -> dict:
+        """จำนวนเฟรมทั้งหมด / ที่ปล่อย และจำนวนตามเหตุผล"""
+        reasons = {}
+        for decision in self.decisions:
+            reasons[decision.reason] = reasons.get(decision.reason, 0) + 1
+        emitted = sum(1 for decision in self.decisions if decision.emitted)
+        total = len(self.decisions)
+        return {"frames": total, "emitted": emitted,
+                "skipped_ratio": 1.0 - emitted / total if total else 0.0, "reasons": reasons}
+
+    def save_log(self, path: str) -> None:
+        """บันทึกทุกการตัดสินเป็น CSV (ใช้ปรับ Threshold)"""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(GateDecision.__dataclass_fields__))
+            writer.writeheader()
+            for decision in self.decisions:
+                writer.writerow(asdict(decision))
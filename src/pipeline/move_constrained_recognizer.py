@@ -0,0 +1,224 @@
+"""
+[NEW FILE]
+Recognizer ที่ใช้กติกาหมากรุก (python-chess) บังคับผลลัพธ์
+
+เก็บ chess.Board ของเกมไว้ แล้วในแต่ละเฟรม:
+1. สร้างสมมติฐาน = "ไม่มีการเดิน" + ทุก Legal Move จากตำแหน่งปัจจุบัน
+2. S2 (ความน่าจะเป็นว่ามีหมาก) เฉพาะช่องที่ Legal Move แตะ
+3. S3 (ความน่าจะเป็นของชนิดหมาก) เฉพาะช่องปลายทางของ Move ที่คะแนน S2 สูงสุด top_k ตัว
+4. เลือกสมมติฐานที่ Log-likelihood สูงสุด
+ถ้าไม่มีสมมติฐานใดอธิบายหลักฐานได้ จึงรัน Pipeline เต็ม (ไม่บังคับกติกา) แล้ว:
+- [UPDATE] ลองอธิบายด้วยลำดับ Legal Move สั้นๆ ก่อน (find_move_sequence, เช่น พลาดไป 1 ตา)
+- Sync กระดานใหม่เฉพาะเมื่อเห็นตำแหน่งที่อธิบายไม่ได้เดิมซ้ำ resync_frames เฟรมติดกัน
+  (เฟรมเดียวที่มือบังหรือรู้จำผิดจะไม่เปลี่ยน board / ฝั่งที่ถึงตาเดิน)
+"""
+import chess
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.core.typing import ImageBGR, WarpedImage, PieceGrid
+from src.core.exceptions import BoardNotFoundException
+from src.pipeline.state_recognizer import StateRecognizer, BoardState
+from src.utils import image_utils, fen_utils
+from src.utils.pgn_utils import find_move_sequence
+
+# กันค่า log(0)
+_EPS = 1e-4
+
+@dataclass
+class _Hypothesis:
+    move: Optional[chess.Move]              # None = ไม่มีการเดิน
+    changes: Dict[int, str] = field(default_factory=dict) # Grid index -> คลาสหลังเดิน (เฉพาะช่องที่เปลี่ยน)
+    score: float = 0.0
+
+class MoveConstrainedRecognizer:
+    """
+    ห่อ StateRecognizer: ตัดสินผลเป็น Legal Move ของเกมที่ติดตามอยู่
+    """
+    def __init__(self, recognizer: StateRecognizer, board: Optional[chess.Board] = None,
+                 top_k: int = 3, min_square_probability: float = 0.1, move_margin: float = 1.0,
+                 max_plies: int = 2, resync_frames: int = 3):
+        """
+        :param recognizer: StateRecognizer ที่โหลดโมเดลแล้ว (ต้องไม่ใช้ direct_sampling)
+        :param board: ตำแหน่งเริ่มต้นของเกม (None = ตำแหน่งเริ่มมาตรฐาน)
+        :param top_k: จำนวน Move (เรียงตามคะแนน S2) ที่จะรัน S3 เพื่อตัดสิน
+        :param min_square_probability: ความน่าจะเป็นต่ำสุดของแต่ละช่องที่ยังถือว่าสมมติฐาน "อธิบายได้"
+        :param move_margin: Log-likelihood ที่ Move ต้องชนะ "ไม่มีการเดิน" ก่อนยอมรับ (กัน Noise)
+        :param max_plies: [NEW] จำนวนตาสูงสุดที่หาเติมได้เมื่อผลของ Pipeline เต็มไม่ใช่ 1 ตาจาก board
+        :param resync_frames: [NEW] จำนวนเฟรมติดกันที่ต้องเห็นตำแหน่งที่อธิบายไม่ได้เดิม ก่อน Sync board ใหม่
+        """
+        if recognizer.direct_sampling:
+            raise ValueError("MoveConstrainedRecognizer requires a StateRecognizer without direct_sampling")
+        self.recognizer = recognizer
+        self.board = board.copy() if board is not None else chess.Board()
+        self.top_k = top_k
+        self.min_square_probability = min_square_probability
+        self.move_margin = move_margin
+        self.max_plies = max_plies
+        self.resync_frames = resync_frames
+
+        self.moves: List[chess.Move] = [] # Move ที่ยอมรับแล้วตามลำดับ
+        self.last_move: Optional[chess.Move] = None
+        self.last_stats: Dict[str, object] = {}
+
+        # [NEW] ตำแหน่งจาก Pipeline เต็มที่อธิบายไม่ได้ และจำนวนเฟรมติดกันที่เห็น
+        self._resync_candidate: Optional[str] = None
+        self._resync_count = 0
+
+    def recognize(self, image: ImageBGR) -> Optional[BoardState]:
+        """
+        Main method (เหมือน StateRecognizer.recognize)
+        """
+        try:
+            # === STATE 1: BOARD LOCALISATION ===
+            warped_board, _ = self.recognizer.locator.find_and_warp(image)
+            return self.recognize_warped(warped_board)
+        except BoardNotFoundException as e:
+            print(f"!!! Pipeline Error (S1): {e}")
+            return None
+        except Exception as e:
+            print(f"!!! Pipeline Error (S2/S3/FEN): {e}")
+            return None
+
+    def _board_state(self, warped_board: WarpedImage) -> BoardState:
+        return BoardState(
+            fen=self.board.board_fen(),
+            piece_grid=fen_utils.board_to_grid(self.board),
+            warped_image=warped_board
+        )
+
+    def _hypotheses(self, current_grid: PieceGrid) -> List[_Hypothesis]:
+        hypotheses = [_Hypothesis(move=None)]
+        for move in self.board.legal_moves:
+            after = self.board.copy(stack=False)
+            after.push(move)
+            after_grid = fen_utils.board_to_grid(after)
+            changes = {i: after_grid[i] for i in range(64) if after_grid[i] != current_grid[i]}
+            hypotheses.append(_Hypothesis(move=move, changes=changes))
+        return hypotheses
+
+    @staticmethod
+    def _crops(warped_board: WarpedImage, padding_ratio: float, indices: List[int]) -> np.ndarray:
+        view = image_utils.crop_square_batch(warped_board, padding_ratio=padding_ratio, as_view=True)
+        rows, cols = np.divmod(np.asarray(indices), 8)
+        return view[rows, cols]
+
+    def recognize_warped(self, warped_board: WarpedImage) -> BoardState:
+        """
+        ตัดสินเฟรมเป็น "ไม่มีการเดิน" / Legal Move หนึ่งตัว / หรือ Sync ใหม่ด้วย Pipeline เต็ม
+        """
+        self.last_move = None
+        if self.recognizer.locator.orientation_needs_check:
+            # ทิศทางกระดานยังไม่แน่นอน -> ต้องใช้ Pipeline เต็ม (รวมการหมุนจาก Occupancy)
+            return self._full_recognition(warped_board, reason="orientation")
+
+        current_grid = fen_utils.board_to_grid(self.board)
+        hypotheses = self._hypotheses(current_grid)
+
+        # === STATE 2: เฉพาะช่องที่ Legal Move แตะ ===
+        touched = sorted({i for h in hypotheses for i in h.changes})
+        if not touched:
+            self.last_stats = {"mode": "none", "s2_crops": 0, "s3_crops": 0}
+            return self._board_state(warped_board)
+
+        occupancy_proba = self.recognizer.occupancy_model.predict_proba_subset(
+            self._crops(warped_board, StateRecognizer.OCCUPANCY_CONTEXT_RATIO, touched), touched
+        )
+        p_occupied = dict(zip(touched, np.clip(occupancy_proba, _EPS, 1 - _EPS).tolist()))
+
+        def occupancy_likelihood(i: int, piece: str) -> float:
+            return p_occupied[i] if piece != 'empty' else 1.0 - p_occupied[i]
+
+        # คะแนน S2 เทียบกับ "ไม่มีการเดิน" (ช่องที่ไม่เปลี่ยนหักล้างกันหมด)
+        for h in hypotheses:
+            h.score = sum(
+                np.log(occupancy_likelihood(i, piece)) - np.log(occupancy_likelihood(i, current_grid[i]))
+                for i, piece in h.changes.items()
+            )
+
+        # === STATE 3: เฉพาะช่องปลายทางของ top_k Move ===
+        moves_by_s2 = sorted(hypotheses[1:], key=lambda h: h.score, reverse=True)
+        candidates = [hypotheses[0]] + moves_by_s2[:self.top_k]
+        targets = sorted({i for h in candidates for i, piece in h.changes.items() if piece != 'empty'})
+
+        if targets:
+            piece_proba = self.recognizer.piece_model.predict_proba(
+                self._crops(warped_board, StateRecognizer.PIECE_PADDING_RATIO, targets)
+            )
+            piece_proba = np.clip(piece_proba, _EPS, 1.0)
+            class_index = {name: k for k, name in enumerate(self.recognizer.piece_model.class_names)}
+            for h in candidates:
+                h.score += sum(
+                    float(np.log(piece_proba[row, class_index[h.changes.get(i, current_grid[i])]]))
+                    for row, i in enumerate(targets)
+                )
+
+        best = max(candidates, key=lambda h: h.score)
+        self.last_stats = {"mode": "constrained", "s2_crops": len(touched), "s3_crops": len(targets)}
+
+        # สมมติฐานที่ดีที่สุดต้องอธิบาย Occupancy ของทุกช่องที่ตรวจได้
+        explained = all(
+            occupancy_likelihood(i, best.changes.get(i, current_grid[i])) >= self.min_square_probability
+            for i in touched
+        )
+        if not explained:
+            return self._full_recognition(warped_board, reason="unexplained")
+
+        self._resync_candidate, self._resync_count = None, 0 # เฟรมนี้อธิบายได้ -> นับใหม่
+        if best.move is not None and best.score - candidates[0].score >= self.move_margin:
+            print(f"Move: {self.board.san(best.move)} (score {best.score - candidates[0].score:+.1f})")
+            self.board.push(best.move)
+            self.moves.append(best.move)
+            self.last_move = best.move
+        return self._board_state(warped_board)
+
+    def _full_recognition(self, warped_board: WarpedImage, reason: str) -> BoardState:
+        """
+        Pipeline เต็มแบบไม่บังคับกติกา -> อธิบายด้วยลำดับ Legal Move สั้นๆ
+        หรือ Sync chess.Board เมื่อเห็นตำแหน่งที่เป็นไปได้เดิมติดกัน resync_frames เฟรม
+        """
+        state = self.recognizer.recognize_warped(warped_board)
+        self.last_stats = {"mode": f"full ({reason})", "s2_crops": 64,
+                           "s3_crops": sum(1 for p in state.piece_grid if p != 'empty')}
+
+        placement = state.fen.split(" ")[0]
+        if placement == self.board.board_fen():
+            self._resync_candidate, self._resync_count = None, 0
+            return state
+
+        # [UPDATE] พลาดไปไม่กี่ตา (เช่น เฟรมหลังเดินถูกมือบัง) -> เติมตาที่หายไป
+        sequence = find_move_sequence(self.board, placement, self.max_plies)
+        if sequence is not None:
+            for move in sequence:
+                print(f"Move: {self.board.san(move)} (from full recognition)")
+                self.board.push(move)
+                self.moves.append(move)
+            self.last_move = sequence[-1]
+            self._resync_candidate, self._resync_count = None, 0
+            return self._board_state(state.warped_image)
+
+        # [UPDATE] เฟรมเดียวอาจเป็นมือบัง / รู้จำผิด -> รอให้เห็นตำแหน่งเดิมซ้ำก่อน
+        if placement == self._resync_candidate:
+            self._resync_count += 1
+        else:
+            self._resync_candidate, self._resync_count = placement, 1
+        if self._resync_count < self.resync_frames:
+            print(f"Unexplained position ({self._resync_count}/{self.resync_frames}): {placement}")
+            return self._board_state(state.warped_image)
+
+        # ตำแหน่งเปลี่ยนโดยไม่มี Legal Move อธิบาย (เช่น พลาดไปหลายตา) -> ถือว่าฝั่งที่ถึงตาเดินไปแล้ว
+        for turn in (not self.board.turn, self.board.turn):
+            candidate = self.board.copy(stack=False)
+            candidate.set_board_fen(placement)
+            candidate.turn = turn
+            candidate.castling_rights = candidate.clean_castling_rights()
+            candidate.ep_square = None
+            if candidate.is_valid():
+                print(f"Resync board from full recognition: {candidate.fen()}")
+                self.board = candidate
+                self._resync_candidate, self._resync_count = None, 0
+                break
+        else:
+            print(f"!!! Ignored impossible position from full recognition: {state.fen}")
+        return self._board_state(state.warped_image)
@@ -7,23 +7,172 @@ State 1: Board Localisation
 - เปลี่ยนไปใช้กลยุทธ์ "Sort by X-coordinate"
 - Logic นี้จะคืนค่า 4 มุมที่ถูกต้อง (ไม่ซ้ำ)
   แม้ภาพจะหมุน 45 องศา
+
+[UPDATE 8]:
+- เพิ่มโหมด Tracking สำหรับวิดีโอ (`tracking=True`)
+  เก็บมุม/Homography ล่าสุด แล้วติดตามมุมด้วย Optical Flow ใน ROI รอบกระดาน
+- รัน Full Detection ใหม่เฉพาะเมื่อ Tracking ไม่น่าเชื่อถือ
+- ถ้า Detection ล้มเหลว (เช่น มือบังกระดาน) จะใช้ Matrix ล่าสุดที่ดีแทน
+
+[UPDATE 9]:
+- เพิ่มโหมด Pyramid (`pyramid=True`): หา Contour บนภาพย่อ
+  แล้ว Refine 4 มุมที่ความละเอียดเต็มเฉพาะในหน้าต่างเล็กๆ (cornerSubPix)
+
+[UPDATE 10]:
+- เพิ่ม Remap Cache (`remap_cache=True`) สำหรับกล้องตั้งนิ่ง
+  สร้าง Map ของ cv2.remap ครั้งเดียว และสร้างใหม่เมื่อ Homography ขยับเกิน remap_tolerance
+
+[UPDATE 11]:
+- ล็อกทิศทางกระดานต่อ Session (`lock_orientation=True`) ตรวจใหม่เมื่อ Homography เปลี่ยนมาก
+- ให้คะแนนทิศทางด้วย Integral Image ครั้งเดียว (แทน np.sum 8 ครั้ง) และไม่ print ทุกเฟรม
+- อนุมานทิศทางจาก Occupancy Grid ได้ (`orientation_source='occupancy'`)
+
+[UPDATE 12]:
+- รองรับ ColorClassifier (LUT ของ BGR -> คลาสสี) แทน cvtColor(HSV) + inRange
+
+[UPDATE 13]:
+- เพิ่ม Fallback เป็น LatticeDetector (Hough Lines 9x9) เมื่อ Mask สีหากระดานไม่พบ
+  (`lattice_fallback=True`) ภายในเวลาที่กำหนด (`lattice_time_budget_ms`)
+
+[UPDATE 14]:
+- เพิ่ม `find_and_warp_many(images)` รันหลายภาพพร้อมกันด้วย Thread Pool ที่ใช้ซ้ำได้
+
+[UPDATE 15]:
+- เพิ่ม `locate_board(image)` และ `last_board_matrix` (Homography ที่รวมการหมุนทิศทางแล้ว)
+  สำหรับ SquareSampler ที่ตัดช่องจากภาพต้นฉบับโดยตรง
+
+[UPDATE 16]:
+- เพิ่ม `get_session_state()` / `set_session_state(state)` (มุมกระดาน, Homography และทิศทางที่ล็อกไว้)
+  สำหรับ Checkpoint / Resume ของวิดีโอยาว
+
+[UPDATE 17]:
+- `orientation_lock` (RLock) คุม State ของทิศทาง เมื่อ S1 และ S2 ของ StreamingVideoPipeline อยู่คนละ Thread
+- `update_orientation_from_occupancy(..., matrix=)` ล็อกทิศทางกับ Homography ของเฟรมที่ให้ Occupancy Grid
+  (ไม่ใช่ last_matrix ของเฟรมล่าสุดที่ S1 Warp ไปแล้ว)
 """
+import threading
+import time
 import cv2
 import numpy as np
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
 
-from src.core.typing import ImageBGR, WarpedImage, HomographyMatrix
-from src.core.exceptions import BoardNotFoundException
+from src.core.typing import ImageBGR, WarpedImage, HomographyMatrix, OccupancyGrid
+from src.core.exceptions import BoardNotFoundException, LinesNotFoundException
+from src.pipeline.s1_lattice_detector import LatticeDetector
 from src.utils import image_utils
+from src.utils.color_utils import ColorClassifier
+
+@dataclass
+class LocatorResult:
+    """
+    [NEW] ผลลัพธ์ของ S1 ต่อ 1 ภาพ (จาก find_and_warp_many)
+    """
+    warped_image: Optional[WarpedImage]
+    matrix: Optional[HomographyMatrix]
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class BoardLocator:
     """
     คลาสสำหรับค้นหาและสกัดภาพกระดานหมากรุก
     """
-    def __init__(self, warped_size: int = 600):
+    def __init__(self,
+                 warped_size: int = 600,
+                 tracking: bool = False,
+                 track_margin: float = 0.15,
+                 track_max_error: float = 2.0,
+                 redetect_interval: int = 0,
+                 pyramid: bool = False,
+                 pyramid_max_side: int = 640,
+                 refine_window: int = 12,
+                 remap_cache: bool = False,
+                 remap_tolerance: float = 0.5,
+                 fixed_point_maps: bool = True,
+                 lock_orientation: bool = False,
+                 orientation_recheck_drift: float = 20.0,
+                 orientation_source: str = "pixels",
+                 color_classifier: Optional[ColorClassifier] = None,
+                 lattice_fallback: bool = False,
+                 lattice_time_budget_ms: float = 250.0,
+                 num_workers: Optional[int] = None):
+        """
+        :param warped_size: ขนาดภาพกระดานที่ Warp แล้ว (pixels)
+        :param tracking: [NEW] เปิดโหมด Tracking (สำหรับวิดีโอที่กล้องแทบไม่ขยับ)
+        :param track_margin: [NEW] ขยาย ROI รอบกระดาน (สัดส่วนของขนาดกระดาน)
+        :param track_max_error: [NEW] Forward-Backward error สูงสุด (pixels) ที่ยังถือว่า Track สำเร็จ
+        :param redetect_interval: [NEW] บังคับ Full Detection ทุกๆ N เฟรม (0 = ไม่บังคับ)
+        :param pyramid: [NEW] หากระดานบนภาพย่อก่อน แล้วค่อย Refine มุมที่ความละเอียดเต็ม
+        :param pyramid_max_side: [NEW] ด้านที่ยาวที่สุดของภาพย่อ (pixels)
+        :param refine_window: [NEW] ครึ่งหนึ่งของขนาดหน้าต่าง Refine มุม (pixels, ที่ความละเอียดเต็ม)
+        :param remap_cache: [NEW] Warp ด้วย Remap Table ที่ Cache ไว้ แทน warpPerspective ทุกเฟรม
+        :param remap_tolerance: [NEW] ระยะขยับของมุมกระดาน (pixels) ที่ยังใช้ Map เดิมได้
+        :param fixed_point_maps: [NEW] เก็บ Map เป็น Fixed-point (CV_16SC2) แทน float32
+        :param lock_orientation: [NEW] ตรวจทิศทางกระดานครั้งเดียวต่อ Session/วิดีโอ แล้วล็อกไว้
+        :param orientation_recheck_drift: [NEW] ตรวจทิศทางใหม่เมื่อ Homography ขยับเกินค่านี้ (pixels)
+        :param orientation_source: [NEW] 'pixels' (Mask สีหมาก) หรือ 'occupancy'
+                                   (ให้ StateRecognizer ใช้ Occupancy Grid ผ่าน update_orientation_from_occupancy)
+        :param color_classifier: [NEW] ColorClassifier (LUT) สำหรับทำ Mask สีแทนการแปลง HSV
+                                 (เช่น ColorClassifier.default() หรือ ColorClassifier.load(path))
+        :param lattice_fallback: [NEW] ถ้า Mask สีหากระดานไม่พบ ให้ลอง LatticeDetector ต่อ
+        :param lattice_time_budget_ms: [NEW] เวลารวมสูงสุด (ms) ของการหามุมต่อเฟรม (นับตั้งแต่เริ่ม Mask สี)
+        :param num_workers: [NEW] จำนวน Thread ของ find_and_warp_many (None = ค่าเริ่มต้นของ ThreadPoolExecutor)
+        """
+        if orientation_source not in ("pixels", "occupancy"):
+            raise ValueError(f"Unknown orientation_source: {orientation_source}")
         self.warped_size = warped_size
         self.debug_mask: np.ndarray = None 
 
+        # --- [NEW] State ของโหมด Tracking ---
+        self.tracking = tracking
+        self.track_margin = track_margin
+        self.track_max_error = track_max_error
+        self.redetect_interval = redetect_interval
+        self.last_detection_mode: Optional[str] = None # 'detect', 'track' หรือ 'reuse'
+        self._last_corners: Optional[np.ndarray] = None # (4, 2) TL, TR, BR, BL
+        self._prev_roi_gray: Optional[np.ndarray] = None
+        self._prev_roi_rect: Optional[Tuple[int, int, int, int]] = None
+        self._frames_since_detect = 0
+
+        # --- [NEW] โหมด Pyramid ---
+        self.pyramid = pyramid
+        self.pyramid_max_side = pyramid_max_side
+        self.refine_window = refine_window
+
+        # --- [NEW] Remap Cache ---
+        self.remap_cache = remap_cache
+        self.remap_tolerance = remap_tolerance
+        self.fixed_point_maps = fixed_point_maps
+        self._remap_matrix: Optional[HomographyMatrix] = None
+        self._remap_maps: Optional[image_utils.WarpMaps] = None
+
+        # --- [NEW] Orientation Lock ---
+        self.lock_orientation = lock_orientation
+        self.orientation_recheck_drift = orientation_recheck_drift
+        self.orientation_source = orientation_source
+        self.orientation_needs_check = False
+        self.last_matrix: Optional[HomographyMatrix] = None
+        self._orientation_turns: Optional[int] = None
+        self._orientation_matrix: Optional[HomographyMatrix] = None
+        # [NEW] ถือ Lock นี้เมื่ออ่าน/แก้ State ของทิศทางจากหลาย Thread (RLock: Method ภายในเรียกซ้อนได้)
+        self.orientation_lock = threading.RLock()
+
+        # --- [NEW] Colour LUT ---
+        self.color_classifier = color_classifier
+
+        # --- [NEW] Lattice Fallback ---
+        self.lattice_fallback = lattice_fallback
+        self.lattice_time_budget_ms = lattice_time_budget_ms
+        self.lattice_detector = LatticeDetector(warped_size=warped_size)
+
+        # --- [NEW] Thread Pool (สร้างเมื่อเรียก find_and_warp_many ครั้งแรก) ---
+        self.num_workers = num_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
     def _get_avg_lightness(self, image: ImageBGR) -> float:
         h, w = image.shape[:2]
         crop = image[h//4:h*3//4, w//4:w*3//4]
@@ -31,7 +180,15 @@ class BoardLocator:
         l_channel, _, _ = cv2.split(lab)
         return np.mean(l_channel)
 
-    def _isolate_board_mask(self, image: ImageBGR) -> np.ndarray:
+    def _board_color_mask(self, image: ImageBGR) -> np.ndarray:
+        """
+        Mask ของช่องกระดาน (ช่องเขียว OR ช่องขาว)
+        [NEW] ถ้ามี color_classifier จะใช้ LUT แทนการแปลง HSV
+        """
+        if self.color_classifier is not None:
+            classes = self.color_classifier.classify(image)
+            return ColorClassifier.mask(classes, ColorClassifier.GREEN_SQUARE | ColorClassifier.LIGHT_SQUARE)
+
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         lower_green = np.array([35, 40, 40])
         upper_green = np.array([85, 255, 255])
@@ -41,13 +198,21 @@ class BoardLocator:
         upper_white_square = np.array([180, 50, 255])
         white_mask = cv2.inRange(hsv, lower_white_square, upper_white_square)
         
-        combined_mask = cv2.bitwise_or(green_mask, white_mask)
+        return cv2.bitwise_or(green_mask, white_mask)
 
-        kernel = np.ones((5, 5), np.uint8)
+    def _isolate_board_mask(self, image: ImageBGR, kernel_size: int = 5, record_debug: bool = True) -> np.ndarray:
+        """
+        Mask สี -> Morphology -> Contour ที่ใหญ่ที่สุด
+        :param record_debug: [NEW] เก็บ Mask ไว้ที่ self.debug_mask (False = ไม่เขียน State ร่วม สำหรับ Thread Pool)
+        """
+        combined_mask = self._board_color_mask(image)
+
+        kernel = np.ones((kernel_size, kernel_size), np.uint8)
         mask_cleaned = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel, iterations=2)
         mask_closed = cv2.morphologyEx(mask_cleaned, cv2.MORPH_CLOSE, kernel, iterations=3)
         
-        self.debug_mask = mask_closed 
+        if record_debug:
+            self.debug_mask = mask_closed 
 
         contours, _ = cv2.findContours(mask_closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -113,11 +278,81 @@ class BoardLocator:
         return ordered
 
 
-    def _fix_rotation_by_piece_color(self, warped_image: WarpedImage) -> WarpedImage:
+    # --- [NEW] ทิศทางกระดาน (Orientation) ---
+    # แทนทิศทางด้วยจำนวนครั้งที่ต้องหมุน 90 องศา "ทวนเข็ม" เพื่อแก้ภาพ (เหมือน np.rot90)
+    ORIENTATION_TO_TURNS = {"0": 0, "90cw": 1, "180": 2, "90ccw": 3}
+    TURNS_TO_ORIENTATION = {v: k for k, v in ORIENTATION_TO_TURNS.items()}
+    _ROTATE_CODES = {
+        1: cv2.ROTATE_90_COUNTERCLOCKWISE, # ภาพหมุน 90CW (ขวา) -> หมุนกลับ 90CCW (ซ้าย)
+        2: cv2.ROTATE_180,
+        3: cv2.ROTATE_90_CLOCKWISE,        # ภาพหมุน 90CCW (ซ้าย) -> หมุนกลับ 90CW (ขวา)
+    }
+
+    @property
+    def orientation(self) -> Optional[str]:
+        """ทิศทางปัจจุบัน ('0', '180', '90cw', '90ccw') หรือ None ถ้ายังไม่เคยตรวจ"""
+        if self._orientation_turns is None:
+            return None
+        return self.TURNS_TO_ORIENTATION[self._orientation_turns]
+
+    def rotation_matrix(self, turns: int) -> HomographyMatrix:
         """
-        [UPDATE 6] กลยุทธ์: ตรวจสอบสีของ "หมาก" ไม่ใช่ "ช่อง"
+        [NEW] Matrix 3x3 ของการหมุนภาพ Warp 90 องศาทวนเข็ม `turns` ครั้ง (ตรงกับ rotate_board)
         """
-        
+        # หมุนทวนเข็ม 1 ครั้ง: (x, y) -> (y, size - 1 - x)
+        size = self.warped_size - 1
+        quarter = np.array([[0, 1, 0], [-1, 0, size], [0, 0, 1]], dtype=np.float64)
+        return np.linalg.matrix_power(quarter, turns % 4)
+
+    @property
+    def last_board_matrix(self) -> Optional[HomographyMatrix]:
+        """
+        [NEW] Homography จากภาพต้นฉบับ -> ภาพกระดานที่หมุนทิศทางแล้ว (ภาพที่ find_and_warp คืนมา)
+        """
+        if self.last_matrix is None:
+            return None
+        return self.rotation_matrix(self._orientation_turns or 0) @ self.last_matrix
+
+    def rotate_board(self, warped_image: WarpedImage, turns: int) -> WarpedImage:
+        """
+        หมุนภาพกระดาน 90 องศาทวนเข็ม `turns` ครั้ง (เหมือน np.rot90)
+        """
+        turns %= 4
+        if turns == 0:
+            return warped_image
+        return cv2.rotate(warped_image, self._ROTATE_CODES[turns])
+
+    def _set_orientation(self, turns: int, matrix: Optional[HomographyMatrix], source: str) -> None:
+        turns %= 4
+        with self.orientation_lock:
+            if turns != self._orientation_turns:
+                print(f"Orientation Check: Locked '{self.TURNS_TO_ORIENTATION[turns]}' configuration (from {source})")
+            self._orientation_turns = turns
+            self._orientation_matrix = matrix
+            self.orientation_needs_check = False
+
+    def _orientation_is_locked(self, matrix: Optional[HomographyMatrix]) -> bool:
+        """
+        ใช้ทิศทางเดิมได้ ถ้าล็อกไว้แล้ว และ Homography ไม่ขยับเกิน orientation_recheck_drift
+        (เช่น วิดีโอ *_rotate_* ที่กระดานถูกหมุน -> Homography เปลี่ยนมาก -> ตรวจใหม่)
+        """
+        if not self.lock_orientation or self._orientation_turns is None:
+            return False
+        if matrix is None or self._orientation_matrix is None:
+            return True
+        drift = image_utils.homography_drift(self._orientation_matrix, matrix, self.warped_size)
+        return drift <= self.orientation_recheck_drift
+
+    def _piece_color_masks(self, warped_image: WarpedImage) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mask สีหมากขาว และ Mask สีหมากดำ
+        [NEW] ถ้ามี color_classifier จะได้ทั้ง 2 Mask จาก LUT รอบเดียว
+        """
+        if self.color_classifier is not None:
+            classes = self.color_classifier.classify(warped_image)
+            return (ColorClassifier.mask(classes, ColorClassifier.WHITE_PIECE),
+                    ColorClassifier.mask(classes, ColorClassifier.BLACK_PIECE))
+
         hsv = cv2.cvtColor(warped_image, cv2.COLOR_BGR2HSV)
         
         # Mask สีหมากขาว
@@ -129,89 +364,455 @@ class BoardLocator:
         lower_black_piece = np.array([0, 0, 0])
         upper_black_piece = np.array([180, 255, 60])
         black_piece_mask = cv2.inRange(hsv, lower_black_piece, upper_black_piece)
-        
+
+        return white_piece_mask, black_piece_mask
+
+    def _score_orientation(self, warped_image: WarpedImage) -> dict:
+        """
+        ให้คะแนนแต่ละทิศทางจากจำนวน pixel สีหมากขาว/ดำ ในโซนขอบทั้ง 4 ด้าน
+        [NEW] ใช้ Integral Image (2 channels: ขาว, ดำ) คำนวณครั้งเดียว
+        แล้วหาผลรวมแต่ละโซนแบบ O(1)
+        """
+        white_piece_mask, black_piece_mask = self._piece_color_masks(warped_image)
+
+        # Integral image: integral[y, x] = ผลรวมของ mask[:y, :x] (ทั้ง 2 channels)
+        integral = cv2.integral(cv2.merge([white_piece_mask, black_piece_mask]), sdepth=cv2.CV_64F)
+
+        def zone_sum(y1: int, y2: int, x1: int, x2: int) -> np.ndarray:
+            return integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+
         # กำหนด "โซน"
         h, w = warped_image.shape[:2]
         zone_height = h // 4 # 2 แถว
         zone_width = w // 4  # 2 คอลัมน์
 
-        top_zone = (0, zone_height)
-        bottom_zone = (h - zone_height, h)
-        left_zone = (0, zone_width)
-        right_zone = (w - zone_width, w)
-        
-        # นับ pixel สีขาว/ดำ ในแต่ละโซน
-        white_in_top = np.sum(white_piece_mask[top_zone[0]:top_zone[1], :])
-        black_in_top = np.sum(black_piece_mask[top_zone[0]:top_zone[1], :])
-        
-        white_in_bottom = np.sum(white_piece_mask[bottom_zone[0]:bottom_zone[1], :])
-        black_in_bottom = np.sum(black_piece_mask[bottom_zone[0]:bottom_zone[1], :])
-        
-        white_in_left = np.sum(white_piece_mask[:, left_zone[0]:left_zone[1]])
-        black_in_left = np.sum(black_piece_mask[:, left_zone[0]:left_zone[1]])
-        
-        white_in_right = np.sum(white_piece_mask[:, right_zone[0]:right_zone[1]])
-        black_in_right = np.sum(black_piece_mask[:, right_zone[0]:right_zone[1]])
-        
+        # นับ pixel สีขาว/ดำ ในแต่ละโซน -> [ขาว, ดำ]
+        top = zone_sum(0, zone_height, 0, w)
+        bottom = zone_sum(h - zone_height, h, 0, w)
+        left = zone_sum(0, h, 0, zone_width)
+        right = zone_sum(0, h, w - zone_width, w)
+
         # คำนวณ "คะแนน" ของแต่ละแกน
-        score_0_deg = white_in_bottom + black_in_top
-        score_180_deg = white_in_top + black_in_bottom
-        score_90_cw = white_in_left + black_in_right # 90CW = ขาวซ้าย, ดำขวา
-        score_90_ccw = white_in_right + black_in_left # 90CCW = ขาวขวา, ดำซ้าย
-
-        scores = {
-            "0": score_0_deg,
-            "180": score_180_deg,
-            "90cw": score_90_cw,
-            "90ccw": score_90_ccw
+        return {
+            "0": bottom[0] + top[1],
+            "180": top[0] + bottom[1],
+            "90cw": left[0] + right[1],  # 90CW = ขาวซ้าย, ดำขวา
+            "90ccw": right[0] + left[1], # 90CCW = ขาวขวา, ดำซ้าย
         }
 
+    def _fix_rotation_by_piece_color(self, warped_image: WarpedImage,
+                                     matrix: Optional[HomographyMatrix] = None) -> WarpedImage:
+        """
+        [UPDATE 6] กลยุทธ์: ตรวจสอบสีของ "หมาก" ไม่ใช่ "ช่อง"
+        [NEW] ถ้า lock_orientation จะตรวจครั้งเดียวต่อ Session แล้วล็อกไว้
+        """
+        with self.orientation_lock:
+            if self._orientation_is_locked(matrix):
+                return self.rotate_board(warped_image, self._orientation_turns)
+
+            if self.orientation_source == "occupancy":
+                # รอให้ StateRecognizer ส่ง Occupancy Grid มาให้ตรวจ (update_orientation_from_occupancy)
+                self.orientation_needs_check = True
+                return self.rotate_board(warped_image, self._orientation_turns or 0)
+
+            self._set_orientation(self._detect_orientation(warped_image), matrix, "piece colour")
+            return self.rotate_board(warped_image, self._orientation_turns)
+
+    def _detect_orientation(self, warped_image: WarpedImage) -> int:
+        """
+        หาทิศทางจากสีหมาก (ไม่แตะ State) -> จำนวนครั้งที่ต้องหมุน 90 องศาทวนเข็ม
+        """
+        scores = self._score_orientation(warped_image)
+
         # ค้นหาทิศทางที่คะแนนสูงสุด
         # (เพิ่ม 1 เข้าไปใน score_0_deg เพื่อเป็น "default" หากคะแนนเท่ากันหมด)
         scores["0"] += 1 
         orientation = max(scores, key=scores.get)
+        return self.ORIENTATION_TO_TURNS[orientation]
 
-        print(f"Orientation Check: Found '{orientation}' configuration (Scores: {scores})")
+    def update_orientation_from_occupancy(self, occupancy_grid: OccupancyGrid, warped_image: WarpedImage,
+                                          matrix: Optional[HomographyMatrix] = None) -> int:
+        """
+        [NEW] อนุมานทิศทางจาก Occupancy Grid ของ State 2 (แทน Mask สีหมาก)
+        
+        - แกน: หมากอยู่ที่ 2 แถวบน/ล่าง หรือ 2 คอลัมน์ซ้าย/ขวา มากกว่ากัน
+        - ฝั่ง: ความสว่างเฉลี่ยของช่องที่มีหมาก (ฝั่งหมากขาวสว่างกว่า)
+        
+        :param occupancy_grid: Occupancy ของภาพ warped_image (ภาพที่ find_and_warp คืนมา)
+        :param warped_image: ภาพกระดานที่ find_and_warp คืนมา
+        :param matrix: [NEW] Homography ที่ใช้ Warp ภาพนี้ (None = last_matrix)
+                       Pipeline ที่ S1 Warp เฟรมถัดไปไปแล้วต้องส่ง Matrix ของเฟรมนี้เอง
+        :return: จำนวนครั้งที่ต้องหมุน 90 องศาทวนเข็ม (np.rot90) เพื่อแก้ภาพ/Grid นี้ (0 = ถูกต้องแล้ว)
+        """
+        occupied = np.asarray(occupancy_grid, dtype=bool).reshape(8, 8)
+        edge_rows = occupied[[0, 1, 6, 7], :].sum()
+        edge_cols = occupied[:, [0, 1, 6, 7]].sum()
 
-        # สั่งหมุนภาพ
-        if orientation == "0":
-            return warped_image
-        elif orientation == "180":
-            return cv2.rotate(warped_image, cv2.ROTATE_180)
-        elif orientation == "90cw":
-            # ภาพหมุน 90CW (ขวา) -> เราต้องหมุนกลับ 90CCW (ซ้าย)
-            return cv2.rotate(warped_image, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        elif orientation == "90ccw":
-            # ภาพหมุน 90CCW (ซ้าย) -> เราต้องหมุนกลับ 90CW (ขวา)
-            return cv2.rotate(warped_image, cv2.ROTATE_90_CLOCKWISE)
-            
-        return warped_image
+        # ความสว่างเฉลี่ยของแต่ละช่อง (8x8) ด้วย INTER_AREA ครั้งเดียว
+        gray = cv2.cvtColor(warped_image, cv2.COLOR_BGR2GRAY)
+        square_lightness = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+        def mean_occupied(region: np.ndarray, mask: np.ndarray) -> float:
+            return float(region[mask].mean()) if mask.any() else 0.0
+
+        if edge_cols > edge_rows:
+            white_on_left = (mean_occupied(square_lightness[:, :4], occupied[:, :4]) >
+                             mean_occupied(square_lightness[:, 4:], occupied[:, 4:]))
+            correction = 1 if white_on_left else 3
+        else:
+            white_on_top = (mean_occupied(square_lightness[:4], occupied[:4]) >
+                            mean_occupied(square_lightness[4:], occupied[4:]))
+            correction = 2 if white_on_top else 0
+
+        with self.orientation_lock:
+            current = self._orientation_turns or 0
+            self._set_orientation(current + correction, matrix if matrix is not None else self.last_matrix,
+                                  "occupancy grid")
+        return correction
+
+    # --- [NEW] โหมด Tracking ---
+    def reset_tracking(self) -> None:
+        """
+        ล้าง State ทั้งหมดของ Session: Tracking, Remap Cache และ Orientation Lock
+        (เช่น เมื่อเริ่มวิดีโอใหม่)
+        """
+        self.last_detection_mode = None
+        self._last_corners = None
+        self._prev_roi_gray = None
+        self._prev_roi_rect = None
+        self._frames_since_detect = 0
+        self._remap_matrix = None
+        self._remap_maps = None
+        self.last_matrix = None
+        with self.orientation_lock:
+            self.orientation_needs_check = False
+            self._orientation_turns = None
+            self._orientation_matrix = None
+
+    def get_session_state(self) -> dict:
+        """
+        [NEW] State ของ Session ที่ต้องใช้ต่อวิดีโอหลัง Resume (แปลงเป็น JSON ได้)
+        ภาพอ้างอิงของ Optical Flow ไม่ถูกเก็บ: เฟรมแรกหลัง Resume จะ Detect ใหม่ (หรือใช้มุมเดิมถ้าไม่พบ)
+        """
+        def to_list(array: Optional[np.ndarray]) -> Optional[list]:
+            return array.tolist() if array is not None else None
+
+        with self.orientation_lock:
+            return {
+                "corners": to_list(self._last_corners),
+                "matrix": to_list(self.last_matrix),
+                "orientation_turns": self._orientation_turns,
+                "orientation_matrix": to_list(self._orientation_matrix),
+            }
+
+    def set_session_state(self, state: dict) -> None:
+        """
+        [NEW] คืน State จาก get_session_state() (ล้าง State เดิมก่อน)
+        """
+        def to_array(values: Optional[list], dtype) -> Optional[np.ndarray]:
+            return np.array(values, dtype=dtype) if values is not None else None
+
+        self.reset_tracking()
+        self._last_corners = to_array(state.get("corners"), np.float32)
+        self.last_matrix = to_array(state.get("matrix"), np.float64)
+        with self.orientation_lock:
+            self._orientation_turns = state.get("orientation_turns")
+            self._orientation_matrix = to_array(state.get("orientation_matrix"), np.float64)
+
+    def _tracking_roi(self, corners: np.ndarray, image_shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+        """
+        คำนวณ ROI (x, y, w, h) รอบ 4 มุม โดยขยายขอบตาม track_margin
+        """
+        h, w = image_shape[:2]
+        x_min, y_min = corners.min(axis=0)
+        x_max, y_max = corners.max(axis=0)
+        margin = self.track_margin * max(x_max - x_min, y_max - y_min)
+
+        x1 = int(max(0, np.floor(x_min - margin)))
+        y1 = int(max(0, np.floor(y_min - margin)))
+        x2 = int(min(w, np.ceil(x_max + margin)))
+        y2 = int(min(h, np.ceil(y_max + margin)))
+        return (x1, y1, x2 - x1, y2 - y1)
+
+    def _store_tracking_state(self, image: ImageBGR, corners: np.ndarray) -> None:
+        """
+        เก็บมุมล่าสุด และภาพ Greyscale เฉพาะ ROI รอบกระดาน (ไว้ใช้กับเฟรมถัดไป)
+        """
+        x, y, w, h = self._tracking_roi(corners, image.shape)
+        self._last_corners = corners.astype(np.float32)
+        self._prev_roi_rect = (x, y, w, h)
+        self._prev_roi_gray = cv2.cvtColor(image[y:y + h, x:x + w], cv2.COLOR_BGR2GRAY)
+
+    def _is_plausible_quad(self, corners: np.ndarray, reference: np.ndarray) -> bool:
+        """
+        ตรวจว่า 4 มุมยังเป็นสี่เหลี่ยมนูน และพื้นที่ไม่เปลี่ยนจากเดิมมากเกินไป
+        """
+        if not cv2.isContourConvex(corners.reshape(-1, 1, 2)):
+            return False
+        area = cv2.contourArea(corners)
+        ref_area = cv2.contourArea(reference)
+        if ref_area <= 0:
+            return False
+        return 0.8 <= area / ref_area <= 1.25
+
+    def _track_corners(self, image: ImageBGR) -> Optional[np.ndarray]:
+        """
+        ติดตาม 4 มุมจากเฟรมก่อนหน้าด้วย Pyramidal Lucas-Kanade (เฉพาะใน ROI)
+        คืนค่ามุมใหม่ (TL, TR, BR, BL) หรือ None ถ้าความมั่นใจต่ำ
+        """
+        if self._prev_roi_gray is None or self._last_corners is None:
+            return None
+
+        x, y, w, h = self._prev_roi_rect
+        if y + h > image.shape[0] or x + w > image.shape[1]:
+            return None # ขนาดเฟรมเปลี่ยน
+        roi_gray = cv2.cvtColor(image[y:y + h, x:x + w], cv2.COLOR_BGR2GRAY)
+
+        offset = np.array([x, y], dtype=np.float32)
+        prev_pts = (self._last_corners - offset).reshape(-1, 1, 2)
+        lk_params = dict(
+            winSize=(21, 21), maxLevel=3,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        )
+
+        # Forward-Backward check: track ไปข้างหน้า แล้วย้อนกลับ ต้องได้จุดเดิม
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_roi_gray, roi_gray, prev_pts, None, **lk_params)
+        if next_pts is None or not status.all():
+            return None
+        back_pts, back_status, _ = cv2.calcOpticalFlowPyrLK(roi_gray, self._prev_roi_gray, next_pts, None, **lk_params)
+        if back_pts is None or not back_status.all():
+            return None
+
+        fb_error = np.linalg.norm((back_pts - prev_pts).reshape(-1, 2), axis=1)
+        if fb_error.max() > self.track_max_error:
+            return None
+
+        tracked = next_pts.reshape(4, 2) + offset
+        if not self._is_plausible_quad(tracked, self._last_corners):
+            return None
+        return tracked.astype(np.float32)
+
+    def _locate_corners_tracked(self, image: ImageBGR) -> np.ndarray:
+        """
+        [NEW] หา 4 มุม (เรียงแล้ว) แบบมี State:
+        1. Track จากเฟรมก่อน (ถูกมาก)
+        2. ถ้าไม่มั่นใจ -> Full Detection
+        3. ถ้า Detection ล้มเหลว -> ใช้มุมล่าสุดที่ดี (เช่น มือบังกระดาน)
+        """
+        force_detect = (
+            self.redetect_interval > 0 and
+            self._frames_since_detect >= self.redetect_interval
+        )
+
+        corners = None if force_detect else self._track_corners(image)
+        if corners is not None:
+            self.last_detection_mode = "track"
+            self._frames_since_detect += 1
+        else:
+            try:
+                corners = self._detect_corners(image)
+                self.last_detection_mode = "detect"
+                self._frames_since_detect = 0
+            except BoardNotFoundException:
+                if self._last_corners is None:
+                    raise
+                # ใช้มุมเดิม และไม่อัปเดตภาพอ้างอิง (ภาพปัจจุบันอาจมีสิ่งบดบัง)
+                self.last_detection_mode = "reuse"
+                self._frames_since_detect += 1
+                return self._last_corners
+
+        self._store_tracking_state(image, corners)
+        return corners
+
+    # --- [NEW] โหมด Pyramid (Coarse-to-Fine) ---
+    def _refine_corners(self, image: ImageBGR, corners: np.ndarray, search_radius: int) -> np.ndarray:
+        """
+        Refine มุมแต่ละมุมด้วย cornerSubPix ในหน้าต่างเล็กๆ รอบมุมหยาบ
+        (แปลงเป็น Greyscale เฉพาะหน้าต่าง ไม่ใช่ทั้งภาพ)
+        """
+        h, w = image.shape[:2]
+        # หน้าต่างของ cornerSubPix ต้องครอบคลุมความคลาดเคลื่อนของมุมหยาบ
+        refine_window = max(self.refine_window, search_radius)
+        half = search_radius + refine_window + 2
+        criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+
+        refined = corners.astype(np.float32).copy()
+        for i, (cx, cy) in enumerate(corners):
+            x1, y1 = int(max(0, cx - half)), int(max(0, cy - half))
+            x2, y2 = int(min(w, cx + half + 1)), int(min(h, cy + half + 1))
+            if x2 - x1 < 3 or y2 - y1 < 3:
+                continue
+            window_gray = cv2.cvtColor(image[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+
+            pt = np.array([[[cx - x1, cy - y1]]], dtype=np.float32)
+            win = max(2, min(refine_window, (min(x2 - x1, y2 - y1) - 1) // 2))
+            cv2.cornerSubPix(window_gray, pt, (win, win), (-1, -1), criteria)
+            new_pt = pt.reshape(2) + np.array([x1, y1], dtype=np.float32)
+
+            # ถ้า Refine แล้วหลุดไปไกลเกินรัศมีค้นหา ให้ใช้มุมหยาบเดิม
+            if np.linalg.norm(new_pt - corners[i]) <= 1.5 * search_radius:
+                refined[i] = new_pt
+        return refined
+
+    def _detect_corners_pyramid(self, image: ImageBGR, record_debug: bool = True) -> np.ndarray:
+        """
+        Coarse: Mask/Morphology/Contour บนภาพย่อ (ขนาดไม่เกิน pyramid_max_side)
+        Fine: Refine 4 มุมที่ความละเอียดเต็ม
+        """
+        h, w = image.shape[:2]
+        scale = self.pyramid_max_side / float(max(h, w))
+        if scale >= 1.0:
+            return self._detect_corners_full(image, record_debug)
+
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # Kernel ของ Morphology ต้องเล็กลงตามสเกล (ขั้นต่ำ 3x3)
+        kernel_size = max(3, int(round(5 * scale)) | 1)
+        largest_contour = self._isolate_board_mask(small, kernel_size=kernel_size, record_debug=record_debug)
+        coarse = self._find_corners_from_contour(largest_contour).astype(np.float32) / scale
+        ordered = self._order_corners(coarse)
+
+        # 1 pixel ของภาพย่อ = 1/scale pixels ของภาพเต็ม
+        search_radius = int(np.ceil(2.0 / scale))
+        return self._refine_corners(image, ordered, search_radius)
+
+    def _detect_corners(self, image: ImageBGR, record_debug: bool = True) -> np.ndarray:
+        """
+        Full Detection: Mask -> Contour -> 4 มุม -> เรียงลำดับ (TL, TR, BR, BL)
+        [NEW] ถ้าล้มเหลวและเปิด lattice_fallback จะลอง LatticeDetector (ภายใน Time Budget)
+        :param record_debug: [NEW] เก็บผลระหว่างทางไว้ที่ self.debug_mask / lattice_detector.last_*
+                             (False = ไม่เขียน State ร่วมเลย)
+        """
+        start = time.perf_counter()
+        try:
+            if self.pyramid:
+                return self._detect_corners_pyramid(image, record_debug)
+            return self._detect_corners_full(image, record_debug)
+        except BoardNotFoundException:
+            if not self.lattice_fallback:
+                raise
+
+        deadline = start + self.lattice_time_budget_ms / 1000.0
+        if time.perf_counter() >= deadline:
+            raise BoardNotFoundException("Mask สีล้มเหลว และไม่เหลือเวลาสำหรับ Lattice detector")
+        try:
+            corners = self.lattice_detector.find_corners(image, deadline=deadline, record_debug=record_debug)
+        except LinesNotFoundException as e:
+            raise BoardNotFoundException(f"Mask สีและ Lattice detector ล้มเหลว: {e}") from e
+        return self._order_corners(corners)
+
+    def _detect_corners_full(self, image: ImageBGR, record_debug: bool = True) -> np.ndarray:
+        largest_contour = self._isolate_board_mask(image, record_debug=record_debug)
+        corners = self._find_corners_from_contour(largest_contour)
+        return self._order_corners(corners)
+
+    def _compute_matrix(self, ordered_src_pts: np.ndarray) -> HomographyMatrix:
+        dst_pts = np.array([
+            [0, 0],
+            [self.warped_size - 1, 0],
+            [self.warped_size - 1, self.warped_size - 1],
+            [0, self.warped_size - 1]
+        ], dtype="float32")
+        return cv2.getPerspectiveTransform(ordered_src_pts.astype(np.float32), dst_pts)
+
+    def _warp(self, image: ImageBGR, matrix: HomographyMatrix) -> Tuple[WarpedImage, HomographyMatrix]:
+        """
+        [NEW] Warp ภาพกระดาน
+        ถ้าเปิด remap_cache จะใช้ Map เดิมตราบที่ Homography ขยับไม่เกิน remap_tolerance
+        (คืนค่า Matrix ที่ใช้ Warp จริง เพื่อให้สอดคล้องกับภาพ)
+        """
+        if not self.remap_cache:
+            return image_utils.warp_image(image, matrix, self.warped_size), matrix
+
+        if (self._remap_matrix is None or
+                image_utils.homography_drift(self._remap_matrix, matrix, self.warped_size) > self.remap_tolerance):
+            self._remap_maps = image_utils.build_warp_maps(
+                matrix, self.warped_size, fixed_point=self.fixed_point_maps
+            )
+            self._remap_matrix = matrix
+
+        return image_utils.remap_image(image, self._remap_maps), self._remap_matrix
 
     def find_and_warp(self, image: ImageBGR) -> Tuple[WarpedImage, HomographyMatrix]:
         """
         Main method:
         1. Mask, Contour, Hull, approxPolyDP
+           ([NEW] หรือ Track มุมจากเฟรมก่อน ถ้าเปิด tracking)
         2. [NEW] Order corners using robust X-Sort
         3. Warp
         4. Fix rotation by piece color
         """
+        matrix = self._locate_matrix(image)
+        initial_warp, matrix = self._warp(image, matrix)
+        self.last_matrix = matrix
         
-        largest_contour = self._isolate_board_mask(image)
-        corners = self._find_corners_from_contour(largest_contour)
+        final_warped_image = self._fix_rotation_by_piece_color(initial_warp, matrix)
         
-        # [NEW] เรียกใช้ _order_corners ที่แก้ไขแล้ว
-        ordered_src_pts = self._order_corners(corners)
+        return final_warped_image, matrix
 
-        dst_pts = np.array([
-            [0, 0],
-            [self.warped_size - 1, 0],
-            [self.warped_size - 1, self.warped_size - 1],
-            [0, self.warped_size - 1]
-        ], dtype="float32")
+    def _locate_matrix(self, image: ImageBGR) -> HomographyMatrix:
+        if self.tracking:
+            ordered_src_pts = self._locate_corners_tracked(image)
+        else:
+            ordered_src_pts = self._detect_corners(image)
+        return self._compute_matrix(ordered_src_pts)
 
-        matrix = cv2.getPerspectiveTransform(ordered_src_pts, dst_pts)
+    def locate_board(self, image: ImageBGR) -> HomographyMatrix:
+        """
+        [NEW] หาเฉพาะ Homography (ภาพต้นฉบับ -> กระดานที่หมุนทิศทางแล้ว) โดยไม่ Warp ภาพ
+        สำหรับ Pipeline ที่สุ่มตัวอย่างช่องจากภาพต้นฉบับโดยตรง (SquareSampler)
+        
+        จะ Warp เฉพาะเมื่อต้องตรวจทิศทางจากสีหมาก (เฟรมแรก หรือเมื่อ Homography ขยับมาก)
+        """
+        matrix = self._locate_matrix(image)
+        self.last_matrix = matrix
+        if not self._orientation_is_locked(matrix):
+            initial_warp = image_utils.warp_image(image, matrix, self.warped_size)
+            self._fix_rotation_by_piece_color(initial_warp, matrix)
+        return self.last_board_matrix
+
+    # --- [NEW] Batch API ---
+    def _find_and_warp_independent(self, image: ImageBGR) -> Tuple[WarpedImage, HomographyMatrix]:
+        """
+        find_and_warp แบบไม่มี State (ไม่ใช้ Tracking/Remap Cache/Orientation Lock)
+        ปลอดภัยสำหรับการเรียกพร้อมกันหลาย Thread
+        [UPDATE] ไม่เขียน debug_mask / lattice_detector.last_* (ค่าเหล่านี้จึงไม่สะท้อนภาพจาก find_and_warp_many)
+        """
+        ordered_src_pts = self._detect_corners(image, record_debug=False)
+        matrix = self._compute_matrix(ordered_src_pts)
         initial_warp = image_utils.warp_image(image, matrix, self.warped_size)
+        return self.rotate_board(initial_warp, self._detect_orientation(initial_warp)), matrix
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.num_workers, thread_name_prefix="board-locator"
+            )
+        return self._executor
+
+    def find_and_warp_many(self, images: Sequence[ImageBGR]) -> List[LocatorResult]:
+        """
+        [NEW] รัน S1 กับหลายภาพพร้อมกันด้วย Thread Pool (OpenCV ปล่อย GIL ระหว่างคำนวณ)
         
-        final_warped_image = self._fix_rotation_by_piece_color(initial_warp)
+        แต่ละภาพถูกประมวลผลแยกกัน (ไม่มี Tracking/Orientation Lock)
+        ภาพที่ล้มเหลวจะไม่ทำให้ทั้ง Batch ล้ม แต่จะเก็บ Exception ไว้ใน LocatorResult.error
         
-        return final_warped_image, matrix
\ No newline at end of file
+        :return: List ของ LocatorResult เรียงตามลำดับภาพที่ส่งเข้ามา
+        """
+        def run(image: ImageBGR) -> LocatorResult:
+            try:
+                if image is None:
+                    raise ValueError("ภาพเป็น None (อ่านไฟล์ไม่สำเร็จ?)")
+                warped, matrix = self._find_and_warp_independent(image)
+                return LocatorResult(warped_image=warped, matrix=matrix)
+            except Exception as e:
+                return LocatorResult(warped_image=None, matrix=None, error=e)
+
+        return list(self._get_executor().map(run, images))
+
+    def close(self) -> None:
+        """
+        [NEW] ปิด Thread Pool ของ find_and_warp_many
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
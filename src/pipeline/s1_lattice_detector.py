@@ -0,0 +1,253 @@
+"""
+[NEW FILE]
+State 1 (ทางเลือกที่ 2): Hough-Lattice Board Detector
+
+ใช้เมื่อการ Mask สี (กระดานเขียว/ขาว) ล้มเหลว เช่น กระดานสีอื่น
+1. Canny + HoughLinesP (preprocess_for_lines, find_hough_lines)
+2. แบ่งเส้นเป็น 2 กลุ่มตามทิศทาง แล้วรวมเส้นที่ซ้อนกัน
+3. เลือก 7-9 เส้นติดกันที่ระยะห่างสม่ำเสมอต่อกลุ่ม -> หาจุดตัด (NumPy Broadcast ครั้งเดียว)
+4. Fit Homography จากทุกจุดตัด แล้วคืนค่า 4 มุมนอกของกระดาน
+
+[UPDATE 1]:
+- รวมเส้นด้วยระยะบนแกนกลางของกลุ่ม (แทนระยะของจุดกึ่งกลาง Segment) -> เส้นเดียวกันที่ขาดเป็นท่อนๆ
+  ในภาพมุมเอียง (Perspective) ถูกรวมเป็นเส้นเดียว
+- เส้นที่พบอาจไม่ครบ (ขอบนอกหายไปด้านใดด้านหนึ่ง) หรือเกิน (ขอบโต๊ะ/กรอบกระดาน)
+  จึงลองทุกตำแหน่งที่เป็นไปได้ของเส้นใน Lattice (0-8) แล้วให้คะแนนแต่ละสมมติฐานด้วย
+  ความสลับสีของ 8x8 ช่อง (Checkerboard) + Edge บนขอบนอกทั้ง 4 ด้าน
+  ถ้าสมมติฐานที่ดีที่สุดชนะไม่ขาด -> BoardNotFoundException (ไม่คืน Warp ที่ผิดไป 1 ช่อง)
+"""
+import time
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+
+from src.core.typing import ImageBGR, HomographyMatrix, Lines
+from src.core.exceptions import BoardNotFoundException, LinesNotFoundException
+from src.utils import image_utils
+
+class LatticeDetector:
+    """
+    ค้นหากระดานจาก Lattice ของเส้นตาราง 9x9
+    """
+    NUM_LINES = 9 # เส้นตาราง 9 เส้นต่อแกน (8 ช่อง)
+
+    SCORE_SIZE = 128 # ขนาดภาพ Warp ที่ใช้ให้คะแนนสมมติฐาน (pixels)
+
+    def __init__(self, warped_size: int = 600, min_family_angle: float = 30.0,
+                 merge_ratio: float = 0.01, min_line_ratio: float = 0.05,
+                 max_spacing_cv: float = 0.35, min_score_margin: float = 0.1):
+        """
+        :param warped_size: ขนาดภาพ Warp (ใช้กำหนดพิกัด Lattice ปลายทาง)
+        :param min_line_ratio: ความยาวเส้นขั้นต่ำของ Hough (สัดส่วนของเส้นทแยงมุมภาพ)
+        :param min_family_angle: มุมต่างขั้นต่ำ (องศา) ระหว่าง 2 กลุ่มเส้น
+        :param merge_ratio: ระยะ (สัดส่วนของเส้นทแยงมุมภาพ) ที่ถือว่าเส้นซ้อนกัน
+        :param max_spacing_cv: [NEW] CV สูงสุดของระยะห่างระหว่างเส้นที่ยังถือว่าเป็นเส้นตาราง
+        :param min_score_margin: [NEW] คะแนนที่สมมติฐานดีที่สุดต้องชนะอันดับสอง (ไม่เช่นนั้นถือว่ากำกวม)
+        """
+        self.warped_size = warped_size
+        self.min_family_angle = min_family_angle
+        self.merge_ratio = merge_ratio
+        self.min_line_ratio = min_line_ratio
+        self.max_spacing_cv = max_spacing_cv
+        self.min_score_margin = min_score_margin
+        self.last_score: Optional[float] = None
+        self.last_matrix: Optional[HomographyMatrix] = None
+        self.last_lattice: Optional[np.ndarray] = None # (9, 9, 2) สำหรับ Debug
+
+    @staticmethod
+    def _check_deadline(deadline: Optional[float]) -> None:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise BoardNotFoundException("Lattice detector: เกินเวลาที่กำหนด (time budget)")
+
+    def _split_families(self, segments: np.ndarray) -> List[np.ndarray]:
+        """
+        แบ่งเส้นเป็น 2 กลุ่มตามทิศทาง (k-means บน (cos 2θ, sin 2θ) เพื่อให้ θ กับ θ+180 เป็นทิศเดียวกัน)
+        """
+        dx = segments[:, 2] - segments[:, 0]
+        dy = segments[:, 3] - segments[:, 1]
+        theta = np.arctan2(dy, dx)
+        features = np.stack([np.cos(2 * theta), np.sin(2 * theta)], axis=1).astype(np.float32)
+
+        criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_MAX_ITER, 20, 1e-3)
+        _, labels, centers = cv2.kmeans(features, 2, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+        labels = labels.ravel()
+
+        # มุมระหว่างกลุ่ม (centers อยู่ในปริภูมิ 2θ)
+        angles = np.arctan2(centers[:, 1], centers[:, 0]) / 2
+        diff = np.degrees(abs(angles[0] - angles[1])) % 180
+        if min(diff, 180 - diff) < self.min_family_angle:
+            raise LinesNotFoundException("ไม่พบเส้น 2 ทิศทางที่ตัดกัน")
+
+        return [segments[labels == k] for k in range(2)]
+
+    @staticmethod
+    def _axis_offsets(lines: np.ndarray, center: np.ndarray, normal: np.ndarray) -> np.ndarray:
+        """
+        ตำแหน่งที่แต่ละเส้น (มองเป็นเส้นตรงยาว) ตัดแกนที่ผ่าน center ตามทิศ normal
+        (เส้นในกลุ่มเดียวกันเอียงไม่เท่ากันในภาพ Perspective จึงต้องวัดที่แกนเดียวกัน)
+        """
+        p = lines[:, 0:2]
+        d = lines[:, 2:4] - lines[:, 0:2]
+        line_normal = np.stack([-d[:, 1], d[:, 0]], axis=1)
+        denominator = line_normal @ normal
+        denominator = np.where(np.abs(denominator) < 1e-9, 1e-9, denominator)
+        return np.einsum("ij,ij->i", p - center, line_normal) / denominator
+
+    def _merge_family(self, family: np.ndarray, merge_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        รวมเส้นในกลุ่มเดียวกันที่ซ้อนกัน (ตำแหน่งบนแกนกลางใกล้กัน) ด้วย cv2.fitLine
+        :return: ((K, 4) เส้นที่รวมแล้ว, (K,) ตำแหน่งบนแกน) เรียงตามตำแหน่ง
+        """
+        direction = family[:, 2:4] - family[:, 0:2]
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        # ทำให้ทิศทางชี้ไปทางเดียวกันก่อนเฉลี่ย
+        direction *= np.sign(direction @ direction[0])[:, None]
+        mean_dir = direction.mean(axis=0)
+        normal = np.array([-mean_dir[1], mean_dir[0]]) / np.linalg.norm(mean_dir)
+        center = ((family[:, 0:2] + family[:, 2:4]) / 2).mean(axis=0)
+
+        offsets = self._axis_offsets(family, center, normal)
+        order = np.argsort(offsets)
+        sorted_offsets = offsets[order]
+
+        # เริ่มกลุ่มใหม่เมื่อ offset กระโดดเกิน merge_distance
+        breaks = np.flatnonzero(np.diff(sorted_offsets) > merge_distance) + 1
+        merged = []
+        for group in np.split(order, breaks):
+            points = np.concatenate([family[group, 0:2], family[group, 2:4]]).astype(np.float32)
+            vx, vy, x0, y0 = cv2.fitLine(points, cv2.DIST_L2, 0, 0.01, 0.01).ravel()
+            merged.append((x0 - vx, y0 - vy, x0 + vx, y0 + vy))
+
+        merged = np.array(merged, dtype=np.float64)
+        merged_offsets = self._axis_offsets(merged, center, normal)
+        order = np.argsort(merged_offsets)
+        return merged[order], merged_offsets[order]
+
+    def _lattice_hypotheses(self, lines: np.ndarray, offsets: np.ndarray) -> List[Tuple[np.ndarray, int]]:
+        """
+        สมมติฐานของตำแหน่งเส้นใน Lattice: ทุกช่วง 7-9 เส้นติดกันที่ระยะห่างสม่ำเสมอ
+        x ทุกตำแหน่งเริ่มที่เป็นไปได้ (ไม่รู้ว่าขอบนอกด้านไหนหายไป)
+        สมมติฐานที่ให้ Lattice เดียวกัน (shift = first - start เท่ากัน) เก็บเฉพาะอันที่ใช้เส้นมากที่สุด
+        :return: List ของ (เส้นที่เลือก, index ของเส้นแรกใน Lattice 0-8)
+        """
+        gaps = np.abs(np.diff(offsets))
+        by_shift = {}
+        for count in range(min(len(lines), self.NUM_LINES), self.NUM_LINES - 3, -1):
+            for start in range(len(lines) - count + 1):
+                window = gaps[start:start + count - 1]
+                if window.std() / max(window.mean(), 1e-6) > self.max_spacing_cv:
+                    continue
+                for first in range(self.NUM_LINES - count + 1):
+                    shift = first - start
+                    if shift not in by_shift: # count เรียงจากมากไปน้อย
+                        by_shift[shift] = (lines[start:start + count], first)
+        if not by_shift:
+            raise LinesNotFoundException(
+                f"ไม่พบเส้นตาราง {self.NUM_LINES - 2}+ เส้นที่ระยะห่างสม่ำเสมอ (พบ {len(lines)} เส้น)"
+            )
+        return list(by_shift.values())
+
+    def _score_lattice(self, gray: np.ndarray, edges: np.ndarray, matrix: HomographyMatrix) -> float:
+        """
+        คะแนนของ Homography (ภาพ -> Lattice) = ความสลับสีของ 8x8 ช่อง [0, 1] + Edge ของขอบนอกด้านที่แย่ที่สุด [0, 1]
+        Lattice ที่เลื่อนไป 1 ช่องจะมีแถว/คอลัมน์ของพื้นหลังปนอยู่ และขอบนอกด้านหนึ่งไม่มี Edge
+        """
+        scale = self.SCORE_SIZE / (self.warped_size - 1)
+        to_score = np.diag([scale, scale, 1.0]) @ matrix
+        warped = cv2.warpPerspective(gray, to_score, (self.SCORE_SIZE, self.SCORE_SIZE))
+        means = cv2.resize(warped, (8, 8), interpolation=cv2.INTER_AREA).astype(np.float64)
+
+        checker = np.where(np.add.outer(np.arange(8), np.arange(8)) % 2 == 0, 1.0, -1.0)
+        horizontal = (means[:, 1:] - means[:, :-1]) * checker[:, :-1]
+        vertical = (means[1:, :] - means[:-1, :]) * checker[:-1, :]
+        total = np.abs(horizontal).sum() + np.abs(vertical).sum()
+        alternation = abs(horizontal.sum() + vertical.sum()) / total if total > 0 else 0.0
+
+        # จุดตัวอย่างบนขอบนอกทั้ง 4 ด้าน (พิกัด Lattice) -> ภาพต้นฉบับ
+        size = self.warped_size - 1
+        t = np.linspace(0.05, 0.95, 32) * size
+        zeros, fulls = np.zeros_like(t), np.full_like(t, size)
+        sides = [np.stack(xy, axis=1) for xy in ((t, zeros), (t, fulls), (zeros, t), (fulls, t))]
+        points = cv2.perspectiveTransform(
+            np.concatenate(sides).reshape(-1, 1, 2), np.linalg.inv(matrix)
+        ).reshape(4, -1, 2)
+        x = np.round(points[..., 0]).astype(int)
+        y = np.round(points[..., 1]).astype(int)
+        h, w = edges.shape[:2]
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        hits = np.zeros(x.shape, dtype=bool)
+        hits[inside] = edges[y[inside], x[inside]] > 0
+        edge_support = float(hits.mean(axis=1).min())
+        return alternation + edge_support
+
+    def find_corners(self, image: ImageBGR, deadline: Optional[float] = None,
+                     record_debug: bool = True) -> np.ndarray:
+        """
+        Main method: คืนค่า 4 มุมนอกของกระดาน (ยังไม่เรียงลำดับ) จาก Homography ที่ Fit ด้วยทุกจุดตัด
+
+        :param deadline: เวลา (time.perf_counter()) ที่ต้องยกเลิกการค้นหา
+        :param record_debug: [NEW] เก็บผลไว้ที่ last_matrix / last_lattice / last_score
+                             (False = ไม่เขียน State ของ Object เรียกพร้อมกันหลาย Thread ได้)
+        """
+        edges = image_utils.preprocess_for_lines(image)
+        self._check_deadline(deadline)
+
+        h, w = image.shape[:2]
+        diagonal = np.hypot(h, w)
+        min_line_length = max(20, int(self.min_line_ratio * diagonal))
+        segments: Lines = image_utils.find_hough_lines(
+            edges, threshold=min_line_length // 2,
+            min_line_length=min_line_length, max_line_gap=max(10, min_line_length // 4)
+        )
+        if len(segments) < 2 * self.NUM_LINES:
+            raise LinesNotFoundException(f"พบเส้นไม่พอ ({len(segments)} เส้น)")
+        self._check_deadline(deadline)
+
+        merge_distance = self.merge_ratio * diagonal
+        families = self._split_families(np.asarray(segments, dtype=np.float64))
+        hypotheses_i, hypotheses_j = [
+            self._lattice_hypotheses(*self._merge_family(f, merge_distance)) for f in families
+        ]
+        self._check_deadline(deadline)
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        edge_mask = cv2.dilate(edges, np.ones((5, 5), np.uint8)) # ยอมให้คลาด 2 pixels
+        step = (self.warped_size - 1) / (self.NUM_LINES - 1)
+        scored = []
+        for lines_i, first_i in hypotheses_i:
+            for lines_j, first_j in hypotheses_j:
+                self._check_deadline(deadline)
+                # จุดตัดทั้งหมด (สูงสุด 9x9) ด้วย Broadcast ครั้งเดียว (มองเป็นเส้นตรงยาวไม่สิ้นสุด)
+                points, valid = image_utils.calculate_intersections(lines_i, lines_j, segments_only=False)
+                if not valid.all():
+                    continue
+
+                # Lattice ปลายทาง (i = เส้นในกลุ่ม 0, j = เส้นในกลุ่ม 1)
+                grid_i = (first_i + np.arange(len(lines_i), dtype=np.float64)) * step
+                grid_j = (first_j + np.arange(len(lines_j), dtype=np.float64)) * step
+                dst_i, dst_j = np.meshgrid(grid_i, grid_j, indexing="ij")
+                dst = np.stack([dst_j, dst_i], axis=-1).reshape(-1, 2)
+
+                matrix, inliers = cv2.findHomography(points.reshape(-1, 2), dst, cv2.RANSAC, 3.0)
+                if matrix is None or inliers.sum() < 0.5 * inliers.size:
+                    continue
+                scored.append((self._score_lattice(gray, edge_mask, matrix), matrix, points))
+
+        if not scored:
+            raise BoardNotFoundException("Fit Homography จาก Lattice ไม่สำเร็จ")
+        scored.sort(key=lambda item: item[0], reverse=True)
+        best_score, matrix, points = scored[0]
+        if len(scored) > 1 and best_score - scored[1][0] < self.min_score_margin:
+            raise BoardNotFoundException(
+                f"Lattice กำกวม: ตำแหน่งขอบนอกไม่ชัดเจน (คะแนน {best_score:.2f} vs {scored[1][0]:.2f})"
+            )
+        if record_debug:
+            self.last_matrix = matrix
+            self.last_lattice = points
+            self.last_score = best_score
+
+        # 4 มุมนอกในภาพต้นฉบับ
+        size = self.warped_size - 1
+        dst_corners = np.array([[0, 0], [size, 0], [size, size], [0, size]], dtype=np.float64)
+        corners = cv2.perspectiveTransform(dst_corners.reshape(-1, 1, 2), np.linalg.inv(matrix))
+        return corners.reshape(4, 2).astype(np.float32)
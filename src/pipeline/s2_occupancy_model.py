@@ -8,9 +8,11 @@ State 2: Occupancy Classification (Inference Wrapper)
 import torch
 import cv2
 import numpy as np
-import torchvision.transforms as T
-from typing import List
-from src.core.typing import SquareImage, OccupancyGrid, ImageRGB
+from typing import List, Optional, Sequence, Union
+from src.core.typing import SquareImage, OccupancyGrid, ImageRGB, SquareBatch
+from src.utils.tensor_utils import BatchPreprocessor
+from src.utils import image_utils
+from src.inference.engines import BACKENDS, InferenceEngine, load_engine
 
 # [FIX]
 # Import LightningModule ของเราจาก sub-folder 'occupancy'
@@ -20,22 +22,38 @@ class OccupancyModel:
     """
     Wrapper สำหรับโมเดล Occupancy (State 2)
     """
-    def __init__(self, model_path: str, use_dummy: bool = False):
+    def __init__(self, model_path: str, use_dummy: bool = False, pin_memory: bool = False,
+                 backend: str = "torch", cascade: bool = False,
+                 empty_threshold: float = 0.005, occupied_threshold: float = 0.20,
+                 cascade_center_fraction: float = 0.5, cascade_edge_threshold: float = 24.0):
+        """
+        :param pin_memory: [NEW] ใช้ Pinned-memory Staging Buffer ตอนส่ง Batch ไป GPU
+        :param backend: [NEW] Inference Backend ("torch", "torch_compile", "torchscript", "onnx", "int8")
+                        Backend ที่ไม่ใช่ torch จะโหลด Artifact ที่ Export ไว้ข้าง model_path
+        :param cascade: [NEW] โหมด Cascade: ตัดสินช่องที่ชัดเจนด้วย Edge Density ก่อน
+                        แล้วส่งเฉพาะช่องที่ก้ำกึ่งเข้า CNN
+        :param empty_threshold: Edge Density <= ค่านี้ -> ว่างแน่นอน
+        :param occupied_threshold: Edge Density >= ค่านี้ -> มีหมากแน่นอน
+        :param cascade_center_fraction: สัดส่วนบริเวณกลางช่องที่ใช้คำนวณ (image_utils.square_edge_density)
+        :param cascade_edge_threshold: ค่า Gradient ขั้นต่ำที่ถือเป็นขอบ
+        (ปรับ Threshold เทียบกับ val_acc ด้วย scripts/tune_occupancy_cascade.py)
+        """
+        if cascade and not empty_threshold < occupied_threshold:
+            raise ValueError("empty_threshold must be lower than occupied_threshold")
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.use_dummy = use_dummy
-        self.model = None
+        self.backend = backend
+        self.engine: Optional[InferenceEngine] = None
 
         if self.use_dummy:
             print("[OccupancyModel] Using DUMMY model for testing.")
         else:
             try:
-                # ใช้วิธีโหลด Checkpoint ของ Lightning
-                self.model = OccupancyLitModel.load_from_checkpoint(
-                    checkpoint_path=model_path,
-                    map_location=self.device
-                )
-                self.model.eval() # ตั้งเป็นโหมดประเมินผล
-                print(f"[OccupancyModel] Loaded Lightning checkpoint from: {model_path}")
+                # [UPDATE 11] โหลดผ่าน Inference Engine (Lightning checkpoint หรือ Artifact ที่ Export แล้ว)
+                self.engine = load_engine(backend, OccupancyLitModel, model_path, self.device)
+                print(f"[OccupancyModel] Loaded {backend} model from: {model_path}")
             except FileNotFoundError:
                 print(f"!!! Error: Model checkpoint not found at {model_path}")
                 print("!!! Switching to DUMMY model.")
@@ -46,21 +64,24 @@ class OccupancyModel:
                 self.use_dummy = True
 
         # Transform มาตรฐาน (Paper ใช้ 100x100)
-        self.transform = T.Compose([
-            T.ToTensor(),
-            T.Resize((100, 100), antialias=True), 
-            T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
+        self.input_size = OccupancyLitModel.INPUT_SIZE
+        # [UPDATE 10] Preprocess ทั้ง Batch ในครั้งเดียว (แทน Transform ทีละช่อง)
+        self.preprocessor = BatchPreprocessor(self.input_size, self.device, pin_memory=pin_memory)
+
+        # [NEW] Cascade (Classical fast path)
+        self.cascade = cascade
+        self.empty_threshold = empty_threshold
+        self.occupied_threshold = occupied_threshold
+        self.cascade_center_fraction = cascade_center_fraction
+        self.cascade_edge_threshold = cascade_edge_threshold
+        # จำนวนช่องที่แต่ละ Tier ตัดสินในเฟรมล่าสุด {"empty": ., "occupied": ., "cnn": .}
+        self.last_cascade_stats = {"empty": 0, "occupied": 0, "cnn": 0}
 
-    def _preprocess(self, squares: List[SquareImage]) -> torch.Tensor:
+    def _preprocess(self, squares: Union[SquareBatch, List[SquareImage]]) -> torch.Tensor:
         """
-        แปลง List ของภาพ (OpenCV BGR) เป็น Batch Tensor (PyTorch RGB)
+        แปลงภาพ (OpenCV BGR) เป็น Batch Tensor (PyTorch RGB) บน device ของโมเดล
         """
-        batch = torch.stack([
-            self.transform(cv2.cvtColor(sq, cv2.COLOR_BGR2RGB)) 
-            for sq in squares
-        ])
-        return batch.to(self.device)
+        return self.preprocessor(squares)
 
     def _run_dummy_model(self) -> OccupancyGrid:
         """
@@ -72,21 +93,127 @@ class OccupancyModel:
                 grid[i] = True
         return grid
 
-    def predict(self, squares: List[SquareImage]) -> OccupancyGrid:
+    def predict(self, squares: Union[SquareBatch, List[SquareImage]]) -> OccupancyGrid:
         """
-        Input: List 64 ภาพของช่อง (BGR)
+        Input: List 64 ภาพของช่อง (BGR) หรือ Array (64, H, W, 3)
         Output: List 64 booleans (True = Occupied)
         """
-        if not squares or len(squares) != 64:
+        if len(squares) != 64:
             return [False] * 64
             
         if self.use_dummy:
             return self._run_dummy_model()
 
         # --- Logicสำหรับโมเดลจริง ---
+        return self._classify(squares)
+
+    def predict_many(self, frames: Sequence[SquareBatch]) -> List[OccupancyGrid]:
+        """
+        [NEW] รวม 64 ช่องของหลายเฟรมเป็น Batch เดียว แล้วแยกผลกลับตามเฟรม
+        Input: List ของ Array (64, H, W, 3) ต่อเฟรม (ขนาดเท่ากันทุกเฟรม)
+        Output: List ของ OccupancyGrid ตามลำดับเฟรม
+        (last_cascade_stats เป็นผลรวมของทุกเฟรมใน Batch)
+        """
+        if not frames:
+            return []
+        if any(len(squares) != 64 for squares in frames):
+            raise ValueError("Each frame must have 64 squares")
+        if self.use_dummy:
+            return [self._run_dummy_model() for _ in frames]
+
+        occupied = self._classify(np.concatenate([np.asarray(squares) for squares in frames]))
+        return [occupied[offset:offset + 64] for offset in range(0, len(occupied), 64)]
+
+    def predict_subset(self, squares: Union[SquareBatch, List[SquareImage]],
+                       indices: Sequence[int]) -> List[bool]:
+        """
+        [NEW] ทำนายเฉพาะบางช่อง (เช่น ช่องที่เปลี่ยนไปจากเฟรมก่อน)
+        Input:
+            - squares: ภาพของช่องที่เลือก (N ภาพ)
+            - indices: ตำแหน่ง (0-63) ของแต่ละภาพ
+        Output: List N booleans (ลำดับเดียวกับ indices)
+        """
+        if len(indices) == 0:
+            return []
+        if self.use_dummy:
+            grid = self._run_dummy_model()
+            return [grid[i] for i in indices]
+        return self._classify(squares)
+
+    def predict_proba_subset(self, squares: Union[SquareBatch, List[SquareImage]],
+                             indices: Sequence[int]) -> np.ndarray:
+        """
+        [NEW] ความน่าจะเป็นที่แต่ละช่องมีหมาก -> (N,) float32 (ลำดับเดียวกับ indices)
+        ช่องที่ Cascade ตัดสินแบบ Classical ได้ค่า 0.0 / 1.0
+        """
+        if len(indices) == 0:
+            return np.empty(0, dtype=np.float32)
+        if self.use_dummy:
+            grid = self._run_dummy_model()
+            return np.array([float(grid[i]) for i in indices], dtype=np.float32)
+
+        squares = self.preprocessor.stack(squares)
+        if not self.cascade:
+            return self._predict_occupied_proba(squares)
+
+        density = image_utils.square_edge_density(
+            squares,
+            center_fraction=self.cascade_center_fraction,
+            edge_threshold=self.cascade_edge_threshold
+        )
+        proba = (density >= self.occupied_threshold).astype(np.float32)
+        ambiguous = np.flatnonzero((density > self.empty_threshold) & (density < self.occupied_threshold))
+        if ambiguous.size:
+            proba[ambiguous] = self._predict_occupied_proba(squares[ambiguous])
+        return proba
+
+    def _predict_occupied_proba(self, squares: SquareBatch) -> np.ndarray:
+        with torch.no_grad():
+            logits = self.engine(self._preprocess(squares))
+            proba = torch.softmax(logits.float(), dim=1)[:, 1] # 1=Occupied
+        return proba.cpu().numpy()
+
+    def _classify(self, squares: Union[SquareBatch, List[SquareImage]]) -> List[bool]:
+        """
+        ทำนายทุกภาพที่ส่งมา (ผ่าน Cascade ถ้าเปิดไว้)
+        """
+        if self.cascade:
+            return self._predict_cascade(self.preprocessor.stack(squares))
+
+        preds = self.predict_indices(squares)
+        self.last_cascade_stats = {"empty": 0, "occupied": 0, "cnn": len(preds)}
+        return [bool(p) for p in preds]
+
+    def predict_indices(self, squares: Union[SquareBatch, List[SquareImage]]) -> List[int]:
+        """
+        รัน CNN แล้วคืน Class index (0=Empty, 1=Occupied) ของแต่ละภาพ
+        [UPDATE] Public: ใช้ CNN อย่างเดียวเสมอ (ไม่ผ่าน Cascade) เช่น scripts/tune_occupancy_cascade.py
+        """
         with torch.no_grad():
             batch = self._preprocess(squares)
-            logits = self.model(batch) 
+            logits = self.engine(batch)
             preds = torch.argmax(logits, dim=1) # 0=Empty, 1=Occupied
-            
-        return [bool(p.item()) for p in preds]
\ No newline at end of file
+
+        # [UPDATE 10] ดึงผลกลับ CPU ครั้งเดียว (แทน .item() ทีละช่อง)
+        return preds.cpu().tolist()
+
+    def _predict_cascade(self, squares: SquareBatch) -> OccupancyGrid:
+        """
+        [NEW] Tier 1: Edge Density ตัดสินช่องที่ชัดเจน, Tier 2: CNN เฉพาะช่องที่ก้ำกึ่ง
+        """
+        density = image_utils.square_edge_density(
+            squares,
+            center_fraction=self.cascade_center_fraction,
+            edge_threshold=self.cascade_edge_threshold
+        )
+        occupied = density >= self.occupied_threshold
+        ambiguous = np.flatnonzero((density > self.empty_threshold) & ~occupied)
+        self.last_cascade_stats = {
+            "empty": int((density <= self.empty_threshold).sum()),
+            "occupied": int(occupied.sum()),
+            "cnn": int(ambiguous.size),
+        }
+
+        if ambiguous.size:
+            occupied[ambiguous] = np.asarray(self.predict_indices(squares[ambiguous]), dtype=bool)
+        return occupied.tolist()
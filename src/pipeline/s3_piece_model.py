@@ -4,58 +4,79 @@ State 3: Piece Classification (Inference Wrapper)
 
 โหลดโมเดล PieceLitModel (.ckpt) เพื่อทำนายชนิดหมาก (13 คลาส)
 """
+import os
 import torch
 import cv2
 import numpy as np
-import torchvision.transforms as T
-from typing import List
-from src.core.typing import SquareImage, OccupancyGrid, ImageRGB, WarpedImage, PieceGrid
+from typing import List, Optional, Sequence, Tuple, Type, Union
+from src.core.typing import SquareImage, OccupancyGrid, ImageRGB, WarpedImage, PieceGrid, SquareBatch
+from src.utils.tensor_utils import BatchPreprocessor
+from src.inference.engines import load_engine
+from src.inference.bucketing import BucketedBatcher
 
 # Import LightningModule ของ State 3
 from src.models.piece.piece_lit_model import PieceLitModel
+from src.models.piece.piece_student_lit_model import PieceStudentLitModel # [NEW] Distilled Student
 from src.utils import image_utils # Import ฟังก์ชัน crop_piece_squares
 
+def _checkpoint_model_class(model_path: str) -> Type[PieceLitModel]:
+    """
+    [NEW] เลือกคลาส LightningModule จาก hparams ใน Checkpoint (Teacher หรือ Student)
+    """
+    if not model_path.endswith(".ckpt") or not os.path.exists(model_path):
+        return PieceLitModel
+    # mmap: อ่านเฉพาะ Metadata ไม่โหลด Weights ทั้งหมดเข้า Memory
+    checkpoint = torch.load(model_path, map_location="cpu", mmap=True, weights_only=False)
+    if "student_arch" in checkpoint.get("hyper_parameters", {}):
+        return PieceStudentLitModel
+    return PieceLitModel
+
 class PieceModel:
     """
     Wrapper สำหรับโมเดล Piece Classification (State 3)
     """
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, pin_memory: bool = False, backend: str = "torch",
+                 bucket_sizes: Optional[Sequence[int]] = None):
+        """
+        :param pin_memory: [NEW] ใช้ Pinned-memory Staging Buffer ตอนส่ง Batch ไป GPU
+        :param backend: [NEW] Inference Backend ("torch", "torch_compile", "torchscript", "onnx", "int8")
+        :param bucket_sizes: [NEW] ปัด Batch ขึ้นเป็นขนาดคงที่ (เช่น (4, 8, 16, 32)) ด้วย BucketedBatcher
+                             None = รันตามจำนวนช่องจริง
+        """
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = None
+        self.backend = backend
 
         try:
-            # โหลด Checkpoint ของ State 3
-            self.model = PieceLitModel.load_from_checkpoint(
-                checkpoint_path=model_path,
-                map_location=self.device
-            )
-            self.model.eval() # ตั้งเป็นโหมดประเมินผล
-            print(f"[PieceModel] Loaded Lightning checkpoint from: {model_path}")
+            # [UPDATE 11] โหลดผ่าน Inference Engine (Lightning checkpoint หรือ Artifact ที่ Export แล้ว)
+            # [UPDATE 14] รองรับ Checkpoint ของ Student (PieceStudentLitModel) โดยอัตโนมัติ
+            model_class = _checkpoint_model_class(model_path)
+            self.engine = load_engine(backend, model_class, model_path, self.device)
+            print(f"[PieceModel] Loaded {backend} model from: {model_path}")
         except FileNotFoundError:
             raise FileNotFoundError(f"!!! Error: Piece model checkpoint not found at {model_path}")
         except Exception as e:
             raise RuntimeError(f"!!! Error loading piece model: {e}")
 
-        # Transform มาตรฐานสำหรับ InceptionV3 (299x299)
-        self.transform = T.Compose([
-            T.ToTensor(),
-            # [IMPORTANT] ใช้ Resize(antialias=True) เพื่อคุณภาพที่ดีขึ้น
-            T.Resize((299, 299), antialias=True),
-            T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
+        # [UPDATE 14] ขนาด Input มาจาก Checkpoint/Artifact (InceptionV3 = 299x299, Student เล็กกว่า)
+        self.input_size = self.engine.input_size or PieceLitModel.INPUT_SIZE
+        # [UPDATE 10] Preprocess ทั้ง Batch ในครั้งเดียว
+        # [IMPORTANT] Resize แบบ antialias เหมือน T.Resize(antialias=True) เดิม
+        self.preprocessor = BatchPreprocessor(self.input_size, self.device, pin_memory=pin_memory)
         
+        # [NEW] Shape-bucketed Batching (สถิติอยู่ที่ self.batcher.stats)
+        self.batcher: Optional[BucketedBatcher] = None
+        if bucket_sizes:
+            self.batcher = BucketedBatcher(self.engine, self.input_size, self.device,
+                                           len(PieceLitModel.CLASSES), bucket_sizes)
+
         # เก็บ List ชื่อคลาสจาก Model (สำคัญมาก)
         self.class_names = PieceLitModel.CLASSES
 
-    def _preprocess(self, squares: List[SquareImage]) -> torch.Tensor:
+    def _preprocess(self, squares: Union[SquareBatch, List[SquareImage]]) -> torch.Tensor:
         """
-        แปลง List ของภาพ (OpenCV BGR) เป็น Batch Tensor (PyTorch RGB)
+        แปลงภาพ (OpenCV BGR) เป็น Batch Tensor (PyTorch RGB) บน device ของโมเดล
         """
-        batch = torch.stack([
-            self.transform(cv2.cvtColor(sq, cv2.COLOR_BGR2RGB))
-            for sq in squares
-        ])
-        return batch.to(self.device)
+        return self.preprocessor(squares)
 
     def predict(self, warped_board: WarpedImage, occupancy_grid: OccupancyGrid) -> PieceGrid:
         """
@@ -70,7 +91,8 @@ class PieceModel:
 
         # 1. ตัดภาพ 64 ช่อง (โดยใช้ฟังก์ชัน crop แบบใหม่สำหรับ State 3)
         # [cite_start]ฟังก์ชันนี้ใช้ Heuristic ขยาย BBox แนวตั้งตาม Paper [cite: 221-223]
-        piece_crops = image_utils.crop_piece_squares(warped_board)
+        # [NEW] ได้ Array (64, S, S, 3) ขนาดเท่ากันทุกช่อง
+        piece_crops = image_utils.crop_square_batch(warped_board, padding_ratio=0.7)
 
         # 2. คัดเลือกเฉพาะช่องที่ "มีหมาก" (Occupied)
         occupied_indices = [i for i, occupied in enumerate(occupancy_grid) if occupied]
@@ -79,22 +101,100 @@ class PieceModel:
         if not occupied_indices:
             return ['empty'] * 64
             
-        occupied_crops = [piece_crops[i] for i in occupied_indices]
+        occupied_crops = piece_crops[occupied_indices]
+
+        # 3-4. ทำนายผลเฉพาะช่องที่มีหมาก แล้วสร้าง PieceGrid
+        return self.predict_crops(occupied_crops, occupied_indices)
+
+    def predict_crops(self, crops: SquareBatch, indices: Sequence[int]) -> PieceGrid:
+        """
+        [NEW] ทำนายจากภาพ Crop ที่ตัดมาแล้ว (เช่น จาก SquareSampler)
+        Input:
+            - crops: (N, H, W, 3) BGR ของช่องที่มีหมาก
+            - indices: ตำแหน่ง (0-63) ของแต่ละ Crop
+        Output:
+            - PieceGrid: List 64 strings (ช่องที่ไม่ได้ส่งมาเป็น 'empty')
+        """
+        if len(indices) == 0:
+            return ['empty'] * 64
 
         # 3. ทำนายผลเฉพาะช่องที่มีหมาก
-        with torch.no_grad():
-            batch = self._preprocess(occupied_crops)
-            logits = self.model(batch) # เรียก .forward()
-            preds_indices = torch.argmax(logits, dim=1)
-            
-            # แปลง index กลับเป็นชื่อคลาส
-            predicted_class_names = [self.class_names[p.item()] for p in preds_indices]
+        predicted_class_names = self._predict_class_names(crops)
 
         # 4. สร้าง PieceGrid สุดท้าย
+        return self._build_grid(indices, predicted_class_names)
+
+    def predict_many(self, requests: Sequence[Tuple[SquareBatch, Sequence[int]]]) -> List[PieceGrid]:
+        """
+        [NEW] รวม Crop จากหลายเฟรมเป็น Batch เดียว (เติม Bucket ให้เต็มขึ้น) แล้วแยกผลกลับตามเฟรม
+        Input: List ของ (crops, indices) ต่อเฟรม (เหมือน predict_crops)
+        Output: List ของ PieceGrid ตามลำดับเฟรม
+        """
+        non_empty = [(crops, indices) for crops, indices in requests if len(indices)]
+        if not non_empty:
+            return [['empty'] * 64 for _ in requests]
+
+        all_crops = np.concatenate([np.asarray(crops) for crops, _ in non_empty])
+        class_names = self._predict_class_names(all_crops)
+
+        grids: List[PieceGrid] = []
+        offset = 0
+        for crops, indices in requests:
+            count = len(indices)
+            grids.append(self._build_grid(indices, class_names[offset:offset + count]))
+            offset += count
+        return grids
+
+    def predict_proba(self, crops: Union[SquareBatch, List[SquareImage]]) -> np.ndarray:
+        """
+        [NEW] ความน่าจะเป็นของทุกคลาส (Softmax) -> (N, 13) ตามลำดับ self.class_names
+        """
+        if len(crops) == 0:
+            return np.empty((0, len(self.class_names)), dtype=np.float32)
+        logits = self._predict_logits(crops)
+        return torch.softmax(logits.float(), dim=1).cpu().numpy()
+
+    def predict_proba_many(self, requests: Sequence[Tuple[SquareBatch, Sequence[int]]]) -> np.ndarray:
+        """
+        [NEW] เหมือน predict_many แต่คืนความน่าจะเป็น -> (F, 64, 13) ตามลำดับ self.class_names
+        (ช่องที่ไม่ได้ส่งมา = 'empty' 1.0) สำหรับ TemporalSmoother
+        """
+        num_classes = len(self.class_names)
+        proba = np.zeros((len(requests), 64, num_classes), dtype=np.float32)
+        proba[:, :, self.class_names.index('empty')] = 1.0
+
+        non_empty = [(crops, indices) for crops, indices in requests if len(indices)]
+        if not non_empty:
+            return proba
+        all_proba = self.predict_proba(np.concatenate([np.asarray(crops) for crops, _ in non_empty]))
+
+        offset = 0
+        for frame, (_, indices) in enumerate(requests):
+            count = len(indices)
+            if count:
+                proba[frame, list(indices)] = all_proba[offset:offset + count]
+            offset += count
+        return proba
+
+    def _predict_logits(self, crops: Union[SquareBatch, List[SquareImage]]) -> torch.Tensor:
+        with torch.no_grad():
+            batch = self._preprocess(crops)
+            if self.batcher is not None:
+                return self.batcher(batch) # ปัดเป็น Bucket ขนาดคงที่
+            return self.engine(batch) # เรียก .forward() ของ Backend ที่เลือก
+
+    def _predict_class_names(self, crops: Union[SquareBatch, List[SquareImage]]) -> List[str]:
+        preds_indices = torch.argmax(self._predict_logits(crops), dim=1)
+
+        # แปลง index กลับเป็นชื่อคลาส (ดึงกลับ CPU ครั้งเดียว)
+        return [self.class_names[p] for p in preds_indices.cpu().tolist()]
+
+    @staticmethod
+    def _build_grid(indices: Sequence[int], class_names: Sequence[str]) -> PieceGrid:
         final_grid: PieceGrid = ['empty'] * 64
-        for idx, class_name in zip(occupied_indices, predicted_class_names):
+        for idx, class_name in zip(indices, class_names):
             # ไม่เอา class 'empty' ที่โมเดลอาจทายผิด
             if class_name != 'empty':
                 final_grid[idx] = class_name
-                
-        return final_grid
\ No newline at end of file
+
+        return final_grid
@@ -0,0 +1,102 @@
+"""
+[NEW FILE]
+สุ่มตัวอย่าง (Sample) ภาพแต่ละช่องจาก "ภาพต้นฉบับ" โดยตรง ที่ขนาด Input ของโมเดลพอดี
+
+Pipeline เดิม Resample แต่ละ pixel 3 ครั้ง:
+    warpPerspective (-> 600x600) -> Crop -> T.Resize (-> 100x100 / 299x299)
+คลาสนี้รวม Homography ของกระดานกับกรอบ Crop ของแต่ละช่อง
+แล้ว Sample ทุกช่องด้วย cv2.remap ครั้งเดียว (ไม่มีภาพ Warp ตรงกลาง)
+"""
+import cv2
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from src.core.typing import ImageBGR, HomographyMatrix, SquareBatch
+from src.utils import image_utils
+
+class SquareSampler:
+    """
+    ตัดภาพ 64 ช่อง (หรือเฉพาะบางช่อง) จากภาพต้นฉบับที่ขนาด out_size x out_size
+    Map ของ remap จะถูก Cache ไว้ต่อ (padding_ratio, out_size) ตราบที่ Homography ไม่ขยับเกิน tolerance
+    """
+    def __init__(self, board_size: int = 600, tolerance: float = 0.5, fixed_point: bool = True):
+        """
+        :param board_size: ขนาดภาพกระดานอ้างอิง (ต้องตรงกับ BoardLocator.warped_size)
+        :param tolerance: ระยะขยับของมุมกระดาน (pixels) ที่ยังใช้ Map เดิมได้
+        :param fixed_point: เก็บ Map เป็น Fixed-point (CV_16SC2) แทน float32
+        """
+        self.board_size = board_size
+        self.tolerance = tolerance
+        self.fixed_point = fixed_point
+        self._cache: Dict[Tuple[float, int], Tuple[HomographyMatrix, np.ndarray, np.ndarray]] = {}
+
+    def _square_coordinates(self, padding_ratio: float, out_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        พิกัด (x, y) ในภาพกระดาน ของทุก pixel ปลายทาง -> (64, out, out) ต่อแกน
+        (ใช้ตำแหน่งกึ่งกลาง pixel แบบเดียวกับ cv2.resize)
+        """
+        _, crop_size, origins = image_utils.square_crop_table(self.board_size, float(padding_ratio))
+        scale = crop_size / out_size
+        steps = (np.arange(out_size, dtype=np.float64) + 0.5) * scale - 0.5
+
+        xs = origins[:, 0, None, None] + steps[None, None, :]      # (64, 1, out)
+        ys = origins[:, 1, None, None] + steps[None, :, None]      # (64, out, 1)
+        shape = (64, out_size, out_size)
+        return np.broadcast_to(xs, shape), np.broadcast_to(ys, shape)
+
+    def _build_maps(self, board_matrix: HomographyMatrix, padding_ratio: float,
+                    out_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        board_x, board_y = self._square_coordinates(padding_ratio, out_size)
+
+        # ภาพกระดาน -> ภาพต้นฉบับ
+        inverse = np.linalg.inv(board_matrix)
+        src_x = inverse[0, 0] * board_x + inverse[0, 1] * board_y + inverse[0, 2]
+        src_y = inverse[1, 0] * board_x + inverse[1, 1] * board_y + inverse[1, 2]
+        src_w = inverse[2, 0] * board_x + inverse[2, 1] * board_y + inverse[2, 2]
+
+        # วางทุกช่องต่อกันในแนวตั้ง: (64 * out, out)
+        map_x = (src_x / src_w).astype(np.float32).reshape(64 * out_size, out_size)
+        map_y = (src_y / src_w).astype(np.float32).reshape(64 * out_size, out_size)
+        if self.fixed_point:
+            return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+        return map_x, map_y
+
+    def _get_maps(self, board_matrix: HomographyMatrix, padding_ratio: float,
+                  out_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        key = (float(padding_ratio), int(out_size))
+        cached = self._cache.get(key)
+        if cached is not None:
+            cached_matrix, map1, map2 = cached
+            if image_utils.homography_drift(cached_matrix, board_matrix, self.board_size) <= self.tolerance:
+                return map1, map2
+
+        map1, map2 = self._build_maps(board_matrix, padding_ratio, out_size)
+        self._cache[key] = (board_matrix, map1, map2)
+        return map1, map2
+
+    def sample(self, image: ImageBGR, board_matrix: HomographyMatrix, padding_ratio: float,
+               out_size: int, indices: Optional[Sequence[int]] = None) -> SquareBatch:
+        """
+        Main method
+
+        :param image: ภาพต้นฉบับ (BGR)
+        :param board_matrix: Homography ภาพต้นฉบับ -> กระดานที่หมุนทิศทางแล้ว
+                             (BoardLocator.locate_board / last_board_matrix)
+        :param padding_ratio: อัตราส่วนขยายขอบ (0.5 สำหรับ S2, 0.7 สำหรับ S3)
+        :param out_size: ขนาดภาพต่อช่อง (ขนาด Input ของโมเดล)
+        :param indices: เลือกเฉพาะบางช่อง (None = ทั้ง 64 ช่อง)
+        :return: (N, out_size, out_size, 3) uint8 BGR
+        """
+        map1, map2 = self._get_maps(board_matrix, padding_ratio, out_size)
+
+        if indices is not None:
+            indices = np.asarray(indices, dtype=np.intp)
+            if indices.size == 0:
+                return np.empty((0, out_size, out_size, image.shape[2]), dtype=image.dtype)
+            # เลือกเฉพาะแถวของ Map ที่เป็นของช่องที่ต้องการ
+            map1 = map1.reshape(64, out_size, *map1.shape[1:])[indices].reshape(-1, *map1.shape[1:])
+            if map2 is not None and map2.size:
+                map2 = map2.reshape(64, out_size, *map2.shape[1:])[indices].reshape(-1, *map2.shape[1:])
+
+        squares = cv2.remap(image, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return squares.reshape(-1, out_size, out_size, image.shape[2])
@@ -3,12 +3,13 @@
 คลาสหลักที่ทำหน้าที่เป็น State Machine (S1 -> S2 -> S3)
 รับ ImageBGR -> คืนค่า BoardState (รวม FEN)
 """
-from typing import Optional
+from typing import Optional, Sequence
 from src.core.typing import ImageBGR, FEN_String, PieceGrid, WarpedImage
 from src.core.exceptions import BoardNotFoundException # Import เพิ่ม
 from src.pipeline.s1_board_locator import BoardLocator
 from src.pipeline.s2_occupancy_model import OccupancyModel
 from src.pipeline.s3_piece_model import PieceModel # [NEW] Import State 3
+from src.pipeline.square_sampler import SquareSampler
 from src.utils import image_utils, fen_utils # [NEW] Import fen_utils
 
 # [NEW] สร้าง Dataclass เก็บผลลัพธ์
@@ -17,30 +18,55 @@ from dataclasses import dataclass
 class BoardState:
     fen: FEN_String
     piece_grid: PieceGrid
-    warped_image: WarpedImage
+    warped_image: Optional[WarpedImage] = None # [NEW] None ในโหมด direct_sampling
 
 class StateRecognizer:
     """
     คลาสหลักที่รัน Pipeline S1->S2->S3
     """
+    OCCUPANCY_CONTEXT_RATIO = 0.5 # Crop แบบ State 2 (มี Context)
+    PIECE_PADDING_RATIO = 0.7     # Crop แบบ State 3
+
     def __init__(self,
                  occupancy_model_path: str,
                  piece_model_path: str,
-                 use_dummy_occupancy: bool = False):
+                 use_dummy_occupancy: bool = False,
+                 locator: Optional[BoardLocator] = None,
+                 direct_sampling: bool = False,
+                 occupancy_backend: str = "torch",
+                 piece_backend: str = "torch",
+                 occupancy_cascade: bool = False,
+                 piece_bucket_sizes: Optional[Sequence[int]] = None):
+        """
+        :param locator: [NEW] BoardLocator ที่ตั้งค่าไว้แล้ว (เช่น tracking/lock_orientation สำหรับวิดีโอ)
+                        ถ้าไม่ระบุจะใช้ BoardLocator() ค่าเริ่มต้น
+        :param direct_sampling: [NEW] ตัดภาพช่องจากภาพต้นฉบับโดยตรงที่ขนาด Input ของโมเดล
+                                (ไม่ Warp เป็น 600x600 ก่อน) เหมาะกับ locator ที่ lock_orientation=True
+        :param occupancy_backend: [NEW] Inference Backend ของ State 2 ("torch", "torch_compile", "torchscript", "onnx", "int8")
+        :param piece_backend: [NEW] Inference Backend ของ State 3 (Export ด้วย scripts/export_models.py)
+        :param occupancy_cascade: [NEW] ให้ State 2 ตัดสินช่องที่ชัดเจนด้วย Edge Density ก่อนส่งเข้า CNN
+        :param piece_bucket_sizes: [NEW] ขนาด Batch คงที่ของ State 3 (เช่น (4, 8, 16, 32)), None = ไม่ใช้ Bucket
+        """
 
         print("Initializing StateRecognizer Pipeline...")
         # 1. โหลด State 1
-        self.locator = BoardLocator()
+        self.locator = locator if locator is not None else BoardLocator()
         
         # 2. โหลด State 2
         self.occupancy_model = OccupancyModel(
             occupancy_model_path,
-            use_dummy=use_dummy_occupancy
+            use_dummy=use_dummy_occupancy,
+            backend=occupancy_backend,
+            cascade=occupancy_cascade
         )
         
         # 3. โหลด State 3
         # (State 3 ไม่ควรใช้ Dummy เพราะสำคัญมาก)
-        self.piece_model = PieceModel(piece_model_path)
+        self.piece_model = PieceModel(piece_model_path, backend=piece_backend, bucket_sizes=piece_bucket_sizes)
+
+        # [NEW] Direct Sampling
+        self.direct_sampling = direct_sampling
+        self.sampler = SquareSampler(board_size=self.locator.warped_size)
         print("StateRecognizer Pipeline Initialized.")
 
 
@@ -51,34 +77,14 @@ class StateRecognizer:
         Output: BoardState (เก็บ FEN, Grid, Warped Image) หรือ None ถ้าล้มเหลว
         """
         try:
+            if self.direct_sampling:
+                return self._recognize_direct(image)
+
             # === STATE 1: BOARD LOCALISATION ===
             warped_board, matrix = self.locator.find_and_warp(image)
             print("S1: Board located and warped.")
-            
-            # === STATE 2: OCCUPANCY CLASSIFICATION ===
-            # ใช้ Crop แบบ State 2 (มี Context)
-            occupancy_squares = image_utils.crop_squares_from_warped(
-                warped_board,
-                context_ratio=0.5
-            )
-            occupancy_grid = self.occupancy_model.predict(occupancy_squares)
-            num_occupied = sum(1 for occupied in occupancy_grid if occupied)
-            print(f"S2: Occupancy predicted ({num_occupied}/64 occupied).")
-
-            # === STATE 3: PIECE CLASSIFICATION ===
-            # ใช้ Crop แบบ State 3 (taller boxes) และ Occupancy Grid
-            piece_grid = self.piece_model.predict(
-                warped_board,
-                occupancy_grid
-            )
-            num_pieces = sum(1 for p in piece_grid if p != 'empty')
-            print(f"S3: Piece classification complete ({num_pieces} pieces found).")
-
-            # === FINAL STEP: FEN GENERATION ===
-            fen = fen_utils.convert_grid_to_fen(piece_grid)
-            print(f"FEN Generated: {fen}")
-
-            return BoardState(fen=fen, piece_grid=piece_grid, warped_image=warped_board)
+
+            return self.recognize_warped(warped_board)
 
         except BoardNotFoundException as e:
             print(f"!!! Pipeline Error (S1): {e}")
@@ -86,4 +92,92 @@ class StateRecognizer:
         except Exception as e:
             print(f"!!! Pipeline Error (S2/S3/FEN): {e}")
             # อาจจะคืนค่าบางส่วน หรือ None ก็ได้
-            return None
\ No newline at end of file
+            return None
+
+    def recognize_warped(self, warped_board: WarpedImage) -> BoardState:
+        """
+        [NEW] รัน S2 -> S3 -> FEN บนภาพกระดานที่ Warp แล้ว (แยกออกจาก recognize
+        เพื่อให้ตัวเรียกที่รัน S1 เอง เช่น IncrementalRecognizer ใช้ร่วมได้)
+        """
+        # === STATE 2: OCCUPANCY CLASSIFICATION ===
+        # ใช้ Crop แบบ State 2 (มี Context)
+        # [NEW] ได้ Array (64, S, S, 3) ขนาดเท่ากันทุกช่อง
+        occupancy_squares = image_utils.crop_square_batch(
+            warped_board,
+            padding_ratio=self.OCCUPANCY_CONTEXT_RATIO
+        )
+        occupancy_grid = self.occupancy_model.predict(occupancy_squares)
+        num_occupied = sum(1 for occupied in occupancy_grid if occupied)
+        print(f"S2: Occupancy predicted ({num_occupied}/64 occupied, tiers: {self.occupancy_model.last_cascade_stats}).")
+
+        # [NEW] อนุมานทิศทางจาก Occupancy Grid (orientation_source='occupancy')
+        if self.locator.orientation_needs_check:
+            turns = self.locator.update_orientation_from_occupancy(occupancy_grid, warped_board)
+            if turns:
+                warped_board = self.locator.rotate_board(warped_board, turns)
+                occupancy_grid = fen_utils.rotate_grid(occupancy_grid, turns)
+
+        # === STATE 3: PIECE CLASSIFICATION ===
+        # ใช้ Crop แบบ State 3 (taller boxes) และ Occupancy Grid
+        piece_grid = self.piece_model.predict(
+            warped_board,
+            occupancy_grid
+        )
+        num_pieces = sum(1 for p in piece_grid if p != 'empty')
+        print(f"S3: Piece classification complete ({num_pieces} pieces found).")
+
+        # === FINAL STEP: FEN GENERATION ===
+        fen = fen_utils.convert_grid_to_fen(piece_grid)
+        print(f"FEN Generated: {fen}")
+
+        return BoardState(fen=fen, piece_grid=piece_grid, warped_image=warped_board)
+
+    def _recognize_direct(self, image: ImageBGR) -> BoardState:
+        """
+        [NEW] Pipeline แบบ Direct Sampling:
+        ใช้ Homography ของกระดาน Sample ภาพช่องจากภาพต้นฉบับที่ขนาด Input ของโมเดลโดยตรง
+        (S2: 64 ช่อง, S3: เฉพาะช่องที่มีหมาก)
+        """
+        # === STATE 1: BOARD LOCALISATION (ไม่ Warp) ===
+        board_matrix = self.locator.locate_board(image)
+        print("S1: Board located (direct sampling).")
+
+        # ต้องใช้ภาพ Warp เฉพาะตอนตรวจทิศทางจาก Occupancy
+        warped_board = None
+        if self.locator.orientation_needs_check:
+            warped_board = image_utils.warp_image(image, board_matrix, self.locator.warped_size)
+
+        # === STATE 2: OCCUPANCY CLASSIFICATION ===
+        occupancy_squares = self.sampler.sample(
+            image, board_matrix,
+            padding_ratio=self.OCCUPANCY_CONTEXT_RATIO,
+            out_size=self.occupancy_model.input_size
+        )
+        occupancy_grid = self.occupancy_model.predict(occupancy_squares)
+        num_occupied = sum(1 for occupied in occupancy_grid if occupied)
+        print(f"S2: Occupancy predicted ({num_occupied}/64 occupied, tiers: {self.occupancy_model.last_cascade_stats}).")
+
+        if self.locator.orientation_needs_check:
+            turns = self.locator.update_orientation_from_occupancy(occupancy_grid, warped_board)
+            if turns:
+                occupancy_grid = fen_utils.rotate_grid(occupancy_grid, turns)
+                warped_board = self.locator.rotate_board(warped_board, turns)
+                board_matrix = self.locator.last_board_matrix
+
+        # === STATE 3: PIECE CLASSIFICATION ===
+        occupied_indices = [i for i, occupied in enumerate(occupancy_grid) if occupied]
+        piece_crops = self.sampler.sample(
+            image, board_matrix,
+            padding_ratio=self.PIECE_PADDING_RATIO,
+            out_size=self.piece_model.input_size,
+            indices=occupied_indices
+        )
+        piece_grid = self.piece_model.predict_crops(piece_crops, occupied_indices)
+        num_pieces = sum(1 for p in piece_grid if p != 'empty')
+        print(f"S3: Piece classification complete ({num_pieces} pieces found).")
+
+        # === FINAL STEP: FEN GENERATION ===
+        fen = fen_utils.convert_grid_to_fen(piece_grid)
+        print(f"FEN Generated: {fen}")
+
+        return BoardState(fen=fen, piece_grid=piece_grid, warped_image=warped_board)
@@ -0,0 +1,154 @@
+"""
+[NEW FILE]
+Temporal Smoothing ของผลทำนายรายช่อง (S2 + S3) สำหรับวิดีโอ
+
+ผลผิดของ S2/S3 ในเฟรมเดียวกลายเป็นตาเดินปลอมทันที (เช่น "5. 7" ใน Sample Submission)
+TemporalSmoother เก็บความน่าจะเป็นของ 13 คลาสของทุกช่องใน N เฟรมล่าสุด (Ring Buffer (N, 64, 13)
+ที่จองไว้ครั้งเดียว) แล้วปล่อยตำแหน่งเฉพาะเมื่อผลรวมตามเวลานิ่ง:
+- 'vote': Soft Vote = ค่าเฉลี่ยของ N เฟรมล่าสุด (ผลรวมแบบ Running: บวกเฟรมใหม่ ลบเฟรมที่หลุด Window)
+- 'ema':  Exponential Moving Average (alpha = 2 / (window + 1) ถ้าไม่ระบุ)
+ทุกช่องต้องมีคลาสที่ชนะด้วยคะแนน >= min_confidence และคำตอบต้องเหมือนเดิม stable_frames เฟรมติดกัน
+ทุกการคำนวณเป็น Vectorized NumPy ลง Array ที่จองไว้ (out=) -> ไม่มีการจอง Array ใหม่ต่อเฟรม
+[NEW] get_state() / set_state(): State ทั้งหมด (Ring Buffer, คำตอบล่าสุด) สำหรับ Checkpoint
+"""
+import numpy as np
+from typing import List, Optional, Sequence
+
+from src.core.typing import PieceGrid
+
+class TemporalSmoother:
+    """
+    รับความน่าจะเป็นรายช่อง (64, 13) ทีละเฟรม -> ปล่อย PieceGrid เมื่อตำแหน่งนิ่งและเปลี่ยนจากที่ปล่อยล่าสุด
+    """
+    MODES = ("vote", "ema")
+
+    def __init__(self, class_names: Sequence[str], window: int = 5, mode: str = "vote",
+                 min_confidence: float = 0.6, stable_frames: int = 2, ema_alpha: Optional[float] = None):
+        """
+        :param class_names: ชื่อคลาสตามลำดับคอลัมน์ของความน่าจะเป็น (เช่น PieceModel.class_names)
+        :param window: จำนวนเฟรมใน Ring Buffer (และจำนวนเฟรมขั้นต่ำก่อนปล่อยตำแหน่งแรก)
+        :param mode: 'vote' (ค่าเฉลี่ยใน Window) หรือ 'ema'
+        :param min_confidence: คะแนนขั้นต่ำของคลาสที่ชนะ ในทุกช่อง
+        :param stable_frames: จำนวนเฟรมติดกันที่คำตอบ (ทั้ง 64 ช่อง) ต้องเหมือนเดิม
+        :param ema_alpha: น้ำหนักของเฟรมใหม่ (mode='ema', None = 2 / (window + 1))
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}, got {mode!r}")
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.class_names: List[str] = list(class_names)
+        self.window = window
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self.stable_frames = stable_frames
+        self.ema_alpha = ema_alpha if ema_alpha is not None else 2.0 / (window + 1)
+
+        num_classes = len(self.class_names)
+        # --- Buffer ที่จองครั้งเดียว ---
+        self._buffer = np.zeros((window, 64, num_classes), dtype=np.float32) # Ring Buffer
+        self._sum = np.zeros((64, num_classes), dtype=np.float64)          # ผลรวมของ Window ('vote')
+        self._ema = np.zeros((64, num_classes), dtype=np.float64)          # ('ema')
+        self._score = np.zeros((64, num_classes), dtype=np.float64)
+        self._confidence = np.zeros(64, dtype=np.float64)
+        self._labels = np.zeros(64, dtype=np.intp)
+        self._previous_labels = np.zeros(64, dtype=np.intp)
+        self._emitted_labels = np.zeros(64, dtype=np.intp)
+        self.reset()
+
+    def reset(self) -> None:
+        """ล้าง State (เช่น เมื่อเริ่มวิดีโอใหม่)"""
+        self._buffer.fill(0.0)
+        self._sum.fill(0.0)
+        self._ema.fill(0.0)
+        self._head = 0      # ช่องของ Ring Buffer ที่จะเขียนต่อ
+        self._count = 0     # จำนวนเฟรมที่รับมาแล้ว
+        self._stable_count = 0
+        self._has_emitted = False
+        self.frames = 0
+        self.emitted = 0
+
+    def get_state(self) -> dict:
+        """
+        [NEW] State ทั้งหมดหลังเฟรมล่าสุด (แปลงเป็น JSON ได้)
+        """
+        return {
+            "buffer": self._buffer.tolist(),
+            "ema": self._ema.tolist(),
+            "previous_labels": self._previous_labels.tolist(),
+            "emitted_labels": self._emitted_labels.tolist(),
+            "head": self._head,
+            "count": self._count,
+            "stable_count": self._stable_count,
+            "has_emitted": self._has_emitted,
+            "frames": self.frames,
+            "emitted": self.emitted,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        [NEW] คืน State จาก get_state() (window และจำนวนคลาสต้องเท่าเดิม)
+        """
+        buffer = np.asarray(state["buffer"], dtype=np.float32)
+        if buffer.shape != self._buffer.shape:
+            raise ValueError(f"Smoother state has shape {buffer.shape}, expected {self._buffer.shape}")
+        np.copyto(self._buffer, buffer)
+        np.sum(self._buffer, axis=0, out=self._sum)
+        np.copyto(self._ema, np.asarray(state["ema"], dtype=np.float64))
+        np.copyto(self._previous_labels, np.asarray(state["previous_labels"], dtype=np.intp))
+        np.copyto(self._emitted_labels, np.asarray(state["emitted_labels"], dtype=np.intp))
+        self._head = int(state["head"])
+        self._count = int(state["count"])
+        self._stable_count = int(state["stable_count"])
+        self._has_emitted = bool(state["has_emitted"])
+        self.frames = int(state["frames"])
+        self.emitted = int(state["emitted"])
+
+    def update(self, proba: np.ndarray) -> Optional[PieceGrid]:
+        """
+        ส่งความน่าจะเป็นของเฟรมล่าสุด (64, 13) -> PieceGrid ถ้าตำแหน่งนิ่งและต่างจากที่ปล่อยล่าสุด, ไม่เช่นนั้น None
+        """
+        slot = self._buffer[self._head]
+        if self.mode == "vote":
+            # Running Sum: ลบเฟรมที่กำลังถูกเขียนทับ (เป็น 0 ถ้ายังไม่ครบ Window) แล้วบวกเฟรมใหม่
+            np.subtract(self._sum, slot, out=self._sum)
+            np.copyto(slot, proba)
+            np.add(self._sum, slot, out=self._sum)
+        else:
+            np.copyto(slot, proba)
+            if self._count == 0:
+                np.copyto(self._ema, slot)
+            else:
+                np.multiply(self._ema, 1.0 - self.ema_alpha, out=self._ema)
+                np.multiply(slot, self.ema_alpha, out=self._score)
+                np.add(self._ema, self._score, out=self._ema)
+
+        self._head = (self._head + 1) % self.window
+        self._count += 1
+        self.frames += 1
+        if self.mode == "vote" and self._head == 0:
+            # คำนวณผลรวมใหม่ทั้ง Window เป็นระยะ กัน Error สะสมของ Floating point
+            np.sum(self._buffer, axis=0, out=self._sum)
+
+        if self.mode == "vote":
+            np.divide(self._sum, min(self._count, self.window), out=self._score)
+        else:
+            np.copyto(self._score, self._ema)
+        np.argmax(self._score, axis=1, out=self._labels)
+        np.max(self._score, axis=1, out=self._confidence)
+
+        if np.array_equal(self._labels, self._previous_labels):
+            self._stable_count += 1
+        else:
+            self._stable_count = 1
+            np.copyto(self._previous_labels, self._labels)
+
+        if (self._count < self.window or self._stable_count < self.stable_frames
+                or self._confidence.min() < self.min_confidence):
+            return None
+        if self._has_emitted and np.array_equal(self._labels, self._emitted_labels):
+            return None
+
+        np.copyto(self._emitted_labels, self._labels)
+        self._has_emitted = True
+        self.emitted += 1
+        return [self.class_names[i] for i in self._labels.tolist()]
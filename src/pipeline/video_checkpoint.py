@@ -0,0 +1,72 @@
+"""
+[NEW FILE]
+Checkpoint / Resume สำหรับงานวิดีโอยาว
+
+StreamingVideoPipeline บันทึก VideoCheckpoint (JSON ขนาดเล็ก) เป็นระยะ:
+- เฟรมล่าสุดที่ประมวลผลเสร็จ และเฟรมที่ต้องอ่านต่อ (รักษาจังหวะ Sampling เดิม)
+- State ของ PositionTracker (ตำแหน่งเริ่ม, ตาเดินทั้งหมด, chess.Board ปัจจุบัน)
+- มุมกระดาน / Homography / ทิศทางที่ล็อกไว้ของ BoardLocator และ ROI ของ FrameReader / MotionGate
+- [NEW] State ของ MotionGate, Stride ของ FrameReader ('adaptive') และ TemporalSmoother ณ เฟรมนั้น
+  (ภาพอ้างอิงของ Optical Flow ใน BoardLocator ไม่ถูกเก็บ: เฟรมแรกหลัง Resume Detect กระดานใหม่)
+เมื่อ Process ตาย (เช่น Node ถูก Preempt) การรันครั้งถัดไปจะ Seek ไปที่เฟรมนั้นแล้วทำต่อ
+ไฟล์ถูกเขียนแบบ Atomic (ไฟล์ชั่วคราว + os.replace): ไม่มีทางได้ Checkpoint ที่เขียนไม่ครบ
+"""
+import json
+import os
+from dataclasses import dataclass, asdict, field
+from typing import Optional, Tuple
+
+CHECKPOINT_VERSION = 3 # 2: gate_roi อยู่ในพิกัดภาพเต็ม, 3: State ของ Gate / Reader / Smoother
+
+@dataclass
+class VideoCheckpoint:
+    """
+    State ของการประมวลผลวิดีโอ 1 ไฟล์ ณ เฟรม frame_index
+    """
+    video: str                      # ชื่อไฟล์วิดีโอ (ใช้ตรวจว่า Checkpoint เป็นของวิดีโอนี้)
+    frame_index: int                # เฟรมล่าสุดที่ผ่าน Sink แล้ว
+    next_frame: int                 # เฟรมแรกที่ต้องอ่านเมื่อ Resume
+    end_frame: Optional[int]
+    tracker: dict                   # PositionTracker.to_dict()
+    locator: dict                   # BoardLocator.get_session_state()
+    s1_offset: Tuple[int, int] = (0, 0) # Offset ของภาพที่ S1 ใช้ (มุมกระดานอยู่ในพิกัดนี้)
+    reader_roi: Optional[Tuple[int, int, int, int]] = None # ROI ของ FrameReader (ภาพเต็ม)
+    gate_roi: Optional[Tuple[int, int, int, int]] = None   # ROI ของ MotionGate (ภาพเต็ม)
+    gate_state: Optional[dict] = None     # [NEW] MotionGate.get_state() หลังเฟรม frame_index
+    reader_state: Optional[dict] = None   # [NEW] FrameReader.get_state() หลังอ่านเฟรม frame_index
+    smoother_state: Optional[dict] = None # [NEW] TemporalSmoother.get_state() หลังเฟรม frame_index
+    version: int = field(default=CHECKPOINT_VERSION)
+
+    def save(self, path: str) -> None:
+        """
+        เขียน JSON แบบ Atomic
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, video_path: Optional[str] = None) -> Optional["VideoCheckpoint"]:
+        """
+        โหลด Checkpoint -> None ถ้าไม่มีไฟล์ หรือเป็นของวิดีโออื่น / Version อื่น
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            print(f"!!! Checkpoint {path}: unsupported version {data.get('version')} -> ignored")
+            return None
+        if video_path is not None and data["video"] != os.path.basename(video_path):
+            print(f"!!! Checkpoint {path} belongs to {data['video']} -> ignored")
+            return None
+        for key in ("s1_offset", "reader_roi", "gate_roi"):
+            if data.get(key) is not None:
+                data[key] = tuple(data[key])
+        return cls(**data)
@@ -0,0 +1,487 @@
+"""
+[NEW FILE]
+Streaming Pipeline สำหรับวิดีโอ (Decode -> S1 -> S2 -> S3 -> PGN)
+
+แต่ละ Stage รันใน Thread ของตัวเอง เชื่อมกันด้วย Queue ที่จำกัดขนาด (Back-pressure):
+ถ้า Stage ปลายทางช้า Queue จะเต็มและ Stage ต้นทางจะรอ -> หน่วยความจำคงที่แม้วิดีโอยาวเป็นชั่วโมง
+- Decode / S1 เป็นงาน OpenCV (ปล่อย GIL ระหว่างคำนวณ)
+- [NEW] Decode ใช้ FrameReader: grab() ข้ามเฟรมที่ไม่ใช้ และ retrieve() เฉพาะเฟรมที่วิเคราะห์
+  (stride / fps / adaptive) และตัดภาพเหลือ ROI รอบกระดานได้ (crop_to_board)
+- [NEW] Gate (MotionGate, ถ้าระบุ) ทิ้งเฟรมที่มีการเคลื่อนไหว/มือบัง หรือตำแหน่งไม่เปลี่ยน ก่อนถึง S1
+- S2 / S3 รวมหลายเฟรมที่รออยู่ใน Queue เป็น Batch เดียว (OccupancyModel / PieceModel.predict_many)
+- [NEW] ระบุ checkpoint_path ให้ run(): บันทึก VideoCheckpoint ทุก checkpoint_interval_s วินาที
+  และถ้ามี Checkpoint ของวิดีโอนี้อยู่แล้ว จะ Seek ไปทำต่อจากเฟรมนั้น (src/pipeline/video_checkpoint.py)
+- [NEW] Smoother (TemporalSmoother, ถ้าระบุ): S3 ส่งความน่าจะเป็นรายช่องแทนคำตอบ
+  และ Sink ส่งตำแหน่งเข้า PositionTracker เฉพาะเมื่อผลรวมตามเวลานิ่ง
+สถิติของแต่ละ Stage (Throughput, % เวลาที่ทำงาน, ความลึกของ Queue) ใช้หาว่า Stage ไหนเป็นคอขวด
+"""
+import os
+import queue
+import chess
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.typing import ImageBGR, WarpedImage, HomographyMatrix, OccupancyGrid, PieceGrid
+from src.core.exceptions import BoardNotFoundException
+from src.pipeline.s1_board_locator import BoardLocator
+from src.pipeline.motion_gate import MotionGate
+from src.pipeline.state_recognizer import StateRecognizer
+from src.pipeline.temporal_smoother import TemporalSmoother
+from src.pipeline.video_checkpoint import VideoCheckpoint
+from src.utils import image_utils, fen_utils
+from src.utils.pgn_utils import PositionTracker
+from src.utils.video_utils import FrameReader
+
+@dataclass
+class FramePacket:
+    """
+    ข้อมูลของ 1 เฟรมที่ไหลผ่านแต่ละ Stage (ข้อมูลที่ไม่ใช้แล้วจะถูกปล่อยทิ้งระหว่างทาง)
+    """
+    index: int
+    timestamp_ms: float
+    image: Optional[ImageBGR] = None
+    offset: Tuple[int, int] = (0, 0)        # มุมซ้ายบนของ ROI ในภาพเต็ม (ภาพถูกตัดโดย FrameReader)
+    warped: Optional[WarpedImage] = None
+    matrix: Optional[HomographyMatrix] = None # [NEW] Homography ที่ใช้ Warp เฟรมนี้ (ก่อนหมุนทิศทาง)
+    orientation: Optional[str] = None       # ทิศทางของ Locator ตอน Warp เฟรมนี้
+    orientation_pending: bool = False       # Locator รอ Occupancy Grid เพื่อตรวจทิศทาง
+    locator_state: Optional[dict] = None    # [NEW] BoardLocator.get_session_state() หลัง Warp เฟรมนี้ (Checkpoint)
+    reader_state: Optional[dict] = None     # [NEW] FrameReader.get_state() หลังอ่านเฟรมนี้ (Checkpoint)
+    gate_state: Optional[dict] = None       # [NEW] MotionGate.get_state() หลังตัดสินเฟรมนี้ (Checkpoint)
+    occupancy_grid: Optional[OccupancyGrid] = None
+    piece_grid: Optional[PieceGrid] = None
+    piece_proba: Optional[np.ndarray] = None # [NEW] (64, 13) เมื่อใช้ TemporalSmoother
+
+@dataclass
+class StageStats:
+    """
+    สถิติของ 1 Stage
+    """
+    name: str
+    items: int = 0          # จำนวนเฟรมที่ประมวลผล
+    batches: int = 0
+    dropped: int = 0        # เฟรมที่ถูกทิ้ง (เช่น หากระดานไม่พบ)
+    busy_s: float = 0.0     # เวลาที่ใช้ประมวลผลจริง (ไม่รวมเวลารอ Queue)
+    depth_sum: int = 0      # ผลรวมความลึกของ Queue ขาเข้า (สุ่มวัดทุก Batch)
+    max_depth: int = 0
+    last_index: int = -1    # [NEW] index ของเฟรมล่าสุดที่ผ่าน Stage (-1 = ยังไม่มี)
+
+    def record_depth(self, depth: int) -> None:
+        self.depth_sum += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    @property
+    def fps(self) -> float:
+        """Throughput ของ Stage นี้ถ้าไม่ต้องรอ Stage อื่น (เฟรม/วินาที)"""
+        return self.items / self.busy_s if self.busy_s > 0 else 0.0
+
+    @property
+    def mean_depth(self) -> float:
+        return self.depth_sum / self.batches if self.batches else 0.0
+
+    @property
+    def mean_batch(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+@dataclass
+class VideoResult:
+    """
+    ผลลัพธ์ของการประมวลผลวิดีโอ 1 ไฟล์
+    """
+    pgn: str
+    moves: List[str] = field(default_factory=list) # SAN
+    positions: List[Tuple[int, str]] = field(default_factory=list) # [NEW] (frame_index, placement) ที่ยืนยันแล้ว
+    frames_decoded: int = 0
+    frames_recognized: int = 0
+    last_frame: int = -1 # [NEW] index ของเฟรมสุดท้ายที่อ่านได้จริง (-1 = ไม่ได้อ่านเลย)
+    wall_s: float = 0.0
+    stats: Dict[str, StageStats] = field(default_factory=dict)
+
+# ส่งต่อท้าย Queue เพื่อบอกว่าไม่มีเฟรมแล้ว
+_END = object()
+
+class _Stage(threading.Thread):
+    """
+    Worker ของ 1 Stage: ดึงเฟรมจาก Queue ขาเข้า (รวมเป็น Batch ได้สูงสุด batch_size เฟรมที่รออยู่)
+    ประมวลผล แล้วส่งต่อ Queue ขาออก (Block เมื่อ Queue เต็ม)
+    """
+    def __init__(self, name: str, fn: Callable[[List[FramePacket]], List[FramePacket]],
+                 in_queue: queue.Queue, out_queue: queue.Queue, batch_size: int = 1):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.batch_size = batch_size
+        self.stats = StageStats(name)
+
+    def _next_batch(self) -> List[object]:
+        batch = [self.in_queue.get()] # รอเฟรมแรก
+        while len(batch) < self.batch_size and batch[-1] is not _END:
+            try:
+                batch.append(self.in_queue.get_nowait()) # เติมด้วยเฟรมที่รออยู่แล้วเท่านั้น
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self) -> None:
+        finished = False
+        while not finished:
+            batch = self._next_batch()
+            if batch[-1] is _END:
+                batch.pop()
+                finished = True
+            if batch:
+                self.stats.record_depth(self.in_queue.qsize())
+                start = time.perf_counter()
+                try:
+                    outputs = self.fn(batch)
+                except Exception as e:
+                    print(f"!!! Stage {self.name} error: {e}")
+                    outputs = []
+                self.stats.busy_s += time.perf_counter() - start
+                self.stats.items += len(batch)
+                self.stats.batches += 1
+                self.stats.dropped += len(batch) - len(outputs)
+                for packet in outputs:
+                    self.out_queue.put(packet)
+        self.out_queue.put(_END)
+
+class StreamingVideoPipeline:
+    """
+    รัน StateRecognizer (S1 -> S2 -> S3) กับวิดีโอแบบ Streaming แล้วแปลงเป็น PGN
+    """
+    STAGES = ("decode", "gate", "s1", "s2", "s3")
+
+    def __init__(self, recognizer: StateRecognizer, queue_size: int = 8, batch_frames: int = 4,
+                 frame_stride: int = 1, confirm_frames: int = 3, report_interval: int = 0,
+                 gate: Optional[MotionGate] = None, sampling: str = "stride", target_fps: float = 2.0,
+                 crop_to_board: bool = False, roi_margin: float = 0.15, roi_reset_failures: int = 10,
+                 checkpoint_interval_s: float = 30.0, smoother: Optional[TemporalSmoother] = None):
+        """
+        :param recognizer: StateRecognizer ที่โหลดโมเดลแล้ว (ต้องไม่ใช้ direct_sampling)
+                           (แนะนำ BoardLocator(tracking=True, lock_orientation=True) สำหรับวิดีโอ)
+        :param queue_size: ขนาดสูงสุดของ Queue ระหว่าง Stage (จำนวนเฟรม)
+        :param batch_frames: จำนวนเฟรมสูงสุดที่ S2/S3 รวมเป็น Batch เดียว
+        :param frame_stride: ประมวลผลทุกๆ N เฟรม (1 = ทุกเฟรม, ใช้กับ sampling='stride')
+        :param confirm_frames: จำนวนเฟรมติดกันที่ต้องเห็นตำแหน่งเดียวกันก่อนยอมรับการเดิน
+        :param report_interval: พิมพ์สถิติทุกๆ N เฟรมที่ประมวลผลเสร็จ (0 = พิมพ์ตอนจบอย่างเดียว)
+        :param gate: [NEW] MotionGate ที่กรองเฟรมก่อน S1 (None = ส่งทุกเฟรม)
+                     เฟรมที่ผ่าน Gate นิ่งแล้ว -> ยอมรับตำแหน่งได้ทันที (ไม่ใช้ confirm_frames)
+        :param sampling: [NEW] Policy ของ FrameReader ('stride', 'fps', 'adaptive')
+        :param target_fps: [NEW] จำนวนเฟรมที่วิเคราะห์ต่อวินาที (sampling='fps' / 'adaptive')
+        :param crop_to_board: [NEW] หลังหากระดานพบครั้งแรก ให้ FrameReader ตัดภาพเหลือ ROI รอบกระดาน
+        :param roi_margin: [NEW] ขยาย ROI (สัดส่วนของขนาดกระดาน) เผื่อกล้อง/กระดานขยับเล็กน้อย
+        :param roi_reset_failures: [NEW] กลับไปอ่านภาพเต็มเมื่อหากระดานใน ROI ไม่พบติดกัน N เฟรม
+        :param checkpoint_interval_s: [NEW] บันทึก Checkpoint ทุกๆ N วินาที (เมื่อ run() ได้รับ checkpoint_path)
+        :param smoother: [NEW] TemporalSmoother ของความน่าจะเป็นรายช่อง (None = ใช้คำตอบของแต่ละเฟรมตรงๆ)
+                         ตำแหน่งที่ Smoother ปล่อยออกมานิ่งแล้ว -> ยอมรับได้ทันที (ไม่ใช้ confirm_frames)
+                         ใช้คู่กับ gate ไม่ได้ (Gate ปล่อยเฟรมเดียวต่อตำแหน่ง แต่ Smoother ต้องการเฟรมต่อเนื่อง)
+        """
+        if recognizer.direct_sampling:
+            raise ValueError("StreamingVideoPipeline requires a StateRecognizer without direct_sampling")
+        if frame_stride < 1:
+            raise ValueError("frame_stride must be >= 1")
+        if sampling not in FrameReader.POLICIES:
+            raise ValueError(f"sampling must be one of {FrameReader.POLICIES}, got {sampling!r}")
+        if gate is not None and smoother is not None:
+            raise ValueError("StreamingVideoPipeline cannot combine a MotionGate with a TemporalSmoother")
+        self.recognizer = recognizer
+        self.queue_size = queue_size
+        self.batch_frames = batch_frames
+        self.frame_stride = frame_stride
+        self.confirm_frames = confirm_frames
+        self.report_interval = report_interval
+        self.gate = gate
+        self.sampling = sampling
+        self.target_fps = target_fps
+        self.crop_to_board = crop_to_board
+        self.roi_margin = roi_margin
+        self.roi_reset_failures = roi_reset_failures
+        self.checkpoint_interval_s = checkpoint_interval_s
+        self.smoother = smoother
+
+        self._reader: Optional[FrameReader] = None
+        self._s1_offset: Tuple[int, int] = (0, 0)
+        self._s1_failures = 0
+        self._queues: Dict[str, queue.Queue] = {}
+        self._stages: List[_Stage] = []
+
+    # --- Stage Functions ---
+    def _filter(self, packets: List[FramePacket]) -> List[FramePacket]:
+        """Gate: ปล่อยเฉพาะเฟรมที่กระดานนิ่งหลังมีการเปลี่ยนแปลง"""
+        outputs = []
+        for packet in packets:
+            if self.gate.update(packet.image, packet.index, packet.offset):
+                # State ณ เฟรมนี้ (Gate ตัดสินเฟรมถัดไปแล้วตอนที่ Sink บันทึก Checkpoint)
+                packet.gate_state = self.gate.get_state()
+                outputs.append(packet)
+        return outputs
+
+    def _locate(self, packets: List[FramePacket]) -> List[FramePacket]:
+        """S1: หากระดานและ Warp (ทีละเฟรม เพราะ Locator มี State ของ Tracking)"""
+        locator = self.recognizer.locator
+        outputs = []
+        for packet in packets:
+            if packet.offset != self._s1_offset:
+                # ภาพถูกตัดเป็น ROI ใหม่ -> พิกัดของ Tracking เดิมใช้ไม่ได้ (ROI ของ Gate อยู่ในพิกัดภาพเต็ม)
+                locator.reset_tracking()
+                self._s1_offset = packet.offset
+            image_shape = packet.image.shape
+            try:
+                # S2 อาจล็อกทิศทางพร้อมกัน -> Warp และอ่านทิศทางของเฟรมนี้ภายใต้ Lock เดียวกัน
+                with locator.orientation_lock:
+                    packet.warped, packet.matrix = locator.find_and_warp(packet.image)
+                    packet.orientation = locator.orientation
+                    packet.orientation_pending = locator.orientation_needs_check
+                    packet.locator_state = locator.get_session_state()
+            except BoardNotFoundException:
+                self._on_board_not_found()
+                continue
+            finally:
+                packet.image = None # ไม่ใช้ภาพเต็มแล้ว
+            self._s1_failures = 0
+            if self.gate is not None and self.gate.roi is None:
+                self.gate.set_board_matrix(packet.matrix, locator.warped_size, image_shape, packet.offset)
+            if self.crop_to_board and self._reader is not None and self._reader.roi is None:
+                self._set_reader_roi(packet.offset, image_shape)
+            outputs.append(packet)
+        return outputs
+
+    def _set_reader_roi(self, offset: Tuple[int, int], image_shape: Tuple[int, ...]) -> None:
+        locator = self.recognizer.locator
+        roi = image_utils.board_bounding_rect(locator.last_matrix, locator.warped_size, image_shape,
+                                              margin=self.roi_margin)
+        if roi is not None:
+            x, y, w, h = roi
+            self._reader.set_roi((x + offset[0], y + offset[1], w, h))
+            print(f"FrameReader: cropping frames to board ROI {self._reader.roi}")
+
+    def _on_board_not_found(self) -> None:
+        self._s1_failures += 1
+        if self._reader is not None and self._reader.roi is not None \
+                and self._s1_failures >= self.roi_reset_failures:
+            print("FrameReader: board lost inside ROI -> reading full frames")
+            self._reader.set_roi(None)
+
+    def _orientation_correction(self, packet: FramePacket) -> int:
+        """
+        จำนวนครั้งที่ต้องหมุนเฟรมนี้ ตามทิศทางที่อนุมานจาก Occupancy (เหมือน StateRecognizer.recognize_warped)
+        (รันบน Thread ของ S2 ขณะที่ S1 Warp เฟรมถัดไป -> ถือ orientation_lock และใช้ Matrix ของเฟรมนี้เอง)
+        """
+        locator = self.recognizer.locator
+        with locator.orientation_lock:
+            if locator.orientation_needs_check:
+                return locator.update_orientation_from_occupancy(packet.occupancy_grid, packet.warped,
+                                                                 matrix=packet.matrix)
+            # เฟรมที่ Warp ก่อนทิศทางถูกล็อก -> หมุนตามส่วนต่างของทิศทาง
+            to_turns = BoardLocator.ORIENTATION_TO_TURNS
+            return (to_turns[locator.orientation or "0"] - to_turns[packet.orientation or "0"]) % 4
+
+    def _classify_occupancy(self, packets: List[FramePacket]) -> List[FramePacket]:
+        """S2: Occupancy ของทุกเฟรมใน Batch ด้วยการเรียกโมเดลครั้งเดียว"""
+        squares = [
+            image_utils.crop_square_batch(packet.warped, padding_ratio=StateRecognizer.OCCUPANCY_CONTEXT_RATIO)
+            for packet in packets
+        ]
+        grids = self.recognizer.occupancy_model.predict_many(squares)
+        for packet, grid in zip(packets, grids):
+            packet.occupancy_grid = grid
+            if packet.orientation_pending:
+                turns = self._orientation_correction(packet)
+                if turns:
+                    packet.warped = self.recognizer.locator.rotate_board(packet.warped, turns)
+                    packet.occupancy_grid = fen_utils.rotate_grid(grid, turns)
+        return packets
+
+    def _classify_pieces(self, packets: List[FramePacket]) -> List[FramePacket]:
+        """S3: ชนิดหมากของช่องที่มีหมาก (รวม Crop จากทุกเฟรมใน Batch)"""
+        requests = []
+        for packet in packets:
+            indices = [i for i, occupied in enumerate(packet.occupancy_grid) if occupied]
+            crops = image_utils.crop_square_batch(packet.warped, padding_ratio=StateRecognizer.PIECE_PADDING_RATIO)
+            requests.append((crops[indices], indices))
+        if self.smoother is not None:
+            for packet, proba in zip(packets, self.recognizer.piece_model.predict_proba_many(requests)):
+                packet.piece_proba = proba
+                packet.warped = None
+            return packets
+        grids = self.recognizer.piece_model.predict_many(requests)
+        for packet, grid in zip(packets, grids):
+            packet.piece_grid = grid
+            packet.warped = None
+        return packets
+
+    # --- Decode ---
+    def _decode(self, reader: FrameReader, out_queue: queue.Queue, stats: StageStats,
+                end_frame: Optional[int]) -> None:
+        try:
+            for frame in reader:
+                if end_frame is not None and frame.index >= end_frame:
+                    break
+                stats.items += 1
+                stats.batches += 1
+                stats.last_index = frame.index
+                stats.busy_s = reader.stats["grab_s"] + reader.stats["retrieve_s"]
+                out_queue.put(FramePacket(index=frame.index, timestamp_ms=frame.timestamp_ms,
+                                          image=frame.image, offset=frame.offset,
+                                          reader_state=reader.get_state()))
+        except Exception as e:
+            print(f"!!! Stage decode error: {e}")
+        finally:
+            reader.release()
+            out_queue.put(_END)
+
+    # --- Main ---
+    def run(self, video_path: str, start_frame: int = 0, end_frame: Optional[int] = None,
+            start_board: Optional[chess.Board] = None, checkpoint_path: Optional[str] = None) -> VideoResult:
+        """
+        ประมวลผลวิดีโอทั้งไฟล์ (หรือช่วง [start_frame, end_frame)) -> VideoResult (PGN + สถิติของแต่ละ Stage)
+        :param start_frame: [NEW] เฟรมแรกที่อ่าน
+        :param end_frame: [NEW] หยุดก่อนเฟรมนี้ (None = จนจบวิดีโอ)
+        :param start_board: [NEW] ตำแหน่งของเกม ณ start_frame (None = ตำแหน่งเริ่มมาตรฐาน)
+        :param checkpoint_path: [NEW] ไฟล์ Checkpoint (JSON) ถ้ามีอยู่แล้วจะทำต่อจาก Checkpoint
+                                (แทน start_frame / end_frame / start_board) และลบทิ้งเมื่อจบวิดีโอ
+        """
+        checkpoint = VideoCheckpoint.load(checkpoint_path, video_path) if checkpoint_path else None
+        if checkpoint is not None:
+            start_frame, end_frame = checkpoint.next_frame, checkpoint.end_frame
+            print(f"Resuming {os.path.basename(video_path)} from frame {start_frame} "
+                  f"({len(checkpoint.tracker['moves'])} moves so far)")
+
+        reader = FrameReader(video_path, policy=self.sampling, stride=self.frame_stride,
+                             target_fps=self.target_fps, start_frame=start_frame)
+        self._reader = reader
+        self._s1_offset = (0, 0)
+        self._s1_failures = 0
+        self.recognizer.locator.reset_tracking()
+        if self.gate is not None:
+            self.gate.reset()
+            self.gate.roi = None
+        if self.smoother is not None:
+            self.smoother.reset()
+        if checkpoint is not None:
+            reader.set_roi(checkpoint.reader_roi)
+            self._s1_offset = checkpoint.s1_offset
+            self.recognizer.locator.set_session_state(checkpoint.locator)
+            if checkpoint.reader_state is not None:
+                reader.set_state(checkpoint.reader_state)
+            if self.gate is not None:
+                self.gate.roi = checkpoint.gate_roi
+                if checkpoint.gate_state is not None:
+                    self.gate.set_state(checkpoint.gate_state)
+            if self.smoother is not None and checkpoint.smoother_state is not None:
+                self.smoother.set_state(checkpoint.smoother_state)
+        self._queues = {name: queue.Queue(maxsize=self.queue_size) for name in self.STAGES
+                        if name != "gate" or self.gate is not None}
+        decode_stats = StageStats("decode")
+        decoder = threading.Thread(
+            target=self._decode, name="decode",
+            args=(reader, self._queues["decode"], decode_stats, end_frame), daemon=True
+        )
+        gate_stages = []
+        s1_input = self._queues["decode"]
+        if self.gate is not None:
+            gate_stages = [_Stage("gate", self._filter, self._queues["decode"], self._queues["gate"])]
+            s1_input = self._queues["gate"]
+        self._stages = gate_stages + [
+            _Stage("s1", self._locate, s1_input, self._queues["s1"]),
+            _Stage("s2", self._classify_occupancy, self._queues["s1"], self._queues["s2"], self.batch_frames),
+            _Stage("s3", self._classify_pieces, self._queues["s2"], self._queues["s3"], self.batch_frames),
+        ]
+        stats = {"decode": decode_stats, **{stage.name: stage.stats for stage in self._stages}}
+
+        if checkpoint is not None:
+            tracker = PositionTracker.from_dict(checkpoint.tracker)
+        else:
+            confirm_frames = 1 if self.gate is not None or self.smoother is not None else self.confirm_frames
+            tracker = PositionTracker(confirm_frames=confirm_frames, start_board=start_board)
+        start = time.perf_counter()
+        last_checkpoint = start
+        decoder.start()
+        for stage in self._stages:
+            stage.start()
+
+        # === Sink (Main Thread): ลำดับเฟรมคงเดิมเพราะแต่ละ Stage มี Thread เดียว ===
+        recognized = 0
+        while True:
+            packet = self._queues["s3"].get()
+            if packet is _END:
+                break
+            recognized += 1
+            grid = packet.piece_grid
+            if self.smoother is not None:
+                grid = self.smoother.update(packet.piece_proba)
+                packet.piece_proba = None
+            move = None
+            if grid is not None:
+                move = tracker.update(fen_utils.convert_grid_to_fen(grid), packet.index)
+            if move is not None:
+                print(f"Frame {packet.index} ({packet.timestamp_ms / 1000:.1f}s): {tracker.board.peek().uci()}")
+            if self.report_interval and recognized % self.report_interval == 0:
+                self.print_report(stats, time.perf_counter() - start)
+            if checkpoint_path and time.perf_counter() - last_checkpoint >= self.checkpoint_interval_s:
+                self._save_checkpoint(checkpoint_path, video_path, packet, tracker, end_frame)
+                last_checkpoint = time.perf_counter()
+
+        decoder.join()
+        for stage in self._stages:
+            stage.join()
+        wall_s = time.perf_counter() - start
+        self.print_report(stats, wall_s)
+        print(f"reader: {reader.stats['grabbed']} frames grabbed, {reader.stats['retrieved']} retrieved "
+              f"(grab {reader.stats['grab_s']:.1f}s, retrieve {reader.stats['retrieve_s']:.1f}s)")
+        if self.gate is not None:
+            print(f"gate: {self.gate.summary()}")
+        if self.smoother is not None:
+            print(f"smoother: {self.smoother.emitted} positions emitted from {self.smoother.frames} frames")
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path) # วิดีโอจบแล้ว
+
+        return VideoResult(pgn=tracker.pgn(), moves=tracker.san_moves(), positions=tracker.positions,
+                           frames_decoded=decode_stats.items, last_frame=decode_stats.last_index,
+                           frames_recognized=recognized, wall_s=wall_s, stats=stats)
+
+    def _save_checkpoint(self, path: str, video_path: str, packet: FramePacket,
+                         tracker: PositionTracker, end_frame: Optional[int]) -> None:
+        """
+        บันทึก State หลังเฟรม packet (เฟรมล่าสุดที่ผ่าน Sink)
+        เฟรมที่ยังค้างใน Queue จะถูกอ่านใหม่เมื่อ Resume
+        State ของ Reader / Gate / Locator มาจาก Snapshot ที่ติดมากับ packet (Stage ต้นทางทำเฟรมถัดไปไปแล้ว)
+        จึงอ่านและตัดสินเฟรมชุดเดียวกับการรันรวดเดียว ยกเว้น Tracking ของ BoardLocator ที่ต้อง Detect ใหม่
+        (Homography อาจต่างเล็กน้อย)
+        """
+        reader_state = packet.reader_state or self._reader.get_state()
+        VideoCheckpoint(
+            video=os.path.basename(video_path),
+            frame_index=packet.index,
+            next_frame=packet.index + reader_state["stride"],
+            end_frame=end_frame,
+            tracker=tracker.to_dict(),
+            locator=packet.locator_state or {},
+            s1_offset=packet.offset,
+            reader_roi=self._reader.roi,
+            gate_roi=self.gate.roi if self.gate is not None else None,
+            gate_state=packet.gate_state,
+            reader_state=reader_state,
+            smoother_state=self.smoother.get_state() if self.smoother is not None else None,
+        ).save(path)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """ความลึกปัจจุบันของ Queue ขาออกของแต่ละ Stage"""
+        return {name: q.qsize() for name, q in self._queues.items()}
+
+    def print_report(self, stats: Dict[str, StageStats], wall_s: float) -> None:
+        """
+        พิมพ์สถิติของทุก Stage: Stage ที่ busy ใกล้ 100% คือคอขวด
+        (Queue ขาเข้าเต็มตลอด = Stage นี้ช้ากว่าต้นทาง)
+        """
+        print(f"\n--- Streaming Pipeline Stats ({wall_s:.1f}s) ---")
+        for name, stage in stats.items():
+            busy = 100.0 * stage.busy_s / wall_s if wall_s > 0 else 0.0
+            print(f"{name:>6}: {stage.items:6d} frames, {stage.fps:8.1f} fps, busy {busy:5.1f}%, "
+                  f"batch {stage.mean_batch:4.1f}, in-queue mean {stage.mean_depth:4.1f} / max {stage.max_depth}, "
+                  f"dropped {stage.dropped}")
+        print(f"queues: {self.queue_depths()}")
@@ -0,0 +1,150 @@
+"""
+[NEW FILE]
+ตัวจำแนกสีด้วย Lookup Table (LUT) สำหรับ State 1
+
+สร้างตาราง BGR (quantized) -> Bitmask ของคลาสสี ครั้งเดียวตอนเริ่มต้น
+แล้วแต่ละเฟรมจะได้ Mask ทุกคลาสจากการเปิดตาราง 1 รอบ (ไม่ต้องแปลงเป็น HSV)
+"""
+import json
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from src.core.typing import ImageBGR, ImageGreyscale
+
+# ช่วง HSV (OpenCV: H 0-180, S/V 0-255) -> (lower, upper)
+HSVRange = Tuple[Tuple[int, int, int], Tuple[int, int, int]]
+
+
+class ColorClassifier:
+    """
+    จำแนก pixel เป็นคลาสสี (หลายคลาสพร้อมกันได้) ด้วย LUT ของ BGR ที่ Quantize แล้ว
+    """
+    # Bit ของแต่ละคลาส
+    GREEN_SQUARE = 1
+    LIGHT_SQUARE = 2
+    WHITE_PIECE = 4
+    BLACK_PIECE = 8
+
+    CLASS_BITS: Dict[str, int] = {
+        "green_square": GREEN_SQUARE,
+        "light_square": LIGHT_SQUARE,
+        "white_piece": WHITE_PIECE,
+        "black_piece": BLACK_PIECE,
+    }
+
+    # Threshold มาตรฐาน (เดิม hard-coded อยู่ใน BoardLocator)
+    DEFAULT_THRESHOLDS: Dict[str, HSVRange] = {
+        "green_square": ((35, 40, 40), (85, 255, 255)),
+        "light_square": ((0, 0, 180), (180, 50, 255)),
+        "white_piece": ((0, 0, 190), (180, 40, 255)),
+        "black_piece": ((0, 0, 0), (180, 255, 60)),
+    }
+
+    _default_instance: Optional["ColorClassifier"] = None
+
+    def __init__(self, thresholds: Optional[Dict[str, HSVRange]] = None, bits: int = 5):
+        """
+        :param thresholds: ช่วง HSV ของแต่ละคลาส (เช่น ที่ Calibrate แล้วสำหรับแต่ละสนาม)
+        :param bits: จำนวน bit ต่อ channel ที่เก็บในตาราง (5 -> 32^3 = 32768 ช่อง)
+        """
+        if not 1 <= bits <= 5:
+            raise ValueError("bits must be between 1 and 5")
+        self.thresholds = dict(self.DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        unknown = set(self.thresholds) - set(self.CLASS_BITS)
+        if unknown:
+            raise ValueError(f"Unknown colour classes: {sorted(unknown)}")
+
+        self.bits = bits
+        self.lut = self._build_lut()
+        self._channel_lut = self._build_channel_lut()
+
+    @classmethod
+    def default(cls) -> "ColorClassifier":
+        """คืน ColorClassifier ที่ใช้ Threshold มาตรฐาน (สร้างครั้งเดียวต่อ Process)"""
+        if cls._default_instance is None:
+            cls._default_instance = cls()
+        return cls._default_instance
+
+    def _bin_centres(self) -> np.ndarray:
+        shift = 8 - self.bits
+        levels = np.arange(1 << self.bits, dtype=np.int32)
+        return np.clip((levels << shift) + ((1 << shift) >> 1), 0, 255).astype(np.uint8)
+
+    def _build_lut(self) -> np.ndarray:
+        """
+        แปลงสีกลางของทุก Bin เป็น HSV ครั้งเดียว แล้วเช็คทุก Threshold
+        ลำดับ index = (b << 2*bits) | (g << bits) | r
+        """
+        centres = self._bin_centres()
+        b, g, r = np.meshgrid(centres, centres, centres, indexing="ij")
+        bgr = np.stack([b.ravel(), g.ravel(), r.ravel()], axis=-1).reshape(1, -1, 3)
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+
+        lut = np.zeros(bgr.shape[1], dtype=np.uint8)
+        for name, (lower, upper) in self.thresholds.items():
+            in_range = cv2.inRange(hsv, np.array(lower), np.array(upper)).reshape(-1) > 0
+            lut[in_range] |= self.CLASS_BITS[name]
+        return lut
+
+    def _build_channel_lut(self) -> np.ndarray:
+        """
+        LUT ต่อ channel (สำหรับ cv2.LUT) ที่ Quantize และเลื่อน bit ไว้ในตำแหน่งของ index
+        """
+        quantized = np.arange(256, dtype=np.uint16) >> (8 - self.bits)
+        channel_lut = np.empty((1, 256, 3), dtype=np.uint16)
+        channel_lut[0, :, 0] = quantized << (2 * self.bits) # B
+        channel_lut[0, :, 1] = quantized << self.bits       # G
+        channel_lut[0, :, 2] = quantized                    # R
+        return channel_lut
+
+    def classify(self, image: ImageBGR) -> np.ndarray:
+        """
+        คืนภาพ Bitmask (uint8) ขนาดเท่าภาพ: แต่ละ pixel เป็น OR ของ bit คลาสที่ตรง
+        """
+        shifted = cv2.LUT(image, self._channel_lut)
+        # แต่ละ channel อยู่คนละช่วง bit -> ผลรวมเท่ากับ OR
+        index = cv2.transform(shifted, np.ones((1, 3), dtype=np.float32))
+        return self.lut[index]
+
+    @staticmethod
+    def mask(classes: np.ndarray, class_bits: int) -> ImageGreyscale:
+        """
+        ดึง Mask (0/255) ของคลาสที่ระบุ (OR หลายคลาสได้ เช่น GREEN_SQUARE | LIGHT_SQUARE)
+        """
+        return cv2.compare(cv2.bitwise_and(classes, class_bits), 0, cv2.CMP_GT)
+
+    # --- Serialization ---
+    def save(self, path: str) -> None:
+        """
+        บันทึก LUT พร้อม Threshold (.npz) เพื่อนำไปใช้กับสนาม/แสงที่ Calibrate ไว้
+        """
+        np.savez_compressed(
+            path,
+            lut=self.lut,
+            bits=np.array(self.bits),
+            thresholds=np.array(json.dumps(self.thresholds)),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ColorClassifier":
+        """
+        โหลด LUT ที่บันทึกไว้ (ไม่ต้องสร้างตารางใหม่)
+        """
+        with np.load(path) as data:
+            bits = int(data["bits"])
+            thresholds = {
+                name: (tuple(lower), tuple(upper))
+                for name, (lower, upper) in json.loads(str(data["thresholds"])).items()
+            }
+            lut = data["lut"].astype(np.uint8)
+
+        if lut.shape != (1 << (3 * bits),):
+            raise ValueError(f"Invalid colour LUT in {path}")
+
+        classifier = cls.__new__(cls)
+        classifier.thresholds = thresholds
+        classifier.bits = bits
+        classifier.lut = lut
+        classifier._channel_lut = classifier._build_channel_lut()
+        return classifier
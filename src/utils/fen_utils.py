@@ -3,8 +3,12 @@
 ฟังก์ชันช่วยเหลือสำหรับจัดการ FEN (Forsyth-Edwards Notation)
 และเก็บ Map มาตรฐานของกระดาน
 """
+import chess
+from typing import List, TypeVar
 from src.core.typing import PieceGrid, FEN_String
 
+T = TypeVar("T")
+
 # Map มาตรฐานของกระดาน (index 0-63)
 # (จำเป็นสำหรับ prepare_piece_data.py)
 PIECE_MAP = [
@@ -25,6 +29,24 @@ PIECE_TO_FEN = {
     'empty': '1' # '1' คือ 1 ช่องว่าง
 }
 
+# [NEW] Map กลับจากสัญลักษณ์ FEN เป็นชื่อคลาส
+FEN_TO_PIECE = {symbol: name for name, symbol in PIECE_TO_FEN.items() if name != 'empty'}
+
+def grid_index_to_square(index: int) -> chess.Square:
+    """
+    [NEW] index ของ Grid (0 = a8, 63 = h1) -> chess.Square (0 = a1)
+    """
+    return chess.square_mirror(index)
+
+def board_to_grid(board: chess.BaseBoard) -> PieceGrid:
+    """
+    [NEW] แปลง chess.Board เป็น PieceGrid (ลำดับเดียวกับ Grid ของ Pipeline: index 0 = a8)
+    """
+    grid: PieceGrid = ['empty'] * 64
+    for square, piece in board.piece_map().items():
+        grid[chess.square_mirror(square)] = FEN_TO_PIECE[piece.symbol()]
+    return grid
+
 def convert_grid_to_fen(grid: PieceGrid) -> FEN_String:
     """
     แปลง List 64 ช่อง ('empty', 'w_Pawn'...) ให้เป็น FEN string
@@ -53,4 +75,18 @@ def convert_grid_to_fen(grid: PieceGrid) -> FEN_String:
                 fen += '/'
             empty_count = 0
             
-    return fen
\ No newline at end of file
+    return fen
+
+def rotate_grid(grid: List[T], turns: int) -> List[T]:
+    """
+    [NEW] หมุน Grid 64 ช่อง 90 องศาทวนเข็ม `turns` ครั้ง
+    (ให้ตรงกับการหมุนภาพกระดานด้วย np.rot90 / BoardLocator.rotate_board)
+    """
+    turns %= 4
+    if turns == 0:
+        return list(grid)
+    rotated = list(grid)
+    for _ in range(turns):
+        # ทวนเข็ม 90 องศา: ช่องใหม่ (r, c) มาจากช่องเดิม (c, 7 - r)
+        rotated = [rotated[c * 8 + (7 - r)] for r in range(8) for c in range(8)]
+    return rotated
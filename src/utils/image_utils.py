@@ -1,13 +1,15 @@
 """
 ฟังก์ชัน Helpers ที่ใช้บ่อยๆ เกี่ยวกับ OpenCV (Image Processing)
 """
+import functools
 import cv2
 import numpy as np
-from typing import Optional, List # [FIX] เพิ่ม List
+from typing import Optional, List, Tuple # [FIX] เพิ่ม List
 
 from src.core.typing import (
     ImageBGR, ImageGreyscale, WarpedImage, HomographyMatrix, 
-    LineSegment, Lines, IntersectionPoint, SquareImage # [FIX] เพิ่ม SquareImage
+    LineSegment, Lines, IntersectionPoint, SquareImage, # [FIX] เพิ่ม SquareImage
+    SquareBatch
 )
 
 # --- (โค้ด State 1 ของเดิม) ---
@@ -17,17 +19,81 @@ def preprocess_for_lines(image: ImageBGR) -> ImageGreyscale:
     edges = cv2.Canny(blurred, 50, 150)
     return edges
 
-def find_hough_lines(edges: ImageGreyscale) -> Lines:
+def find_hough_lines(edges: ImageGreyscale, threshold: int = 100,
+                     min_line_length: int = 100, max_line_gap: int = 10) -> Lines:
     lines = cv2.HoughLinesP(
         edges, rho=1, theta=np.pi / 180,
-        threshold=100, minLineLength=100, maxLineGap=10
+        threshold=threshold, minLineLength=min_line_length, maxLineGap=max_line_gap
     )
     if lines is None: return []
-    return [tuple(line[0]) for line in lines]
+    return [tuple(line) for line in lines.reshape(-1, 4)]
 
 def warp_image(image: ImageBGR, matrix: HomographyMatrix, size: int) -> WarpedImage:
     return cv2.warpPerspective(image, matrix, (size, size))
 
+# [NEW] Warp ด้วย Remap Table ที่คำนวณไว้ล่วงหน้า (สำหรับกล้องที่ตั้งนิ่ง)
+WarpMaps = Tuple[np.ndarray, np.ndarray]
+
+def build_warp_maps(matrix: HomographyMatrix, size: int, fixed_point: bool = True) -> WarpMaps:
+    """
+    [NEW] สร้าง Map คู่ (map1, map2) สำหรับ cv2.remap ที่ให้ผลเหมือน warpPerspective
+    
+    :param matrix: Homography (ภาพต้นฉบับ -> ภาพ Warp)
+    :param size: ขนาดภาพ Warp (size x size)
+    :param fixed_point: แปลง Map เป็น Fixed-point (CV_16SC2 + CV_16UC1)
+                        ใช้หน่วยความจำน้อยกว่า float32 และ remap เร็วกว่า
+    :return: (map1, map2)
+    """
+    inverse = np.linalg.inv(matrix)
+    xs, ys = np.meshgrid(np.arange(size, dtype=np.float64), np.arange(size, dtype=np.float64))
+    src_x = inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]
+    src_y = inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]
+    src_w = inverse[2, 0] * xs + inverse[2, 1] * ys + inverse[2, 2]
+    map_x = (src_x / src_w).astype(np.float32)
+    map_y = (src_y / src_w).astype(np.float32)
+
+    if fixed_point:
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+    return map_x, map_y
+
+def remap_image(image: ImageBGR, maps: WarpMaps) -> WarpedImage:
+    """
+    [NEW] Warp ภาพด้วย Map ที่สร้างจาก build_warp_maps
+    """
+    return cv2.remap(image, maps[0], maps[1], cv2.INTER_LINEAR)
+
+def homography_drift(matrix_a: HomographyMatrix, matrix_b: HomographyMatrix, size: int) -> float:
+    """
+    [NEW] วัดว่า Homography 2 ตัวต่างกันแค่ไหน (หน่วย: pixels ในภาพต้นฉบับ)
+    โดยเทียบตำแหน่งของ 4 มุมกระดาน (ในภาพ Warp) เมื่อ Map กลับไปยังภาพต้นฉบับ
+    """
+    corners = np.array([
+        [0, 0], [size - 1, 0], [size - 1, size - 1], [0, size - 1]
+    ], dtype=np.float64).reshape(-1, 1, 2)
+    src_a = cv2.perspectiveTransform(corners, np.linalg.inv(matrix_a))
+    src_b = cv2.perspectiveTransform(corners, np.linalg.inv(matrix_b))
+    return float(np.linalg.norm((src_a - src_b).reshape(-1, 2), axis=1).max())
+
+def board_bounding_rect(matrix: HomographyMatrix, size: int, image_shape: Tuple[int, ...],
+                        margin: float = 0.0) -> Optional[Tuple[int, int, int, int]]:
+    """
+    [NEW] กรอบสี่เหลี่ยม (x, y, w, h) ของกระดานในภาพต้นฉบับ จาก Homography (ภาพต้นฉบับ -> ภาพ Warp ขนาด size)
+    :param margin: ขยายกรอบ (สัดส่วนของด้านที่ยาวที่สุดของกระดาน)
+    :return: กรอบที่ถูกตัดให้อยู่ในภาพ หรือ None ถ้ากระดานอยู่นอกภาพทั้งหมด
+    """
+    corners = np.array([
+        [0, 0], [size - 1, 0], [size - 1, size - 1], [0, size - 1]
+    ], dtype=np.float64).reshape(-1, 1, 2)
+    image_corners = cv2.perspectiveTransform(corners, np.linalg.inv(matrix)).reshape(-1, 2)
+    x, y, w, h = cv2.boundingRect(image_corners.astype(np.float32))
+    pad = int(round(margin * max(w, h)))
+    height, width = image_shape[:2]
+    x1, y1 = max(x - pad, 0), max(y - pad, 0)
+    x2, y2 = min(x + w + pad, width), min(y + h + pad, height)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2 - x1, y2 - y1
+
 def calculate_intersection(line1: LineSegment, line2: LineSegment) -> Optional[IntersectionPoint]:
     x1, y1, x2, y2 = line1
     x3, y3, x4, y4 = line2
@@ -40,6 +106,34 @@ def calculate_intersection(line1: LineSegment, line2: LineSegment) -> Optional[I
     if 0 <= t <= 1 and 0 <= u <= 1:
         return (int(x1 + t * (x2 - x1)), int(y1 + t * (y2 - y1)))
     return None
+
+def calculate_intersections(lines_a: Lines, lines_b: Lines, segments_only: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    [NEW] calculate_intersection แบบ Vectorized: หาจุดตัดของทุกคู่ (line_a, line_b)
+    ด้วย NumPy Broadcast ครั้งเดียว (แทน Loop O(n^2) ใน Python)
+    
+    :param lines_a: N เส้น (x1, y1, x2, y2)
+    :param lines_b: M เส้น (x1, y1, x2, y2)
+    :param segments_only: True = นับเฉพาะจุดตัดที่อยู่บนทั้ง 2 ส่วนของเส้น (เหมือน calculate_intersection)
+                          False = มองเป็นเส้นตรงยาวไม่สิ้นสุด
+    :return: (points, valid) -> points (N, M, 2) float, valid (N, M) bool
+    """
+    a = np.asarray(lines_a, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(lines_b, dtype=np.float64).reshape(1, -1, 4)
+    x1, y1, x2, y2 = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    x3, y3, x4, y4 = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+
+    den = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    valid = den != 0
+    safe_den = np.where(valid, den, 1.0)
+    t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / safe_den
+    u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / safe_den
+
+    if segments_only:
+        valid &= (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+
+    points = np.stack([x1 + t * (x2 - x1), y1 + t * (y2 - y1)], axis=-1)
+    return points, valid
 # --- (จบโค้ด State 1) ---
 
 
@@ -122,4 +216,94 @@ def crop_piece_squares(warped_image: WarpedImage, padding_ratio: float = 0.7) ->
             square_crop = warped_image[y1_pad:y2_pad, x1_pad:x2_pad]
             squares.append(square_crop)
             
-    return squares
\ No newline at end of file
+    return squares
+
+# --- [NEW] Crop ทุกช่องเป็น Array เดียว (ขนาดเท่ากันทุกช่อง) ---
+@functools.lru_cache(maxsize=32)
+def square_crop_table(board_size: int, padding_ratio: float) -> Tuple[int, int, np.ndarray]:
+    """
+    [NEW] ตารางพิกัดของ 64 ช่อง (คำนวณครั้งเดียวต่อ (ขนาดกระดาน, padding_ratio))
+    
+    :return: (padding, crop_size, origins)
+             origins: (64, 2) พิกัด (x, y) มุมซ้ายบนของแต่ละ Crop ในภาพ Warp (ติดลบได้ที่ขอบ)
+    """
+    sq_size = board_size // 8
+    padding = int((sq_size * padding_ratio) / 2) # สูตรเดียวกับ crop_squares_from_warped / crop_piece_squares
+    crop_size = sq_size + 2 * padding
+
+    index = np.arange(64)
+    origins = np.stack([(index % 8) * sq_size - padding, (index // 8) * sq_size - padding], axis=1)
+    origins.setflags(write=False)
+    return padding, crop_size, origins
+
+def crop_square_batch(warped_image: WarpedImage, padding_ratio: float,
+                      border_mode: int = cv2.BORDER_REPLICATE, as_view: bool = False) -> SquareBatch:
+    """
+    [NEW] ตัดภาพ WarpedImage เป็น 64 ช่อง "ขนาดเท่ากันทุกช่อง" ใน Array เดียว
+    
+    ต่างจาก crop_squares_from_warped / crop_piece_squares ที่คืน List และช่องขอบเล็กกว่าช่องใน
+    (เพราะถูกตัดที่ขอบภาพ) ฟังก์ชันนี้จะ Pad ภาพครั้งเดียว แล้วตัดทุกช่องผ่าน Strided View
+    
+    :param warped_image: ภาพกระดานที่ Warp แล้ว (สี่เหลี่ยมจัตุรัส)
+    :param padding_ratio: อัตราส่วนขยายขอบ (เหมือน context_ratio / padding_ratio เดิม)
+    :param border_mode: วิธี Pad ขอบภาพ (cv2.BORDER_*)
+    :param as_view: True = คืน Strided View (8, 8, S, S, 3) ของภาพที่ Pad แล้ว (ไม่ Copy)
+                    False = คืน Array ต่อเนื่อง (64, S, S, 3)
+    """
+    height, width = warped_image.shape[:2]
+    if height != width:
+        raise ValueError("Warped image must be square")
+
+    padding, crop_size, _ = square_crop_table(height, float(padding_ratio))
+    padded = cv2.copyMakeBorder(warped_image, padding, padding, padding, padding, border_mode)
+
+    # ภาพถูก Pad ด้วย `padding` ทุกด้าน -> ช่อง (r, c) เริ่มที่ (r * sq_size, c * sq_size) พอดี
+    sq_size = height // 8
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (crop_size, crop_size), axis=(0, 1))
+    # (H', W', 3, S, S) -> เลือกทุกๆ sq_size -> (8, 8, S, S, 3)
+    view = windows[::sq_size, ::sq_size][:8, :8].transpose(0, 1, 3, 4, 2)
+    if as_view:
+        return view
+    return np.ascontiguousarray(view).reshape(64, crop_size, crop_size, -1)
+
+# [NEW] น้ำหนักแปลง BGR -> Greyscale (เหมือน cv2.COLOR_BGR2GRAY)
+_GRAY_WEIGHTS_BGR = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+EDGE_DENSITY_SIZE = 32 # [NEW] ขนาดมาตรฐานของบริเวณกลางช่องตอนคำนวณ Edge Density
+
+def square_edge_density(squares: SquareBatch, center_fraction: float = 0.5,
+                        edge_threshold: float = 24.0, sample_size: int = EDGE_DENSITY_SIZE) -> np.ndarray:
+    """
+    [NEW] สัดส่วน pixel ที่เป็นขอบ (Edge Density) ในบริเวณกลางของแต่ละช่อง -> (N,) float32
+    ช่องว่างมีพื้นผิวเรียบ (ค่าใกล้ 0) ส่วนช่องที่มีหมากมีขอบของตัวหมาก (ค่าสูง)
+    คำนวณทั้ง Batch ด้วย NumPy ครั้งเดียว
+
+    :param squares: (N, H, W, 3) BGR uint8
+    :param center_fraction: สัดส่วนด้านของบริเวณกลางที่ใช้ (ตัดขอบช่อง/เส้นตารางออก)
+    :param edge_threshold: ค่า |dx| + |dy| (ระดับเทา) ขั้นต่ำที่ถือเป็นขอบ
+    :param sample_size: [UPDATE] ย่อ/ขยายบริเวณกลางเป็น sample_size x sample_size ก่อนคำนวณ
+                        ค่า Density จึงไม่ขึ้นกับขนาด Crop (Threshold ที่ปรับจาก Val ใช้กับ Runtime ได้ตรงกัน)
+    """
+    _, h, w, _ = squares.shape
+    y0, x0 = int(h * (1 - center_fraction) / 2), int(w * (1 - center_fraction) / 2)
+    center = squares[:, y0:h - y0, x0:w - x0]
+
+    gray = center.astype(np.float32) @ _GRAY_WEIGHTS_BGR # (N, h', w')
+    if len(gray) and gray.shape[1:] != (sample_size, sample_size):
+        size = (sample_size, sample_size)
+        gray = np.stack([cv2.resize(square, size, interpolation=cv2.INTER_AREA) for square in gray])
+    dx = np.abs(np.diff(gray, axis=2))[:, :-1, :]
+    dy = np.abs(np.diff(gray, axis=1))[:, :, :-1]
+    return ((dx + dy) > edge_threshold).mean(axis=(1, 2), dtype=np.float32)
+
+def square_signatures(warped_image: WarpedImage, cells: int = 4) -> np.ndarray:
+    """
+    [NEW] ลายเซ็น (Signature) ขนาดเล็กของแต่ละช่อง สำหรับตรวจว่าช่องเปลี่ยนไปหรือไม่
+    ย่อภาพกระดาน (Greyscale) เหลือ cells x cells pixel ต่อช่อง ด้วย INTER_AREA ครั้งเดียว
+
+    :return: (64, cells * cells) float32 เรียงแบบ Grid index (0 = a8)
+    """
+    gray = cv2.cvtColor(warped_image, cv2.COLOR_BGR2GRAY) if warped_image.ndim == 3 else warped_image
+    side = 8 * cells
+    small = cv2.resize(gray, (side, side), interpolation=cv2.INTER_AREA).astype(np.float32)
+    # (8, cells, 8, cells) -> (8, 8, cells, cells) -> (64, cells * cells)
+    return small.reshape(8, cells, 8, cells).transpose(0, 2, 1, 3).reshape(64, cells * cells)
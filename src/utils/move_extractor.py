@@ -0,0 +1,99 @@
+"""
+[NEW FILE]
+หาตาเดินระหว่างสองตำแหน่ง (Placement ของ FEN) ด้วย Bitboard
+(ใช้ผ่าน extract_move ใน src/utils/pgn_utils.py และ PositionTracker)
+
+แต่ละตำแหน่งถูกแทนด้วย Bitboard 12 ตัว (int 64 bit, bit ที่ n = chess.Square n) เรียงตาม
+python-chess: หมากขาว PAWN..KING (index 0-5) แล้วหมากดำ PAWN..KING (index 6-11)
+การหาตาเดินจึงเป็นแค่ XOR / AND ของ int แทนการเทียบ String ทีละช่อง:
+- ช่องที่หมากฝ่ายเดินหายไป = from, ช่องที่หมากฝ่ายเดินปรากฏ = to
+- 2 from / 2 to = Castling (ใช้ช่องของ King), เดินเบี้ยถึงแถวสุดท้าย = Promotion (ชนิดหมากจากช่อง to)
+- ตรวจ Legal และตรวจว่าตำแหน่งหลังเดินตรงกับ Bitboard ทั้ง 12 ตัว (ครอบคลุมการกิน / En passant)
+"""
+import chess
+from typing import Optional, Tuple
+
+Bitboards = Tuple[int, ...] # 12 ค่า
+
+# index ของ Bitboard ของแต่ละสัญลักษณ์ใน FEN ('P' -> 0, ..., 'k' -> 11)
+_SYMBOL_TO_INDEX = {
+    symbol: (chess.Piece.from_symbol(symbol).piece_type - 1) + (0 if symbol.isupper() else 6)
+    for symbol in "PNBRQKpnbrqk"
+}
+
+def placement_to_bitboards(placement: str) -> Bitboards:
+    """
+    ส่วน Placement ของ FEN (เช่น 'rnbqkbnr/pppppppp/8/...') -> Bitboard 12 ตัว
+    """
+    boards = [0] * 12
+    square = 56 # a8
+    for char in placement.split(" ")[0]:
+        if char == "/":
+            square -= 16
+        elif char.isdigit():
+            square += int(char)
+        else:
+            boards[_SYMBOL_TO_INDEX[char]] |= chess.BB_SQUARES[square]
+            square += 1
+    return tuple(boards)
+
+def board_to_bitboards(board: chess.BaseBoard) -> Bitboards:
+    """
+    Bitboard 12 ตัวของ chess.Board (อ่านจาก Bitboard ภายในของ python-chess โดยตรง)
+    """
+    white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    types = (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    return tuple(mask & white for mask in types) + tuple(mask & black for mask in types)
+
+def _piece_type_at(boards: Bitboards, square: chess.Square) -> Optional[chess.PieceType]:
+    bit = chess.BB_SQUARES[square]
+    for index, mask in enumerate(boards):
+        if mask & bit:
+            return index % 6 + 1
+    return None
+
+def extract_move(board: chess.Board, target: Bitboards,
+                 current: Optional[Bitboards] = None) -> Optional[chess.Move]:
+    """
+    หา Legal Move 1 ตาที่ทำให้ board กลายเป็นตำแหน่ง target
+    :param current: Bitboard ของ board (ถ้าคำนวณไว้แล้ว)
+    :return: chess.Move หรือ None (ตำแหน่งเดิม / ไม่มี Legal Move ใดให้ผลตรง)
+    """
+    if current is None:
+        current = board_to_bitboards(board)
+    if current == target:
+        return None
+
+    own = slice(0, 6) if board.turn == chess.WHITE else slice(6, 12)
+    old_own = new_own = 0
+    for mask in current[own]:
+        old_own |= mask
+    for mask in target[own]:
+        new_own |= mask
+    from_mask = old_own & ~new_own
+    to_mask = new_own & ~old_own
+    moved = (chess.popcount(from_mask), chess.popcount(to_mask))
+
+    if moved == (1, 1):
+        from_square, to_square = chess.lsb(from_mask), chess.lsb(to_mask)
+        promotion = None
+        if current[own][0] & from_mask and chess.square_rank(to_square) in (0, 7):
+            promotion = _piece_type_at(target[own], to_square)
+        move = chess.Move(from_square, to_square, promotion=promotion)
+    elif moved == (2, 2):
+        # Castling: King และ Rook ย้ายพร้อมกัน -> python-chess แทนด้วยการเดินของ King (เช่น e1g1)
+        king_from = current[own][5] & from_mask
+        king_to = target[own][5] & to_mask
+        if not king_from or not king_to:
+            return None
+        move = chess.Move(chess.lsb(king_from), chess.lsb(king_to))
+    else:
+        return None
+
+    if not board.is_legal(move):
+        return None
+    # ตรวจทั้งกระดาน: หมากที่ถูกกิน (รวม En passant) และฝ่ายตรงข้ามต้องตรงกับ target
+    board.push(move)
+    matched = board_to_bitboards(board) == target
+    board.pop()
+    return move if matched else None
@@ -0,0 +1,244 @@
+"""
+[NEW FILE]
+ฟังก์ชันช่วยเหลือสำหรับแปลงลำดับตำแหน่ง (FEN) เป็นตาเดิน และ PGN ตามรูปแบบไฟล์ Submission
+(เช่น "1. e4 c5 2. Nf3 d6")
+
+[UPDATE 1]:
+- find_move_sequence / PositionTracker ใช้ Bitboard (src/utils/move_extractor.py)
+  แทนการลองเดินทุก Legal Move แล้วเทียบ String ของ FEN
+
+[UPDATE 2]:
+- PositionTracker กู้คืนเมื่อพลาดบางตา: ลองลำดับ Legal Move ไม่เกิน max_plies ตา
+  ถ้าไม่พบแต่ตำแหน่งเป็นไปได้ -> Resync board (เหมือน MoveConstrainedRecognizer._full_recognition)
+  และเริ่ม Segment ใหม่ของ PGN
+
+[UPDATE 3]:
+- เลขตาของ board ที่ Resync ต่อจากตาสุดท้ายก่อน Resync (PGN เลขตาเพิ่มขึ้นตลอด ไม่เริ่ม "1." ใหม่ทุก Segment)
+"""
+import chess
+from typing import Iterable, List, Optional, Tuple
+from src.core.typing import FEN_String
+from src.utils.move_extractor import Bitboards, board_to_bitboards, extract_move, placement_to_bitboards
+
+def find_move_sequence(board: chess.Board, fen: FEN_String, max_plies: int = 2) -> Optional[List[chess.Move]]:
+    """
+    [NEW] หาลำดับ Legal Move สั้นที่สุด (ไม่เกิน max_plies ตา) จาก board ไปยังตำแหน่ง fen
+    (ใช้เมื่อพลาดบางตาไป เช่น ที่รอยต่อของ Chunk) -> None ถ้าหาไม่พบ
+    """
+    return _find_sequence(board, placement_to_bitboards(fen), max_plies)
+
+def _find_sequence(board: chess.Board, target: Bitboards, max_plies: int) -> Optional[List[chess.Move]]:
+    move = extract_move(board, target)
+    if move is not None:
+        return [move]
+    if max_plies <= 1:
+        return None
+    for first in list(board.legal_moves):
+        board.push(first)
+        rest = _find_sequence(board, target, max_plies - 1)
+        board.pop()
+        if rest is not None:
+            return [first] + rest
+    return None
+
+def moves_to_pgn(moves: Iterable[chess.Move], start_board: Optional[chess.Board] = None) -> str:
+    """
+    แปลงลำดับ Move เป็น PGN Movetext แบบไม่มี Header/ผลการแข่ง (รูปแบบคอลัมน์ output ของ Submission)
+    """
+    board = start_board.copy(stack=False) if start_board is not None else chess.Board()
+    return board.variation_san(list(moves))
+
+def _ply(board: chess.Board) -> int:
+    """[NEW] ลำดับ Ply ของตาถัดไปบน board (0 = ตาแรกของขาว)"""
+    return 2 * (board.fullmove_number - 1) + (board.turn == chess.BLACK)
+
+def _continue_numbering(board: chess.Board, last_ply: int) -> None:
+    """
+    [NEW] ตั้ง fullmove_number ของ board (ที่ Resync) ให้ตาถัดไปเป็น Ply แรกที่ตรงกับ board.turn
+    หลังเว้นจาก last_ply (Ply สุดท้ายที่เดินแล้ว) อย่างน้อยหนึ่ง Ply เพราะ Resync = พลาดไปบางตา
+    """
+    ply = last_ply + 2
+    if ply % 2 != (board.turn == chess.BLACK):
+        ply += 1
+    board.fullmove_number = ply // 2 + 1
+
+class PositionTracker:
+    """
+    ติดตามเกมจากลำดับ FEN ที่ได้จาก Pipeline ทีละเฟรม
+    ยอมรับตำแหน่งใหม่เมื่อเห็นซ้ำติดกัน confirm_frames เฟรม และมี Legal Move อธิบายได้
+    [UPDATE 2] พลาดไม่เกิน max_plies ตา -> เติมตาที่หายไป, มากกว่านั้น -> Resync ไปยังตำแหน่งที่เห็น
+    """
+    def __init__(self, confirm_frames: int = 3, start_board: Optional[chess.Board] = None,
+                 max_plies: int = 2):
+        """
+        :param confirm_frames: จำนวนเฟรมติดกันที่ต้องเห็นตำแหน่งเดียวกันก่อนยอมรับ (กันเฟรมที่มีมือบัง)
+        :param start_board: ตำแหน่งเริ่มต้นของเกม (None = ตำแหน่งเริ่มมาตรฐาน)
+        :param max_plies: [NEW] จำนวนตาสูงสุดที่หาเติมได้เมื่อพลาดบางตา (find_move_sequence)
+        """
+        self.confirm_frames = confirm_frames
+        self.max_plies = max_plies
+        self.start_board = start_board.copy() if start_board is not None else chess.Board()
+        self.board = self.start_board.copy()
+        self.moves: List[chess.Move] = []
+
+        # [NEW] ตำแหน่งที่ยืนยันแล้วทุกตำแหน่ง (ไม่ตรวจกติกา) -> (frame_index, placement)
+        self.positions: List[Tuple[int, str]] = []
+
+        # [NEW] จุด Resync -> (จำนวนตาใน moves ก่อน Resync, FEN ที่ตั้งใหม่)
+        # ตาเดินหลังจุดนี้ Legal ต่อจาก FEN ใหม่ ไม่ใช่ต่อจากตาก่อนหน้า
+        self.resyncs: List[Tuple[int, str]] = []
+
+        self._candidate: Optional[str] = None
+        self._candidate_count = 0
+
+    def update(self, fen: FEN_String, frame_index: int = -1) -> Optional[chess.Move]:
+        """
+        ส่ง FEN ของเฟรมล่าสุด -> คืน Move ล่าสุดที่เพิ่งยอมรับ (หรือ None)
+        """
+        placement = fen.split(" ")[0]
+        if placement == self._candidate:
+            self._candidate_count += 1
+        else:
+            self._candidate = placement
+            self._candidate_count = 1
+
+        if self._candidate_count != self.confirm_frames:
+            return None
+        if not self.positions or self.positions[-1][1] != placement:
+            self.positions.append((frame_index, placement))
+        # [UPDATE 1] เทียบด้วย Bitboard (ไม่สร้าง board_fen() ของ board ทุกครั้ง)
+        target = placement_to_bitboards(placement)
+        current = board_to_bitboards(self.board)
+        if target == current:
+            return None
+
+        move = extract_move(self.board, target, current)
+        if move is None and self.resyncs and self.resyncs[-1][0] == len(self.moves):
+            move = self._retry_resync_turn(target, current)
+        if move is not None:
+            self.board.push(move)
+            self.moves.append(move)
+            return move
+
+        # [UPDATE 2] พลาดบางตา (เช่น เฟรมหลังเดินถูกมือบังหรือถูก Gate ข้าม) -> หาลำดับสั้นที่สุด
+        sequence = _find_sequence(self.board, target, self.max_plies) if self.max_plies > 1 else None
+        if sequence is not None:
+            for move in sequence:
+                self.board.push(move)
+            self.moves.extend(sequence)
+            print(f"Recovered {len(sequence)} plies at frame {frame_index}: {' '.join(m.uci() for m in sequence)}")
+            return sequence[-1]
+
+        self._resync(placement, frame_index)
+        return None
+
+    def _retry_resync_turn(self, target: Bitboards, current: Bitboards) -> Optional[chess.Move]:
+        """
+        [NEW] ฝั่งที่ถึงตาเดินหลัง Resync เป็นการเดา -> ถ้ายังไม่มีตาเดินต่อจาก Resync ลองให้อีกฝั่งเดิน
+        (ถ้าได้ Move จะแก้ board และ FEN ของจุด Resync ล่าสุด)
+        """
+        flipped = self.board.copy(stack=False)
+        flipped.turn = not flipped.turn
+        previous_board, previous_moves = self.segments()[-2]
+        _continue_numbering(flipped, _ply(previous_board) + len(previous_moves) - 1)
+        if not flipped.is_valid():
+            return None
+        move = extract_move(flipped, target, current)
+        if move is not None:
+            self.board = flipped
+            self.resyncs[-1] = (len(self.moves), flipped.fen())
+        return move
+
+    def _resync(self, placement: str, frame_index: int) -> None:
+        """
+        [NEW] ตำแหน่งเปลี่ยนโดยไม่มี Legal Move อธิบาย -> ตั้ง board เป็นตำแหน่งนี้ถ้าเป็นไปได้
+        (ลองให้อีกฝั่งถึงตาเดินก่อน แล้วจึงฝั่งเดิม) ไม่เพิ่มตาเดิน
+        [UPDATE] เลขตาต่อจากตาสุดท้ายของ board เดิม
+        """
+        last_ply = _ply(self.board) - 1
+        for turn in (not self.board.turn, self.board.turn):
+            candidate = self.board.copy(stack=False)
+            candidate.set_board_fen(placement)
+            candidate.turn = turn
+            candidate.castling_rights = candidate.clean_castling_rights()
+            candidate.ep_square = None
+            _continue_numbering(candidate, last_ply)
+            if candidate.is_valid():
+                print(f"Resync board at frame {frame_index}: {candidate.fen()}")
+                self.board = candidate
+                self.resyncs.append((len(self.moves), candidate.fen()))
+                return
+        print(f"!!! Ignored impossible position at frame {frame_index}: {placement}")
+
+    def segments(self) -> List[Tuple[chess.Board, List[chess.Move]]]:
+        """
+        [NEW] แบ่ง moves ตามจุด Resync -> List ของ (ตำแหน่งเริ่มของ Segment, ตาเดินใน Segment)
+        """
+        result = []
+        board, start = self.start_board, 0
+        for count, fen in self.resyncs:
+            result.append((board, self.moves[start:count]))
+            board, start = chess.Board(fen), count
+        result.append((board, self.moves[start:]))
+        return result
+
+    def san_moves(self) -> List[str]:
+        """[NEW] SAN ของทุกตาเดิน (แต่ละ Segment เริ่มจากตำแหน่งของตัวเอง)"""
+        sans = []
+        for start_board, moves in self.segments():
+            board = start_board.copy(stack=False)
+            for move in moves:
+                sans.append(board.san(move))
+                board.push(move)
+        return sans
+
+    def pgn(self) -> str:
+        """
+        PGN ของเกมที่ติดตามได้จนถึงตอนนี้
+        [UPDATE 2] ถ้ามีการ Resync แต่ละ Segment เริ่มจากตำแหน่งที่ Resync (ต่อกันด้วยช่องว่าง)
+        เลขตาของแต่ละ Segment ต่อจาก Segment ก่อนหน้า (ดู _continue_numbering)
+        """
+        return " ".join(
+            text for text in (moves_to_pgn(moves, board) for board, moves in self.segments()) if text
+        )
+
+    def to_dict(self) -> dict:
+        """
+        [NEW] State ทั้งหมดของ Tracker (แปลงเป็น JSON ได้) สำหรับ Checkpoint
+        """
+        return {
+            "confirm_frames": self.confirm_frames,
+            "max_plies": self.max_plies,
+            "start_fen": self.start_board.fen(),
+            "fen": self.board.fen(),
+            "moves": [move.uci() for move in self.moves],
+            "resyncs": [list(resync) for resync in self.resyncs],
+            "positions": [list(position) for position in self.positions],
+            "candidate": self._candidate,
+            "candidate_count": self._candidate_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PositionTracker":
+        """
+        [NEW] สร้าง Tracker จาก to_dict() (Replay ตาเดินจาก start_fen -> board.move_stack ครบ)
+        [UPDATE 2] ตั้ง board ใหม่ที่จุด Resync ระหว่าง Replay
+        """
+        tracker = cls(confirm_frames=data["confirm_frames"], start_board=chess.Board(data["start_fen"]),
+                      max_plies=data.get("max_plies", 2))
+        tracker.resyncs = [(int(count), fen) for count, fen in data.get("resyncs", [])]
+        resync_at = dict(tracker.resyncs)
+        for index, uci in enumerate(data["moves"]):
+            if index in resync_at:
+                tracker.board = chess.Board(resync_at[index])
+            move = chess.Move.from_uci(uci)
+            tracker.board.push(move)
+            tracker.moves.append(move)
+        if len(tracker.moves) in resync_at:
+            tracker.board = chess.Board(resync_at[len(tracker.moves)])
+        if tracker.board.fen() != data["fen"]:
+            raise ValueError(f"Checkpoint moves do not reach the saved position: {data['fen']}")
+        tracker.positions = [(int(frame), placement) for frame, placement in data["positions"]]
+        tracker._candidate = data["candidate"]
+        tracker._candidate_count = data["candidate_count"]
+        return tracker
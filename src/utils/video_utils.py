@@ -0,0 +1,159 @@
+"""
+[NEW FILE]
+อ่านเฟรมจากวิดีโอแบบ Sparse (grab / retrieve)
+
+VideoCapture.read() = grab() + retrieve(): grab() ขยับไปเฟรมถัดไป ส่วน retrieve() แปลงเฟรมเป็นภาพ BGR
+(แปลงสี + Copy ขนาดเต็ม) ซึ่งเป็นต้นทุนหลักเมื่อวิเคราะห์เพียงไม่กี่เฟรมต่อวินาที
+FrameReader จึง grab() ทุกเฟรม แต่ retrieve() เฉพาะเฟรมที่ Policy เลือก:
+- 'stride':   ทุกๆ stride เฟรม
+- 'fps':      ให้ได้ประมาณ target_fps เฟรมต่อวินาที (stride = fps ของวิดีโอ / target_fps)
+- 'adaptive': ถี่ขึ้น (min_stride) เมื่อภาพเปลี่ยน และห่างขึ้นทีละ 2 เท่า (ถึง max_stride) เมื่อภาพนิ่ง
+และตัดภาพเหลือเฉพาะ ROI รอบกระดานล่าสุดได้ (set_roi)
+[NEW] get_state() / set_state(): Stride ปัจจุบันและภาพย่อล่าสุดของ 'adaptive' สำหรับ Checkpoint
+"""
+import time
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.core.typing import ImageBGR
+
+@dataclass
+class VideoFrame:
+    """
+    เฟรมที่อ่านได้ 1 เฟรม
+    """
+    index: int                  # ลำดับเฟรมในวิดีโอ (เริ่มที่ 0)
+    timestamp_ms: float
+    image: ImageBGR             # ภาพเต็ม หรือเฉพาะ ROI
+    offset: Tuple[int, int] = (0, 0) # มุมซ้ายบนของ ROI ในภาพเต็ม (x, y)
+
+class FrameReader:
+    """
+    อ่านวิดีโอตาม Sampling Policy (ใช้เป็น Iterator ของ VideoFrame)
+    """
+    POLICIES = ("stride", "fps", "adaptive")
+
+    def __init__(self, video_path: str, policy: str = "stride", stride: int = 1,
+                 target_fps: float = 2.0, min_stride: int = 1, max_stride: Optional[int] = None,
+                 activity_threshold: float = 4.0, start_frame: int = 0):
+        """
+        :param policy: 'stride', 'fps' หรือ 'adaptive'
+        :param stride: ระยะห่างของเฟรม (policy='stride')
+        :param target_fps: จำนวนเฟรมที่วิเคราะห์ต่อวินาที (policy='fps'; และเป็นอัตราต่ำสุดของ 'adaptive')
+        :param min_stride: ระยะห่างเมื่อภาพกำลังเปลี่ยน (policy='adaptive')
+        :param max_stride: ระยะห่างสูงสุดเมื่อภาพนิ่ง (policy='adaptive', None = คำนวณจาก target_fps)
+        :param activity_threshold: ค่าต่างเฉลี่ย (ระดับเทา) ของภาพย่อ 32x32 ที่ถือว่าภาพเปลี่ยน (policy='adaptive')
+        :param start_frame: [NEW] Seek ไปเริ่มที่เฟรมนี้ (เช่น Chunk ของวิดีโอ หรือ Resume จาก Checkpoint)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}, got {policy!r}")
+        self.capture = cv2.VideoCapture(video_path)
+        if not self.capture.isOpened():
+            raise FileNotFoundError(f"Cannot open video: {video_path}")
+
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.policy = policy
+        fps_stride = max(1, int(round(self.fps / target_fps)))
+        if policy == "stride":
+            self.stride = max(1, stride)
+        elif policy == "fps":
+            self.stride = fps_stride
+        else:
+            self.min_stride = max(1, min_stride)
+            self.max_stride = max(self.min_stride, max_stride or fps_stride)
+            self.stride = self.min_stride
+        self.activity_threshold = activity_threshold
+
+        self.roi: Optional[Tuple[int, int, int, int]] = None # (x, y, w, h) ในภาพเต็ม
+        self._index = -1 # เฟรมล่าสุดที่ grab แล้ว
+        self._started = False
+        if start_frame > 0:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            self._index = int(self.capture.get(cv2.CAP_PROP_POS_FRAMES)) - 1
+        self._thumbnail: Optional[np.ndarray] = None
+        self.stats: Dict[str, float] = {"grabbed": 0, "retrieved": 0, "grab_s": 0.0, "retrieve_s": 0.0}
+
+    def set_roi(self, roi: Optional[Tuple[int, int, int, int]]) -> None:
+        """ตัดเฟรมถัดไปเหลือเฉพาะ (x, y, w, h) ในภาพเต็ม (None = ภาพเต็ม)"""
+        self.roi = roi
+
+    def get_state(self) -> dict:
+        """
+        [NEW] State ของ Policy หลังอ่านเฟรมล่าสุด (แปลงเป็น JSON ได้): Stride ไปยังเฟรมถัดไป
+        และภาพย่อที่ 'adaptive' ใช้เทียบ
+        """
+        thumbnail = self._thumbnail if self.policy == "adaptive" else None
+        return {"stride": self.stride, "thumbnail": thumbnail.tolist() if thumbnail is not None else None}
+
+    def set_state(self, state: dict) -> None:
+        """
+        [NEW] คืน State จาก get_state() (เรียกก่อนอ่านเฟรมแรก: เฟรมแรกยังอ่านทันทีที่ start_frame)
+        """
+        self.stride = int(state["stride"])
+        thumbnail = state.get("thumbnail")
+        self._thumbnail = np.array(thumbnail, dtype=np.uint8) if thumbnail is not None else None
+
+    def _grab(self) -> bool:
+        start = time.perf_counter()
+        ok = self.capture.grab()
+        self.stats["grab_s"] += time.perf_counter() - start
+        if ok:
+            self._index += 1
+            self.stats["grabbed"] += 1
+        return ok
+
+    def _update_stride(self, image: ImageBGR) -> None:
+        """
+        [adaptive] เทียบภาพย่อกับเฟรมที่อ่านก่อนหน้า
+        """
+        thumbnail = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), (32, 32), interpolation=cv2.INTER_AREA)
+        if self._thumbnail is not None and self._thumbnail.shape == thumbnail.shape:
+            activity = float(cv2.absdiff(thumbnail, self._thumbnail).mean())
+            if activity > self.activity_threshold:
+                self.stride = self.min_stride
+            else:
+                self.stride = min(self.stride * 2, self.max_stride)
+        self._thumbnail = thumbnail
+
+    def read(self) -> Optional[VideoFrame]:
+        """
+        อ่านเฟรมถัดไปตาม Policy (ข้ามเฟรมระหว่างทางด้วย grab()) -> None เมื่อจบวิดีโอ
+        """
+        # เฟรมแรกอ่านทันที หลังจากนั้นข้าม stride - 1 เฟรม
+        skip = self.stride - 1 if self._started else 0
+        self._started = True
+        for _ in range(skip):
+            if not self._grab():
+                return None
+        if not self._grab():
+            return None
+
+        timestamp_ms = self.capture.get(cv2.CAP_PROP_POS_MSEC)
+        start = time.perf_counter()
+        ok, image = self.capture.retrieve()
+        self.stats["retrieve_s"] += time.perf_counter() - start
+        if not ok:
+            return None
+        self.stats["retrieved"] += 1
+
+        offset = (0, 0)
+        if self.roi is not None:
+            x, y, w, h = self.roi
+            image = image[y:y + h, x:x + w].copy() # Copy เล็ก -> ปล่อยภาพเต็มได้
+            offset = (x, y)
+        if self.policy == "adaptive":
+            self._update_stride(image)
+        return VideoFrame(index=self._index, timestamp_ms=timestamp_ms, image=image, offset=offset)
+
+    def __iter__(self) -> Iterator[VideoFrame]:
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+    def release(self) -> None:
+        self.capture.release()
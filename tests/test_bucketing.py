@@ -0,0 +1,36 @@
+"""
+BucketedBatcher: ปัด Batch เป็นขนาดของ Bucket, แบ่ง Batch ที่ใหญ่เกิน และ Batch ว่าง
+"""
+import torch
+
+from src.inference.bucketing import BucketedBatcher
+
+NUM_CLASSES = 13
+
+class _Engine:
+    """Logits = ค่าเฉลี่ยของภาพซ้ำทุกคลาส (ตรวจได้ว่า Output ตรงกับ Input แถวเดียวกัน)"""
+    def __init__(self):
+        self.shapes = []
+
+    def __call__(self, batch):
+        self.shapes.append(tuple(batch.shape))
+        return batch.mean(dim=(1, 2, 3))[:, None].repeat(1, NUM_CLASSES)
+
+def _batch(count):
+    return torch.arange(count, dtype=torch.float32)[:, None, None, None].expand(count, 3, 4, 4).clone()
+
+def test_batches_are_padded_and_split():
+    engine = _Engine()
+    batcher = BucketedBatcher(engine, 4, torch.device("cpu"), NUM_CLASSES, bucket_sizes=(4, 8))
+    logits = batcher(_batch(11))
+    assert logits.shape == (11, NUM_CLASSES)
+    assert torch.equal(logits[:, 0], torch.arange(11, dtype=torch.float32))
+    assert engine.shapes == [(8, 3, 4, 4), (4, 3, 4, 4)]
+    assert batcher.stats[4].items == 3 and batcher.stats[8].items == 8
+
+def test_empty_batch_returns_empty_logits():
+    engine = _Engine()
+    batcher = BucketedBatcher(engine, 4, torch.device("cpu"), NUM_CLASSES)
+    logits = batcher(_batch(0))
+    assert logits.shape == (0, NUM_CLASSES)
+    assert engine.shapes == []
@@ -0,0 +1,32 @@
+"""
+แบ่ง Chunk / ต่อผลของ Chunk ที่ซ้อนกัน / Replay ตำแหน่งเป็นตาเดิน
+"""
+import chess
+
+from src.pipeline.chunked_video import plan_chunks, positions_to_moves, stitch_positions
+
+def _positions(sans, spacing=100):
+    board, positions = chess.Board(), []
+    for i, san in enumerate(sans):
+        board.push_san(san)
+        positions.append((i * spacing + 50, board.board_fen()))
+    return positions
+
+def test_plan_chunks_overlap_and_open_last_chunk():
+    chunks = plan_chunks(1000, 4, 50)
+    assert [(c.start_frame, c.end_frame) for c in chunks] == [(0, 250), (200, 500), (450, 750), (700, None)]
+
+def test_plan_chunks_without_frame_count_reads_whole_video():
+    chunks = plan_chunks(0, 4, 50)
+    assert [(c.start_frame, c.end_frame) for c in chunks] == [(0, None)]
+
+def test_stitch_and_replay():
+    positions = _positions(["e4", "c5", "Nf3", "d6", "d4"])
+    stitched = stitch_positions(positions[:3], positions[2:], 200, 300)
+    assert stitched == positions
+    assert chess.Board().variation_san(positions_to_moves(stitched)) == "1. e4 c5 2. Nf3 d6 3. d4"
+
+def test_replay_fills_missing_ply():
+    positions = _positions(["e4", "c5", "Nf3", "d6", "d4"])
+    moves = positions_to_moves([positions[0], positions[2], positions[4]])
+    assert [m.uci() for m in moves] == ["e2e4", "c7c5", "g1f3", "d7d6", "d2d4"]
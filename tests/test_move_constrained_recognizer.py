@@ -0,0 +1,107 @@
+"""
+MoveConstrainedRecognizer กับโมเดลจำลอง: ภาพกระดาน Warp แต่ละช่องระบายด้วยรหัสของคลาสหมาก
+(S2 / S3 / Pipeline เต็มอ่านคลาสจากพิกเซลกลางช่อง)
+"""
+import chess
+import numpy as np
+
+from src.models.piece.piece_lit_model import PieceLitModel
+from src.pipeline.move_constrained_recognizer import MoveConstrainedRecognizer
+from src.pipeline.state_recognizer import BoardState
+from src.utils import fen_utils
+
+CLASSES = PieceLitModel.CLASSES
+SQUARE = 20
+
+def _code(name):
+    return 10 + 18 * CLASSES.index(name)
+
+def _decode(crop):
+    value = int(crop[crop.shape[0] // 2, crop.shape[1] // 2, 0])
+    return CLASSES[round((value - 10) / 18)]
+
+def warped_from_grid(grid):
+    image = np.zeros((8 * SQUARE, 8 * SQUARE, 3), dtype=np.uint8)
+    for i, name in enumerate(grid):
+        row, col = divmod(i, 8)
+        image[row * SQUARE:(row + 1) * SQUARE, col * SQUARE:(col + 1) * SQUARE] = _code(name)
+    return image
+
+class _Locator:
+    orientation_needs_check = False
+
+class _OccupancyModel:
+    def predict_proba_subset(self, crops, indices):
+        return np.array([0.99 if _decode(crop) != 'empty' else 0.01 for crop in crops], dtype=np.float32)
+
+class _PieceModel:
+    class_names = CLASSES
+
+    def predict_proba(self, crops):
+        proba = np.full((len(crops), len(CLASSES)), 0.01, dtype=np.float32)
+        for row, crop in enumerate(crops):
+            proba[row, CLASSES.index(_decode(crop))] = 0.88
+        return proba
+
+class _Recognizer:
+    direct_sampling = False
+
+    def __init__(self):
+        self.locator = _Locator()
+        self.occupancy_model = _OccupancyModel()
+        self.piece_model = _PieceModel()
+
+    def recognize_warped(self, warped_board):
+        view = warped_board.reshape(8, SQUARE, 8, SQUARE, 3).transpose(0, 2, 1, 3, 4).reshape(64, SQUARE, SQUARE, 3)
+        grid = [_decode(crop) for crop in view]
+        return BoardState(fen=fen_utils.convert_grid_to_fen(grid), piece_grid=grid, warped_image=warped_board)
+
+def _grid_after(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return fen_utils.board_to_grid(board)
+
+def _occluded(grid, square_name):
+    grid = list(grid)
+    grid[chess.square_mirror(chess.parse_square(square_name))] = 'empty'
+    return grid
+
+def test_legal_move_is_accepted():
+    mcr = MoveConstrainedRecognizer(_Recognizer())
+    mcr.recognize_warped(warped_from_grid(_grid_after("e4")))
+    assert [m.uci() for m in mcr.moves] == ["e2e4"]
+    assert mcr.board.turn == chess.BLACK
+
+def test_single_occluded_frame_keeps_board_and_turn():
+    mcr = MoveConstrainedRecognizer(_Recognizer(), resync_frames=3)
+    mcr.recognize_warped(warped_from_grid(_grid_after("e4")))
+    fen_before = mcr.board.fen()
+
+    # มือบังช่อง d7: Pipeline เต็มได้ตำแหน่งที่ Valid แต่ไม่มี Legal Move อธิบาย
+    state = mcr.recognize_warped(warped_from_grid(_occluded(_grid_after("e4"), "d7")))
+    assert mcr.board.fen() == fen_before
+    assert mcr.board.turn == chess.BLACK
+    assert state.fen == mcr.board.board_fen()
+
+    # เฟรมถัดไปกลับมาปกติ แล้วเดินต่อได้
+    mcr.recognize_warped(warped_from_grid(_grid_after("e4")))
+    mcr.recognize_warped(warped_from_grid(_grid_after("e4", "e5")))
+    assert [m.uci() for m in mcr.moves] == ["e2e4", "e7e5"]
+
+def test_full_recognition_fills_missed_plies():
+    recognizer = _Recognizer()
+    recognizer.locator.orientation_needs_check = True # บังคับใช้ Pipeline เต็ม
+    mcr = MoveConstrainedRecognizer(recognizer)
+    mcr.recognize_warped(warped_from_grid(_grid_after("e4", "e5")))
+    assert [m.uci() for m in mcr.moves] == ["e2e4", "e7e5"]
+    assert mcr.board.turn == chess.WHITE
+
+def test_resync_after_consecutive_unexplained_frames():
+    mcr = MoveConstrainedRecognizer(_Recognizer(), resync_frames=3)
+    target = _grid_after("e4", "e5", "Nf3", "Nc6", "Bb5")
+    for _ in range(2):
+        mcr.recognize_warped(warped_from_grid(target))
+        assert mcr.board.board_fen() == chess.Board().board_fen()
+    mcr.recognize_warped(warped_from_grid(target))
+    assert mcr.board.board_fen() == fen_utils.convert_grid_to_fen(target).split(" ")[0]
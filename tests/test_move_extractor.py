@@ -0,0 +1,49 @@
+"""
+extract_move: ตาเดินพิเศษ (Castling / En passant / Promotion / การกิน) และตำแหน่งที่อธิบายไม่ได้
+"""
+import chess
+
+from src.utils.move_extractor import board_to_bitboards, extract_move, placement_to_bitboards
+
+def _extract(fen, uci):
+    board = chess.Board(fen)
+    after = board.copy()
+    after.push_uci(uci)
+    return extract_move(board, placement_to_bitboards(after.board_fen()))
+
+def test_placement_matches_board_bitboards():
+    board = chess.Board("r3k2r/pppq1ppp/2n2n2/3pp3/1b1PP3/2N2N2/PPPQ1PPP/R3KB1R w KQkq - 4 8")
+    assert placement_to_bitboards(board.board_fen()) == board_to_bitboards(board)
+
+def test_quiet_move_and_capture():
+    assert _extract(chess.STARTING_FEN, "g1f3") == chess.Move.from_uci("g1f3")
+    fen = "rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 2"
+    assert _extract(fen, "e4d5") == chess.Move.from_uci("e4d5")
+
+def test_castling_both_sides():
+    fen = "r3k2r/pppq1ppp/2n2n2/3pp3/1b1PP3/2N2N2/PPPQ1PPP/R3K2R w KQkq - 4 8"
+    assert _extract(fen, "e1g1") == chess.Move.from_uci("e1g1")
+    assert _extract(fen, "e1c1") == chess.Move.from_uci("e1c1")
+    black = fen.replace(" w ", " b ")
+    assert _extract(black, "e8g8") == chess.Move.from_uci("e8g8")
+
+def test_en_passant():
+    fen = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+    assert _extract(fen, "e5f6") == chess.Move.from_uci("e5f6")
+
+def test_promotion_and_underpromotion():
+    fen = "8/1P4k1/8/8/8/8/6K1/8 w - - 0 1"
+    assert _extract(fen, "b7b8q") == chess.Move.from_uci("b7b8q")
+    assert _extract(fen, "b7b8n") == chess.Move.from_uci("b7b8n")
+    capture = "2r5/1P4k1/8/8/8/8/6K1/8 w - - 0 1"
+    assert _extract(capture, "b7c8r") == chess.Move.from_uci("b7c8r")
+
+def test_unexplained_positions_return_none():
+    board = chess.Board()
+    assert extract_move(board, board_to_bitboards(board)) is None
+    after = chess.Board()
+    after.push_san("e4")
+    after.push_san("e5") # สองตา
+    assert extract_move(board, placement_to_bitboards(after.board_fen())) is None
+    # ไม่ใช่ฝั่งที่ถึงตาเดิน
+    assert extract_move(board, placement_to_bitboards("rnbqkbnr/pppp1ppp/8/4p3/8/8/PPPPPPPP/RNBQKBNR")) is None
@@ -0,0 +1,58 @@
+"""
+PositionTracker: การยอมรับตาเดิน การเติมตาที่พลาด และเลขตาของ PGN หลัง Resync
+"""
+import chess
+
+from src.utils.pgn_utils import PositionTracker
+
+def _placement(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board.board_fen()
+
+def _feed(tracker, placements):
+    for frame_index, placement in enumerate(placements):
+        tracker.update(placement, frame_index)
+
+def test_confirmed_moves_to_pgn():
+    tracker = PositionTracker(confirm_frames=2)
+    _feed(tracker, [_placement("e4")] * 2 + [_placement("e4", "c5")] * 2)
+    assert tracker.pgn() == "1. e4 c5"
+
+def test_missed_plies_are_recovered():
+    tracker = PositionTracker(confirm_frames=1)
+    _feed(tracker, [_placement("e4"), _placement("e4", "e5", "Nf3")])
+    assert tracker.pgn() == "1. e4 e5 2. Nf3"
+    assert tracker.resyncs == []
+
+def test_pgn_numbering_continues_after_resync():
+    tracker = PositionTracker(confirm_frames=1)
+    _feed(tracker, [
+        _placement("e4"),
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6"),       # พลาด 4 ตา -> Resync (ขาวถึงตาเดิน)
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6", "O-O"),
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6", "O-O", "Bc5"),
+    ])
+    assert len(tracker.resyncs) == 1
+    assert tracker.pgn() == "1. e4 2. O-O Bc5"
+
+def test_resync_turn_retry_keeps_numbering():
+    tracker = PositionTracker(confirm_frames=1)
+    _feed(tracker, [
+        _placement("e4"),
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4"),               # Resync เดาขาวถึงตาเดิน (ผิด)
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6"),       # ดำเดิน -> แก้ฝั่งที่ถึงตาเดิน
+    ])
+    assert tracker.board.turn == chess.WHITE
+    assert tracker.pgn() == "1. e4 2...Nf6"
+
+def test_from_dict_restores_resync_segments():
+    tracker = PositionTracker(confirm_frames=1)
+    _feed(tracker, [
+        _placement("e4"),
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6"),
+        _placement("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6", "O-O"),
+    ])
+    restored = PositionTracker.from_dict(tracker.to_dict())
+    assert restored.pgn() == tracker.pgn() == "1. e4 2. O-O"